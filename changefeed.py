@@ -0,0 +1,156 @@
+"""
+changefeed.py — versioned change log of the player datasets, for /changes.
+
+Each refresh calls record(), which diffs the tracked dicts (filtered_players,
+teams_data, dfs_salaries_data) against what was recorded last time and
+appends one log entry per dataset that changed:
+
+    (version, dataset, changed, removed)
+        changed  {key: {field: new value}} — only the fields that differ;
+                 a new record carries all its fields, a dropped field is null,
+                 non-object values (teams_data lists) are sent whole
+        removed  [key, ...]
+
+changes(since) merges every entry after `since` into one delta, so an
+injury-status or KTC update costs a client a few bytes instead of the whole
+player dict. Clients apply `removed` first, then merge `changes` into their
+records. When `since` is older than the log, or from before a restart, the
+answer is a full snapshot instead.
+
+Versions start at the boot time in milliseconds and only go up, so a version
+from an earlier process is always older than the log and gets a snapshot.
+"""
+
+import threading
+import time
+from collections import deque
+
+# Log entries kept; a `since` older than the oldest gets a full snapshot
+MAX_ENTRIES = 1000
+
+_MISSING = object()
+
+_lock = threading.Lock()
+_version = int(time.time() * 1000)
+_floor = _version           # oldest `since` the log can still answer
+_log = deque()              # (version, dataset, changed, removed)
+_sources: dict = {}         # dataset → () → current dict
+_recorded: dict = {}        # dataset → {key: copy of the record as last recorded}
+
+
+def track(name: str, source) -> None:
+    """Follow source() (a dict keyed by record id) as dataset `name`."""
+    _sources[name] = source
+
+
+def _copy(value):
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+def _diff(old: dict, new: dict) -> tuple[dict, list]:
+    changed = {}
+    for key, value in new.items():
+        prev = old.get(key, _MISSING)
+        if prev is _MISSING:
+            changed[key] = value
+        elif isinstance(value, dict) and isinstance(prev, dict):
+            fields = {f: v for f, v in value.items() if prev.get(f, _MISSING) != v}
+            fields.update({f: None for f in prev if f not in value})
+            if fields:
+                changed[key] = fields
+        elif value != prev:
+            changed[key] = value
+    removed = [key for key in old if key not in new]
+    return changed, removed
+
+
+def _append(entry: tuple) -> None:
+    """Caller holds _lock."""
+    global _floor
+    _log.append(entry)
+    while len(_log) > MAX_ENTRIES:
+        _floor = _log.popleft()[0]
+
+
+def record(*names: str) -> int:
+    """
+    Diff each named dataset against its last recording and log what changed.
+    The first recording of a dataset is its baseline: nothing is logged, and
+    clients from before it get a snapshot. Returns the current version.
+    """
+    global _version, _floor
+    with _lock:
+        for name in names:
+            current = {key: _copy(value) for key, value in list(_sources[name]().items())}
+            previous = _recorded.get(name)
+            _recorded[name] = current
+            if previous is None:
+                _version += 1
+                _floor = _version
+                continue
+            changed, removed = _diff(previous, current)
+            if changed or removed:
+                _version += 1
+                _append((_version, name, changed, removed))
+        return _version
+
+
+def version() -> int:
+    return _version
+
+
+def _snapshot() -> dict:
+    """Caller holds _lock. The recorded state at _version (the live dicts in a web worker)."""
+    return {name: _recorded.get(name) or dict(source()) for name, source in _sources.items()}
+
+
+def changes(since: int | None) -> dict:
+    """
+    {"version", "full", "changes": {dataset: {key: fields}}, "removed": {dataset: [keys]}}
+    for everything after `since`; "full": true replaces the client's copy instead.
+    """
+    with _lock:
+        if since is None or since < _floor or since > _version:
+            return {"version": _version, "full": True, "changes": _snapshot(), "removed": {}}
+
+        merged = {name: {} for name in _sources}
+        removed = {name: set() for name in _sources}
+        for entry_version, name, changed, gone in _log:
+            if entry_version <= since:
+                continue
+            out = merged.setdefault(name, {})
+            for key in gone:
+                out.pop(key, None)
+                removed.setdefault(name, set()).add(key)
+            for key, value in changed.items():
+                prev = out.get(key)
+                out[key] = {**prev, **value} if isinstance(prev, dict) and isinstance(value, dict) else value
+        return {
+            "version": _version,
+            "full": False,
+            "changes": merged,
+            "removed": {name: sorted(keys) for name, keys in removed.items()},
+        }
+
+
+# ── Sharing with web workers ──────────────────────────────────────────────────
+
+def export_state() -> dict:
+    """The log and its bounds, for handing to another process."""
+    with _lock:
+        return {"version": _version, "floor": _floor, "log": list(_log)}
+
+
+def load_state(state: dict) -> None:
+    """Serve an export_state() log; the tracked dicts hold the matching data."""
+    global _version, _floor
+    with _lock:
+        _version = state["version"]
+        _floor = state["floor"]
+        _log.clear()
+        _log.extend(state["log"])
+        _recorded.clear()
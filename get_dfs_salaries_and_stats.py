@@ -893,6 +893,11 @@ class DFFSalariesScraper:
         return players
 
 
+def scrape_salaries_with_sleeper_ids(players: Dict, date: str = None) -> List[Dict]:
+    """Module-level entry point for DFFSalariesScraper().get_salaries_with_sleeper_ids (used by workers.py)."""
+    return DFFSalariesScraper().get_salaries_with_sleeper_ids(players, date=date)
+
+
 def main():
     """Test the DFF scraper"""
     scraper = DFFSalariesScraper()
@@ -418,6 +418,16 @@ def tep_adjust(players, tep):
 
     return players
 
+
+def scrape_dynasty_ranks(tep_level=1):
+    """
+    Scrape KTC, merge in FantasyCalc values and apply the TEP adjustment.
+    Returns the adjusted player/pick list (runnable in a worker process).
+    """
+    players = scrape_ktc()
+    players = scrape_fantasy_calc(players)
+    return tep_adjust(players, tep_level)
+
 """
 if __name__ == "__main__":
     # Test TEP adjustment
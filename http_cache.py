@@ -0,0 +1,188 @@
+"""
+http_cache.py — ETag / 304, Cache-Control and pre-serialized bodies for
+read-only dataset endpoints.
+
+Every published dataset carries a version: nflverse and odds data already
+count their own (nflverse_version, odds_version); the scraped dicts in
+nfl-helper register a name here and bump() it whenever they are updated.
+An endpoint builds its ETag from the versions it depends on, and cached_json()
+answers a matching If-None-Match with an empty 304 before anything is
+serialized. Responses carry Cache-Control so the frontend and any CDN in
+front of it can revalidate cheaply.
+
+json_response() serializes a view once per key (which includes the dataset
+version, plus the boot id since versions start over on a restart) and keeps
+the identity, gzip and — if the brotli package is installed — brotli bytes in
+a byte-bounded LRU, then serves whichever variant the client's Accept-Encoding
+prefers. orjson is used for serialization when available (it and brotli are
+pinned in requirements.txt), Flask's JSON provider otherwise — unsorted, so
+that dicts mixing int and str keys serialize the same way on both paths.
+"""
+
+import functools
+import gzip
+import os
+import threading
+import time
+
+from cachetools import LRUCache
+from flask import current_app, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CACHE_MAX_AGE = int(os.environ.get("HTTP_CACHE_MAX_AGE", 60))
+BODY_CACHE_MAX_BYTES = int(os.environ.get("HTTP_BODY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+# Distinguishes ETags across restarts, when in-process versions start over
+_BOOT = format(int(time.time()), "x")
+
+dataset_versions: dict = {}        # dataset name → int, bumped on every update
+_lock = threading.Lock()
+
+
+def register(*names: str) -> None:
+    with _lock:
+        for name in names:
+            dataset_versions.setdefault(name, 0)
+
+
+def bump(*names: str) -> None:
+    """Mark datasets as changed."""
+    with _lock:
+        for name in names:
+            dataset_versions[name] = dataset_versions.get(name, 0) + 1
+
+
+def bump_all() -> None:
+    bump(*list(dataset_versions))
+
+
+def adopt(versions: dict, boot: str) -> None:
+    """Take over another process's dataset versions and boot id (web workers
+    following a loader), so every worker issues the same ETags. A new boot
+    (the loader restarted) drops the cached bodies of the old one."""
+    global _BOOT
+    with _lock:
+        restarted = boot != _BOOT
+        dataset_versions.update(versions)
+        _BOOT = boot
+    if restarted:
+        clear_bodies()
+
+
+def boot_id() -> str:
+    return _BOOT
+
+
+def version(name: str) -> int:
+    return dataset_versions.get(name, 0)
+
+
+def stamp(name: str) -> tuple:
+    """(boot id, version) — for process-local caches derived from a dataset,
+    whose keys must not collide with a restarted loader's versions."""
+    return _BOOT, dataset_versions.get(name, 0)
+
+
+def etag(*parts) -> str:
+    """Opaque (weak) ETag value from the dataset versions and parameters a response depends on."""
+    return "-".join([_BOOT, *map(str, parts)])
+
+
+def _cache_headers(response, tag: str, max_age: int):
+    response.set_etag(tag, weak=True)
+    response.headers["Cache-Control"] = f"public, max-age={max_age}, must-revalidate"
+    return response
+
+
+def cached_json(tag: str, build, max_age: int = CACHE_MAX_AGE):
+    """
+    304 if the client already holds `tag`, otherwise whatever build() returns
+    (anything a view may return) with ETag / Cache-Control on a 200.
+    """
+    if request.if_none_match.contains_weak(tag):
+        return _cache_headers(current_app.response_class(status=304), tag, max_age)
+    response = current_app.make_response(build())
+    if response.status_code == 200:
+        _cache_headers(response, tag, max_age)
+    return response
+
+
+def versioned(parts, max_age: int = CACHE_MAX_AGE):
+    """
+    View decorator: parts() returns the versions the response depends on,
+    e.g. @versioned(lambda: ("odds", ns.nflverse_version, oa.odds_version)).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            return cached_json(etag(*parts()), lambda: view(*args, **kwargs), max_age)
+        return wrapper
+    return decorator
+
+
+# ── Pre-serialized bodies ─────────────────────────────────────────────────────
+
+def _entry_size(entry: dict) -> int:
+    return sum(len(body) for body in entry.values())
+
+
+_bodies = LRUCache(maxsize=BODY_CACHE_MAX_BYTES, getsizeof=_entry_size)
+_bodies_lock = threading.Lock()
+
+
+def _dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return current_app.json.dumps(data, sort_keys=False).encode()
+
+
+def _encode(data) -> dict:
+    """encoding → body bytes for every variant worth storing."""
+    raw = _dumps(data)
+    entry = {"identity": raw}
+    if len(raw) >= MIN_COMPRESS_BYTES:
+        entry["gzip"] = gzip.compress(raw, compresslevel=6, mtime=0)
+        if brotli is not None:
+            entry["br"] = brotli.compress(raw, quality=5)
+    return entry
+
+
+def json_response(key: tuple, build):
+    """
+    JSON response for build(), serialized and compressed once per key. The key
+    must change whenever the data does — include the dataset version.
+    """
+    key = (_BOOT, *key)
+    with _bodies_lock:
+        entry = _bodies.get(key)
+    if entry is None:
+        entry = _encode(build())
+        with _bodies_lock:
+            try:
+                _bodies[key] = entry
+            except ValueError:
+                pass            # larger than the whole cache; serve it uncached
+
+    encoding = request.accept_encodings.best_match([e for e in ("br", "gzip") if e in entry]) or "identity"
+    response = current_app.response_class(entry[encoding], mimetype="application/json")
+    if encoding != "identity":
+        response.headers["Content-Encoding"] = encoding
+    if len(entry) > 1:
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+def clear_bodies() -> None:
+    with _bodies_lock:
+        _bodies.clear()
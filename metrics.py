@@ -0,0 +1,313 @@
+"""
+metrics.py — request, upstream and dataset metrics for /statistics and /metrics.
+
+Every thread records into its own shard (a plain dict only that thread
+writes), so the request path never takes a lock and never loses an increment
+to a racing `+=`. Readers merge the shards; shards of finished threads are
+folded into a retired total so per-request threads don't pile up.
+
+  - counters:    inc("http_requests_total", endpoint=..., status=...)
+  - histograms:  observe("http_request_duration_seconds", 0.012, endpoint=...)
+                 fixed log-spaced buckets, p50/p95/p99 interpolated from them
+  - gauges:      set_gauge(...) for point values
+  - datasets:    register_dataset(name, version, compute) — compute() runs
+                 only when version() has moved, not on every scrape
+
+init_app() times every Flask request; instrument_requests() times every
+outgoing `requests` call by host (Sleeper, DFF, KTC, the Odds API, ...).
+render_prometheus() emits the text exposition format.
+"""
+
+import bisect
+import math
+import threading
+import time
+from urllib.parse import urlsplit
+
+PREFIX = "nfl_helper_"
+
+# 1 ms … ~25 s, each bucket 1.5× the previous
+LATENCY_BUCKETS = tuple(round(0.001 * 1.5 ** i, 6) for i in range(26))
+# 256 B … 64 MiB
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(10))
+
+_BUCKETS = {
+    "http_request_duration_seconds":     LATENCY_BUCKETS,
+    "http_response_size_bytes":          SIZE_BUCKETS,
+    "upstream_request_duration_seconds": LATENCY_BUCKETS,
+}
+
+_HELP = {
+    "http_requests_total":               "HTTP requests by endpoint, method and status",
+    "http_request_duration_seconds":     "HTTP request latency by endpoint",
+    "http_response_size_bytes":          "HTTP response body size by endpoint",
+    "upstream_requests_total":           "Outgoing HTTP requests by host and status",
+    "upstream_request_duration_seconds": "Outgoing HTTP request latency by host",
+}
+
+# Folding dead threads' shards happens on scrape, and on shard creation past this many
+MAX_SHARDS = 64
+
+_local = threading.local()
+_shards: list = []          # [(thread, {"c": counters, "h": histograms})]
+_retired = {"c": {}, "h": {}}
+_shards_lock = threading.Lock()
+
+_gauges: dict = {}          # (name, labels) → value
+_datasets: dict = {}        # name → {"version", "compute", "seen", "values"}
+_datasets_lock = threading.Lock()
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _merge(into: dict, shard: dict) -> None:
+    for key, value in shard["c"].items():
+        into["c"][key] = into["c"].get(key, 0) + value
+    for key, hist in shard["h"].items():
+        total = into["h"].get(key)
+        if total is None:
+            into["h"][key] = list(hist)
+        else:
+            for i, v in enumerate(hist):
+                total[i] += v
+
+
+def _fold_dead_shards() -> None:
+    """Caller holds _shards_lock."""
+    alive = []
+    for thread, shard in _shards:
+        if thread.is_alive():
+            alive.append((thread, shard))
+        else:
+            _merge(_retired, shard)
+    _shards[:] = alive
+
+
+def _shard() -> dict:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = {"c": {}, "h": {}}
+        with _shards_lock:
+            if len(_shards) >= MAX_SHARDS:
+                _fold_dead_shards()
+            _shards.append((threading.current_thread(), shard))
+    return shard
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    counters = _shard()["c"]
+    key = _key(name, labels)
+    counters[key] = counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Add a histogram observation. Layout: [bucket counts..., +Inf count, sum]."""
+    buckets = _BUCKETS.get(name, LATENCY_BUCKETS)
+    hists = _shard()["h"]
+    key = _key(name, labels)
+    hist = hists.get(key)
+    if hist is None:
+        hist = hists[key] = [0] * (len(buckets) + 2)
+    hist[bisect.bisect_left(buckets, value)] += 1
+    hist[-1] += value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    _gauges[_key(name, labels)] = value
+
+
+def register_dataset(name: str, version, compute) -> None:
+    """compute() → {stat: value}; re-run only when version() changes."""
+    with _datasets_lock:
+        _datasets[name] = {"version": version, "compute": compute, "seen": object(), "values": {}}
+
+
+# ── Reading ───────────────────────────────────────────────────────────────────
+
+def collect() -> dict:
+    """Merged {"c": counters, "h": histograms} across all threads."""
+    with _shards_lock:
+        _fold_dead_shards()
+        merged = {"c": {}, "h": {}}
+        _merge(merged, _retired)
+        for _, shard in _shards:
+            _merge(merged, {"c": shard["c"].copy(), "h": shard["h"].copy()})
+    return merged
+
+
+def dataset_stats() -> dict:
+    with _datasets_lock:
+        for entry in _datasets.values():
+            version = entry["version"]()
+            if version != entry["seen"]:
+                entry["values"] = entry["compute"]()
+                entry["seen"] = version
+        return {name: entry["values"] for name, entry in _datasets.items()}
+
+
+def quantile(buckets: tuple, hist: list, q: float) -> float | None:
+    """q-quantile of a histogram, interpolated linearly within the bucket it falls in."""
+    count = sum(hist[:-1])
+    if not count:
+        return None
+    rank = q * count
+    cumulative = 0
+    for i, n in enumerate(hist[:-1]):
+        if cumulative + n >= rank and n:
+            if i == len(buckets):
+                return buckets[-1]          # beyond the last bound
+            lower = buckets[i - 1] if i else 0.0
+            return lower + (buckets[i] - lower) * (rank - cumulative) / n
+        cumulative += n
+    return buckets[-1]
+
+
+def summary(name: str, by: str, merged: dict | None = None, scale: float = 1.0) -> dict:
+    """
+    Histogram `name` grouped by label `by`: {label value: {count, mean, p50,
+    p95, p99}}, values multiplied by `scale` (1000 for seconds → ms).
+    """
+    merged = merged or collect()
+    buckets = _BUCKETS.get(name, LATENCY_BUCKETS)
+    grouped: dict = {}
+    for (metric, labels), hist in merged["h"].items():
+        if metric != name:
+            continue
+        group = dict(labels).get(by)
+        total = grouped.get(group)
+        if total is None:
+            grouped[group] = list(hist)
+        else:
+            for i, v in enumerate(hist):
+                total[i] += v
+
+    out = {}
+    for group, hist in grouped.items():
+        count = sum(hist[:-1])
+        out[group] = {"count": count, "mean": round(hist[-1] / count * scale, 3) if count else None}
+        for label, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            value = quantile(buckets, hist, q)
+            out[group][label] = None if value is None else round(value * scale, 3)
+    return out
+
+
+def counter_totals(name: str, by: str, merged: dict | None = None) -> dict:
+    """Counter `name` summed by label `by`."""
+    merged = merged or collect()
+    out: dict = {}
+    for (metric, labels), value in merged["c"].items():
+        if metric == name:
+            group = dict(labels).get(by)
+            out[group] = out.get(group, 0) + value
+    return out
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels, extra: tuple = ()) -> str:
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    escaped = (f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format (0.0.4)."""
+    merged = collect()
+    lines = []
+
+    def header(name: str, kind: str):
+        if name in _HELP:
+            lines.append(f"# HELP {PREFIX}{name} {_HELP[name]}")
+        lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+    for name in sorted({metric for metric, _ in merged["c"]}):
+        header(name, "counter")
+        for (metric, labels), value in sorted(merged["c"].items()):
+            if metric == name:
+                lines.append(f"{PREFIX}{name}{_labels(labels)} {_fmt(value)}")
+
+    for name in sorted({metric for metric, _ in merged["h"]}):
+        header(name, "histogram")
+        buckets = _BUCKETS.get(name, LATENCY_BUCKETS)
+        for (metric, labels), hist in sorted(merged["h"].items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, n in zip((*buckets, math.inf), hist[:-1]):
+                cumulative += n
+                lines.append(f"{PREFIX}{name}_bucket{_labels(labels, (('le', _fmt(float(bound))),))} {cumulative}")
+            lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {_fmt(float(hist[-1]))}")
+            lines.append(f"{PREFIX}{name}_count{_labels(labels)} {cumulative}")
+
+    gauges = dict(_gauges)
+    for dataset, values in dataset_stats().items():
+        for stat, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                gauges[_key(f"dataset_{stat}", {"dataset": dataset})] = value
+    for name in sorted({metric for metric, _ in gauges}):
+        header(name, "gauge")
+        for (metric, labels), value in sorted(gauges.items()):
+            if metric == name:
+                lines.append(f"{PREFIX}{name}{_labels(labels)} {_fmt(value)}")
+
+    return "\n".join(lines) + "\n"
+
+
+# ── Instrumentation ───────────────────────────────────────────────────────────
+
+def init_app(app) -> None:
+    """Time every request and record its status and response size."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record(response):
+        started = g.pop("_metrics_started", None)
+        endpoint = request.endpoint or "unmatched"
+        inc("http_requests_total", endpoint=endpoint, method=request.method, status=response.status_code)
+        if started is not None:
+            observe("http_request_duration_seconds", time.perf_counter() - started, endpoint=endpoint)
+        if response.content_length is not None:
+            observe("http_response_size_bytes", response.content_length, endpoint=endpoint)
+        return response
+
+
+def instrument_requests() -> None:
+    """Time every call made through the requests library, by host. Idempotent."""
+    import requests
+
+    send = requests.Session.send
+    if getattr(send, "_metrics", False):
+        return
+
+    def timed_send(self, request, **kwargs):
+        host = urlsplit(request.url).hostname or "unknown"
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = send(self, request, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            observe("upstream_request_duration_seconds", time.perf_counter() - started, host=host)
+            inc("upstream_requests_total", host=host, status=status)
+
+    timed_send._metrics = True
+    requests.Session.send = timed_send
@@ -2,28 +2,46 @@ import argparse
 import requests
 from dotenv import load_dotenv
 load_dotenv()
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 import atexit
+import functools
 import json
 import os
+import threading
 from flask_cors import CORS
 import datetime
-from get_dynasty_ranks import scrape_ktc, scrape_fantasy_calc, tep_adjust
+from get_dynasty_ranks import scrape_dynasty_ranks
 from fantasydatascraper import FantasyDataScraper
-from get_dfs_salaries_and_stats import DFFSalariesScraper
+from get_dfs_salaries_and_stats import DFFSalariesScraper, scrape_salaries_with_sleeper_ids
 import random  # Import random for generating random deltas
 from pathlib import Path
 from routes_stats import stats_bp
 from routes_odds import odds_bp
+from routes_export import export_bp
+import routes_export
+import changefeed
+import nflverse_stats
 from nflverse_stats import refresh_nflverse_data
+from nflverse_history import refresh_history as refresh_nflverse_history
+import http_cache
+import metrics
 import odds_api
+import odds_movement
+import odds_planner
+import pagination
+import shared_backend
+import snapshot_store
+import workers
 
 
 app = Flask(__name__)
 app.register_blueprint(stats_bp)
 app.register_blueprint(odds_bp)
+app.register_blueprint(export_bp)
+metrics.init_app(app)
+metrics.instrument_requests()
 
 # Data directory for persistence (works locally, ephemeral on Koyeb free tier)
 DATA_DIR = Path(os.environ.get('DATA_DIR', './data'))
@@ -61,25 +79,10 @@ def after_request(response):
         response.headers.add('Access-Control-Allow-Credentials', 'true')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
+    response.headers.add('Access-Control-Expose-Headers', 'ETag,X-Next-Cursor,Link')
     return response
 
 
-@app.before_request
-def track_request_statistics():
-    """
-    Middleware to track request statistics for each endpoint.
-    """
-    global request_statistics
-
-    # Get the endpoint being accessed
-    endpoint = request.endpoint
-
-    # Increment the request count for the endpoint
-    if endpoint not in request_statistics["endpoints"]:
-        request_statistics["endpoints"][endpoint] = 0
-    request_statistics["endpoints"][endpoint] += 1
-
-
 # Dictionary to store filtered player data
 all_players = {}  # Full unfiltered Sleeper player data for matching
 filtered_players = {}
@@ -92,6 +95,29 @@ tinyurl_data = {}  # Dictionary to store data: {name: {data: str, created_at: st
 tournament_data = {}  # Dictionary to store tournament data: {id: {week: int, name: str, games: list, created_at: str}}
 current_nfl_week = None  # Current NFL week (1-22) from DailyFantasyFuel data, includes playoffs
 
+# Versioned datasets (bumped by the update functions below); served with ETags
+# and used to decide which snapshots a loader needs to republish
+http_cache.register("players", "fantasy_points", "dfs_salaries", "picks")
+
+# Serving role:
+#   all    — one process scrapes, schedules and serves (default)
+#   loader — runs the scheduler and refreshes, publishes snapshots (snapshot_store)
+#   web    — no scraping or scheduler; follows the loader's snapshots (see wsgi.py)
+APP_ROLE = os.environ.get("APP_ROLE", "all").lower()
+SNAPSHOT_PUBLISH_SECONDS = int(os.environ.get("SNAPSHOT_PUBLISH_SECONDS", 30))
+SNAPSHOT_POLL_SECONDS = int(os.environ.get("SNAPSHOT_POLL_SECONDS", 5))
+
+# Several instances behind a load balancer (SHARED_BACKEND_URL, see shared_backend.py):
+# only the elected leader runs scheduled jobs and publishes snapshots; every node
+# follows the snapshots and shares tinyurl/tournament state through the backend.
+leader_elector = shared_backend.LeaderElector(shared_backend.backend) if shared_backend.backend is not None else None
+SHARED_STATE_PERSIST_SECONDS = int(os.environ.get("SHARED_STATE_PERSIST_SECONDS", 60))
+
+
+def is_leader():
+    """True if this node runs the scheduled jobs (always, without a shared backend)."""
+    return leader_elector is None or leader_elector.is_leader
+
 
 # ============================================================================
 # Data Persistence Functions
@@ -123,6 +149,12 @@ USE_GIST = bool(GITHUB_TOKEN and GIST_ID)
 
 
 def save_tinyurl_data():
+    """Share tinyurl_data with the other instances (if any) and persist it"""
+    if share_state("tinyurl_data"):
+        persist_tinyurl_data()
+
+
+def persist_tinyurl_data():
     """Save tinyurl_data to Supabase (preferred), Gist, or local file"""
     global tinyurl_data
 
@@ -196,9 +228,11 @@ def _save_tinyurl_data_to_file():
 
 
 def load_tinyurl_data():
-    """Load tinyurl_data from Supabase (preferred), Gist, or local file"""
+    """Load tinyurl_data from the shared backend if another instance already has, else Supabase (preferred), Gist, or local file"""
     global tinyurl_data
 
+    if pull_shared_state("tinyurl_data"):
+        return
     if USE_SUPABASE:
         _load_tinyurl_data_from_supabase()
     elif USE_GIST:
@@ -206,6 +240,7 @@ def load_tinyurl_data():
     else:
         print(f"{datetime.datetime.now()} - Loading tinyurl_data from local file")
         _load_tinyurl_data_from_file()
+    seed_shared_state("tinyurl_data")
 
 
 def _load_tinyurl_data_from_supabase():
@@ -277,6 +312,12 @@ def _load_tinyurl_data_from_file():
 
 
 def save_tournament_data():
+    """Share tournament_data with the other instances (if any) and persist it"""
+    if share_state("tournament_data"):
+        persist_tournament_data()
+
+
+def persist_tournament_data():
     """Save tournament_data to Supabase (preferred), Gist, or local file"""
     global tournament_data
 
@@ -350,9 +391,11 @@ def _save_tournament_data_to_file():
 
 
 def load_tournament_data():
-    """Load tournament_data from Supabase (preferred), Gist, or local file"""
+    """Load tournament_data from the shared backend if another instance already has, else Supabase (preferred), Gist, or local file"""
     global tournament_data
 
+    if pull_shared_state("tournament_data"):
+        return
     if USE_SUPABASE:
         _load_tournament_data_from_supabase()
     elif USE_GIST:
@@ -360,6 +403,7 @@ def load_tournament_data():
     else:
         print(f"{datetime.datetime.now()} - Loading tournament_data from local file")
         _load_tournament_data_from_file()
+    seed_shared_state("tournament_data")
 
 
 def _load_tournament_data_from_supabase():
@@ -430,6 +474,183 @@ def _load_tournament_data_from_file():
         print(f"{datetime.datetime.now()} - Error loading tournament_data: {e}")
 
 
+# ── Shared tinyurl / tournament state (SHARED_BACKEND_URL) ────────────────────
+# Every change is written to the backend; other instances pull it before serving
+# these endpoints. Only the leader writes to Supabase/Gist/file — straight away
+# for its own changes, within SHARED_STATE_PERSIST_SECONDS for everyone else's.
+# A write sends only the fields this instance added, changed or removed since
+# it last synced — per entry, and per submission inside user_submissions —
+# merged into the backend's current state with a compare-and-set on the
+# version, so two instances adding entries, or submissions to the same entry,
+# don't drop each other's. A request to one of these endpoints holds the
+# state's lock from its pull until it returns, so a pull on another thread
+# can't replace the dict between a local edit and its share.
+
+SHARED_STATE = ("tinyurl_data", "tournament_data")
+SHARED_STATE_PATHS = ("/tinyurl", "/tournament", "/admin/tinyurl", "/admin/tournament")
+# Entry fields that are maps merged key by key rather than replaced as a whole
+SHARED_STATE_SUBMAPS = ("user_submissions",)
+# Compare-and-set attempts before giving up on a contended write
+SHARED_STATE_CAS_ATTEMPTS = 5
+
+_shared_state_versions = {}     # name → backend version held in this process
+_shared_state_synced = {}       # name → `name` as of that version (JSON), the base for local changes
+_persisted_state_versions = {}  # name → backend version written to durable storage (leader)
+_shared_state_locks = {name: threading.RLock() for name in SHARED_STATE}
+
+
+def holds_shared_state(*names):
+    """Decorator: run with the locks of the named shared states held (mutate → share as one step)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for name in names:
+                _shared_state_locks[name].acquire()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                for name in reversed(names):
+                    _shared_state_locks[name].release()
+        return wrapper
+    return decorator
+
+
+def _merge_keys(base, local, remote, merge_value=None):
+    """
+    `remote` with the keys `local` added, changed or removed relative to `base`.
+    A changed key whose value is a dict on all three sides goes through
+    merge_value(key, base, local, remote) instead of replacing remote's value.
+    """
+    merged = dict(remote)
+    for key, value in local.items():
+        if key in base and base[key] == value:
+            continue
+        if merge_value and all(isinstance(v, dict) for v in (base.get(key), value, remote.get(key))):
+            merged[key] = merge_value(key, base[key], value, remote[key])
+        else:
+            merged[key] = value
+    for key in base:
+        if key not in local:
+            merged.pop(key, None)
+    return merged
+
+
+def _merge_local_changes(name, remote):
+    """`remote` with this instance's changes to `name` since its last sync applied, field by field."""
+    local = json.loads(json.dumps(globals()[name]))
+    base = json.loads(_shared_state_synced.get(name, "{}"))
+
+    def merge_field(field, base_value, local_value, remote_value):
+        if field in SHARED_STATE_SUBMAPS:
+            return _merge_keys(base_value, local_value, remote_value)
+        return local_value
+
+    def merge_entry(_, base_entry, local_entry, remote_entry):
+        return _merge_keys(base_entry, local_entry, remote_entry, merge_field)
+
+    return _merge_keys(base, local, remote, merge_entry)
+
+
+def _adopt_shared_state(name, version, raw):
+    with _shared_state_locks[name]:
+        globals()[name].clear()
+        globals()[name].update(json.loads(raw))
+        _shared_state_versions[name] = version
+        _shared_state_synced[name] = raw
+
+
+def share_state(name):
+    """Publish a change to `name` to the other instances. True if this node should also persist it."""
+    if shared_backend.backend is None:
+        return True
+    with _shared_state_locks[name]:
+        return _share_state(name)
+
+
+def _share_state(name):
+    key = f"state:{name}"
+    try:
+        for _ in range(SHARED_STATE_CAS_ATTEMPTS):
+            loaded = shared_backend.backend.get_versioned(key)
+            expected, remote = (loaded[0], json.loads(loaded[1])) if loaded else (0, {})
+            raw = json.dumps(_merge_local_changes(name, remote))
+            version = shared_backend.backend.set_versioned(key, raw.encode(), expected=expected)
+            if version is not None:
+                break
+        else:
+            raise shared_backend.BackendError(f"{name} changed {SHARED_STATE_CAS_ATTEMPTS} times while writing")
+    except (OSError, shared_backend.BackendError) as e:
+        print(f"{datetime.datetime.now()} - Error sharing {name}: {e}, persisting locally")
+        return True
+    _adopt_shared_state(name, version, raw)
+    if is_leader():
+        _persisted_state_versions[name] = version
+        return True
+    return False
+
+
+def pull_shared_state(name):
+    """Take a newer `name` from the backend. True if the backend holds it at all."""
+    if shared_backend.backend is None:
+        return False
+    with _shared_state_locks[name]:
+        return _pull_shared_state(name)
+
+
+def _pull_shared_state(name):
+    try:
+        loaded = shared_backend.backend.get_versioned(f"state:{name}", _shared_state_versions.get(name))
+    except (OSError, shared_backend.BackendError) as e:
+        print(f"{datetime.datetime.now()} - Error pulling {name}: {e}")
+        return False
+    if loaded is not None:
+        version, raw = loaded
+        _adopt_shared_state(name, version, raw.decode())
+    return name in _shared_state_versions
+
+
+def seed_shared_state(name):
+    """First instance up: put what it loaded from durable storage into the backend."""
+    if shared_backend.backend is not None and name not in _shared_state_versions:
+        share_state(name)
+
+
+def persist_shared_state():
+    """Leader job: persist tinyurl/tournament changes made on other instances."""
+    for name, persist in (("tinyurl_data", persist_tinyurl_data), ("tournament_data", persist_tournament_data)):
+        with _shared_state_locks[name]:
+            pull_shared_state(name)
+            version = _shared_state_versions.get(name)
+            if version is not None and version != _persisted_state_versions.get(name):
+                persist()
+                _persisted_state_versions[name] = version
+
+
+@app.errorhandler(pagination.PageError)
+def handle_page_error(e):
+    """Bad fields= / page_size= / cursor= on a bulk endpoint (400, or 410 for an expired cursor)."""
+    return jsonify({"error": str(e)}), e.status
+
+
+@app.before_request
+def sync_shared_state():
+    """
+    Pick up tinyurl/tournament changes made on other instances before serving
+    them, and hold the state locks until the request is torn down.
+    """
+    if shared_backend.backend is not None and request.path.startswith(SHARED_STATE_PATHS):
+        for name in SHARED_STATE:
+            _shared_state_locks[name].acquire()
+            g.shared_state_locked = g.get("shared_state_locked", []) + [name]
+            pull_shared_state(name)
+
+
+@app.teardown_request
+def release_shared_state(exc=None):
+    for name in reversed(g.pop("shared_state_locked", [])):
+        _shared_state_locks[name].release()
+
+
 # ── Odds history persistence ──────────────────────────────────────────────────
 
 def save_odds_history():
@@ -467,6 +688,7 @@ def load_odds_history():
             if result.data:
                 odds_api.odds_history.clear()
                 odds_api.odds_history.update(result.data[0]['value'])
+                odds_api.rebuild_indexes()
                 print(f"{datetime.datetime.now()} - Loaded odds_history from Supabase ({len(odds_api.odds_history)} entries)")
             else:
                 print(f"{datetime.datetime.now()} - No odds_history found in Supabase, starting empty")
@@ -485,6 +707,7 @@ def _load_odds_history_from_file():
                 data = json.load(f)
             odds_api.odds_history.clear()
             odds_api.odds_history.update(data)
+            odds_api.rebuild_indexes()
             print(f"{datetime.datetime.now()} - Loaded odds_history from {filepath} ({len(odds_api.odds_history)} entries)")
         else:
             print(f"{datetime.datetime.now()} - No odds_history file found, starting empty")
@@ -492,6 +715,66 @@ def _load_odds_history_from_file():
         print(f"{datetime.datetime.now()} - Error loading odds_history from file: {e}")
 
 
+def save_odds_movement():
+    """Save the line-movement store to Supabase (preferred) or local file."""
+    data = odds_movement.export()
+    if USE_SUPABASE:
+        try:
+            supabase_client.table('app_data').upsert({
+                'key': 'odds_movement',
+                'value': data,
+                'updated_at': datetime.datetime.now(datetime.UTC).isoformat()
+            }).execute()
+            print(f"{datetime.datetime.now()} - Saved odds_movement to Supabase ({len(data)} events)")
+        except Exception as e:
+            print(f"{datetime.datetime.now()} - Error saving odds_movement to Supabase: {e}, falling back to file")
+            _save_odds_movement_to_file(data)
+    else:
+        _save_odds_movement_to_file(data)
+
+
+def _save_odds_movement_to_file(data):
+    try:
+        filepath = DATA_DIR / 'odds_movement.json'
+        tmp = filepath.with_suffix('.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, filepath)
+        print(f"{datetime.datetime.now()} - Saved odds_movement to {filepath} ({len(data)} events)")
+    except Exception as e:
+        print(f"{datetime.datetime.now()} - Error saving odds_movement to file: {e}")
+
+
+def load_odds_movement():
+    """Load the line-movement store from Supabase (preferred) or local file."""
+    if USE_SUPABASE:
+        try:
+            result = supabase_client.table('app_data').select('value').eq('key', 'odds_movement').execute()
+            if result.data:
+                odds_movement.load(result.data[0]['value'])
+                print(f"{datetime.datetime.now()} - Loaded odds_movement from Supabase ({len(odds_movement.odds_movement)} events)")
+            else:
+                print(f"{datetime.datetime.now()} - No odds_movement found in Supabase, starting empty")
+        except Exception as e:
+            print(f"{datetime.datetime.now()} - Error loading odds_movement from Supabase: {e}, falling back to file")
+            _load_odds_movement_from_file()
+    else:
+        _load_odds_movement_from_file()
+
+
+def _load_odds_movement_from_file():
+    try:
+        filepath = DATA_DIR / 'odds_movement.json'
+        if filepath.exists():
+            with open(filepath, 'r') as f:
+                odds_movement.load(json.load(f))
+            print(f"{datetime.datetime.now()} - Loaded odds_movement from {filepath} ({len(odds_movement.odds_movement)} events)")
+        else:
+            print(f"{datetime.datetime.now()} - No odds_movement file found, starting empty")
+    except Exception as e:
+        print(f"{datetime.datetime.now()} - Error loading odds_movement from file: {e}")
+
+
 # Global variables to track the last update times
 last_players_update = None
 last_rankings_update = None
@@ -584,10 +867,40 @@ TEAM_SCHEDULES_2025 = {
 # Global variable to track the startup time
 startup_time = datetime.datetime.now()
 
-# Global dictionary to track request counts per endpoint
-request_statistics = {
-    "endpoints": {}  # Tracks request counts per endpoint
-}
+
+
+def _dfs_salaries_stats():
+    """Entry count plus the weeks and dates present in dfs_salaries_data."""
+    weeks = {p.get("week") for p in dfs_salaries_data.values() if p.get("week")}
+    dates = {p.get("date") for p in dfs_salaries_data.values() if p.get("date")}
+    return {"entries": len(dfs_salaries_data), "weeks": sorted(weeks), "dates": sorted(dates)}
+
+
+# Dataset gauges for /statistics and /metrics, recomputed only when the dataset version moves
+metrics.register_dataset("players", lambda: http_cache.stamp("players"),
+                         lambda: {"entries": len(filtered_players)})
+metrics.register_dataset("fantasy_points", lambda: http_cache.stamp("fantasy_points"),
+                         lambda: {"entries": len(fantasy_points_data)})
+metrics.register_dataset("dfs_salaries", lambda: http_cache.stamp("dfs_salaries"), _dfs_salaries_stats)
+metrics.register_dataset("picks", lambda: http_cache.stamp("picks"),
+                         lambda: {"entries": len(picks_data)})
+metrics.register_dataset("nflverse", lambda: nflverse_stats.nflverse_version, lambda: {
+    "entries": len(nflverse_stats.nflverse_player_stats), "version": nflverse_stats.nflverse_version,
+})
+metrics.register_dataset("odds", lambda: odds_api.odds_version, lambda: {
+    "entries": len(odds_api.odds_games), "props": len(odds_api.odds_props), "version": odds_api.odds_version,
+})
+
+# Bulk exports (/export/<name>.ndjson|arrow|parquet), one row per entry
+routes_export.register("fantasy_points", lambda: http_cache.version("fantasy_points"),
+                       lambda: list(fantasy_points_data.values()))
+routes_export.register("dfs_salaries", lambda: http_cache.version("dfs_salaries"),
+                       lambda: list(dfs_salaries_data.values()))
+
+# Change feed (/changes): refreshes call changefeed.record() after bumping
+changefeed.track("players", lambda: filtered_players)
+changefeed.track("teams", lambda: teams_data)
+changefeed.track("dfs_salaries", lambda: dfs_salaries_data)
 
 
 def get_nfl_gameweek(date):
@@ -835,6 +1148,7 @@ def update_fantasy_points_data():
                         print(f"No Sleeper ID found for: {player_name} ({position})")
         
         # Update timestamp
+        http_cache.bump("fantasy_points")
         last_fantasy_points_update = datetime.datetime.now()
         print(f"Fantasy points updated at {last_fantasy_points_update}")
         print(f"Total fantasy points entries: {len(fantasy_points_data)}")
@@ -862,16 +1176,14 @@ def update_dfs_salaries_data():
         return
     
     try:
-        # Initialize DFF scraper
-        scraper = DFFSalariesScraper()
-        
         # Get current date for slate detection
         today = datetime.datetime.now().strftime("%Y-%m-%d")
         print(f"Fetching DFS salaries for date: {today}")
         print(f"all_players count: {len(all_players)}")
         
         # Scrape DFF projections with Sleeper ID matching (use all_players, not filtered_players)
-        parsed_salaries = scraper.get_salaries_with_sleeper_ids(all_players, date=today)
+        # Runs in a worker process when REFRESH_IN_WORKER is set
+        parsed_salaries = workers.run_job(scrape_salaries_with_sleeper_ids, all_players, today)
         
         if not parsed_salaries:
             print(f"No DFS salary data scraped for {today}. Aborting DFS salaries update.")
@@ -980,6 +1292,8 @@ def update_dfs_salaries_data():
                 print(f"  ... and {len(salary_differences) - 20} more differences")
             print(f"Total salary differences: {len(salary_differences)} (salaries NOT updated in scheduled run)")
         
+        http_cache.bump("dfs_salaries")
+        changefeed.record("dfs_salaries")
         last_dfs_salaries_update = datetime.datetime.now()
         
         # Count matched players (those with numeric sleeper_id, not player name)
@@ -1159,6 +1473,8 @@ def fetch_and_filter_data():
 
     # Update the last players update timestamp
     last_players_update = datetime.datetime.now()
+    http_cache.bump("players")
+    changefeed.record("players", "teams")
     print(f"Players updated at {last_players_update}")
 
     if scraped_ranks:
@@ -1216,6 +1532,8 @@ def update_players_with_old_data():
         else:
             print(f"No match found for Sleeper ID: {sleeper_id}")
 
+    http_cache.bump("players")
+    changefeed.record("players")
     print(f"{datetime.datetime.now()} - Finished updating filtered_players with old data.")
 
 
@@ -1231,15 +1549,15 @@ def update_filtered_players_with_scraped_data():
     else:
         print("Scraping data from KTC and FantasyCalc...")
         tep_level = 1  # TEP adjustment level (0=none, 1=standard, 2=high, 3=very high)
-        ktc_players = scrape_ktc()
-        ktc_players = scrape_fantasy_calc(ktc_players)
-        adjusted_players = tep_adjust(ktc_players, tep_level)
+        # Runs in a worker process when REFRESH_IN_WORKER is set
+        adjusted_players = workers.run_job(scrape_dynasty_ranks, tep_level)
 
     # Save scraped ranks as a dictionary with sleeper_id as the key
     scraped_ranks = {player["Sleeper ID"]: player for player in adjusted_players if "Sleeper ID" in player and player["Sleeper ID"] is not None}
     
     # Save picks data as a dictionary with pick_id as the key
     picks_data = {player["Pick ID"]: player for player in adjusted_players if "Pick ID" in player and player.get("Is Future Pick", False)}
+    http_cache.bump("picks")
 
     # Update filtered_players with the provided or scraped data
     for sleeper_id, player in scraped_ranks.items():
@@ -1276,6 +1594,8 @@ def update_filtered_players_with_scraped_data():
     last_rankings_update = datetime.datetime.now()
     print(f"Rankings updated at {last_rankings_update}")
 
+    http_cache.bump("players")
+    changefeed.record("players")
     print(f"{datetime.datetime.now()} - Finished updating filtered_players.")
 
 
@@ -1338,19 +1658,24 @@ scheduler.add_job(
     trigger=CronTrigger(day_of_week="wed", hour=19, minute=0)
 )
 
-# Schedule odds refresh: Thursday 10:00 UTC (props open) + Monday 10:00 UTC (post-week)
+# Odds refresh: the planner decides every few minutes whether game lines and/or
+# which events' props are stale enough (given kickoff proximity) and affordable
+# (given the credit balance) to re-fetch — see odds_planner.py
 def _refresh_odds():
-    odds_api.refresh_odds_data(ODDS_API_KEY)
+    plan = odds_planner.run_planned_refresh(ODDS_API_KEY)
+    if plan and plan.get("refresh_lines"):
+        save_odds_movement()
 
 scheduler.add_job(
     func=_refresh_odds,
-    trigger=CronTrigger(day_of_week="thu,mon", hour=10, minute=0)
+    trigger="interval",
+    minutes=odds_planner.PLAN_INTERVAL_MINUTES,
 )
 
 # Snapshot odds before each game window (Thu/Sun/Mon 12:00 UTC, 2h after refresh)
 def _snapshot_odds():
-    from routes_odds import _ou_eval
-    added = odds_api.snapshot_current_games(_ou_eval)
+    from routes_odds import games_view
+    added = odds_api.snapshot_current_games({g["event_id"]: g["ou_eval"] for g in games_view()})
     if added:
         save_odds_history()
         print(f"{datetime.datetime.now()} - Snapshotted {added} new games into odds_history")
@@ -1556,6 +1881,7 @@ def calculate_dfs_points_from_lineup(lineup_data, week, players_points=None):
         return 0.0
 
 
+@holds_shared_state("tinyurl_data")
 def clear_tinyurl_data():
     """Clear tinyurl_data entries for weeks that are older than the current week"""
     global tinyurl_data
@@ -1708,6 +2034,7 @@ def clear_tinyurl_data():
         save_tinyurl_data()  # Save even on fallback
         print(f"{datetime.datetime.now()} - TinyURL data cleared (fallback: all entries)")
 
+@holds_shared_state("tournament_data")
 def clear_tournament_data():
     """Clear tournament_data entries for weeks that are older than the current week (keep current week and all future weeks)"""
     global tournament_data
@@ -1794,10 +2121,146 @@ scheduler.add_job(
     trigger=CronTrigger(day_of_week="mon", hour=6, minute=0)   # Sunday + SNF results
 )
 
-scheduler.start()
+# Past seasons never change — only picks up a newly completed season (no-op otherwise)
+scheduler.add_job(
+    func=refresh_nflverse_history,
+    trigger=CronTrigger(day_of_week="tue", hour=6, minute=30)
+)
 
-# Ensure the scheduler is shut down when the app exits
-atexit.register(lambda: scheduler.shutdown())
+# ============================================================================
+# Shared snapshots (APP_ROLE=loader publishes, APP_ROLE=web follows)
+# ============================================================================
+
+# Module-level dicts and scalars that make up the "core" snapshot
+CORE_SNAPSHOT_DICTS = [
+    "filtered_players", "scraped_ranks", "teams_data", "picks_data",
+    "fantasy_points_data", "dfs_salaries_data",
+]
+CORE_SNAPSHOT_SCALARS = [
+    "current_nfl_week", "last_players_update", "last_rankings_update",
+    "last_fantasy_points_update", "last_dfs_salaries_update",
+]
+
+_published_versions = {}  # group → source version last published (loader)
+_loaded_versions = {}     # group → snapshot version last applied (web)
+
+
+def _core_snapshot():
+    return {
+        "dicts": {name: globals()[name] for name in CORE_SNAPSHOT_DICTS},
+        "scalars": {name: globals()[name] for name in CORE_SNAPSHOT_SCALARS},
+        "versions": dict(http_cache.dataset_versions),
+        "boot": http_cache.boot_id(),
+        "changes": changefeed.export_state(),
+    }
+
+
+def _snapshot_sources():
+    """group → (source version, build) for everything a web worker serves."""
+    return {
+        "core": (tuple(sorted(http_cache.dataset_versions.items())), _core_snapshot),
+        "nflverse": (nflverse_stats.nflverse_version, lambda: {
+            "snapshot": nflverse_stats.current_snapshot(),
+        }),
+        "odds": (odds_api.odds_version, lambda: {
+            "state": odds_api.export_state(),
+            "movement": odds_movement.export(),
+        }),
+    }
+
+
+def publish_snapshots():
+    """Loader: publish every snapshot group whose source changed since the last publish."""
+    for group, (source_version, build) in _snapshot_sources().items():
+        if _published_versions.get(group) == source_version:
+            continue
+        try:
+            version = snapshot_store.publish(group, build())
+        except Exception as e:
+            # e.g. a dict resized by a concurrent refresh while pickling; retried next tick
+            print(f"{datetime.datetime.now()} - Error publishing {group} snapshot: {e}")
+            continue
+        _published_versions[group] = source_version
+        _loaded_versions[group] = version   # our own data; the follower needn't apply it
+        print(f"{datetime.datetime.now()} - Published {group} snapshot {version}")
+
+
+def _apply_core(version, data):
+    # Rebind rather than clear()+update(): a request sees the old dict or the
+    # new one, never a half-filled one
+    globals().update({name: data["dicts"][name] for name in CORE_SNAPSHOT_DICTS})
+    globals().update(data["scalars"])
+    http_cache.adopt(data["versions"], data["boot"])
+    changefeed.load_state(data["changes"])
+
+
+# nflverse and odds take the snapshot version as their data version: the same in
+# every worker (same ETags and cache keys), and never reused by a restarted loader
+_history_season = 0      # season this node's history was last refreshed for (0: not yet)
+
+
+def _apply_nflverse(version, data):
+    global _history_season
+    nflverse_stats.publish_nflverse_snapshot(data["snapshot"], version)
+    # History lives in this node's DATA_DIR, which no snapshot carries. It only
+    # gains a season when the current one rolls over, so only check then; the
+    # download and Arrow build go through workers like any other refresh
+    season = nflverse_stats.nflverse_current_season
+    if season != _history_season:
+        refresh_nflverse_history(season)
+        _history_season = season
+
+
+def _apply_odds(version, data):
+    odds_api.load_state(data["state"], version)
+    odds_movement.load(data["movement"])
+
+
+def load_snapshots():
+    """Web: apply any snapshot group newer than the one last applied."""
+    for group, apply in (("core", _apply_core), ("nflverse", _apply_nflverse), ("odds", _apply_odds)):
+        loaded = snapshot_store.load(group, newer_than=_loaded_versions.get(group))
+        if loaded is None:
+            continue
+        version, data = loaded
+        apply(version, data)
+        _loaded_versions[group] = version
+        print(f"{datetime.datetime.now()} - Loaded {group} snapshot {version}")
+
+
+def start_snapshot_follower():
+    """Web: poll the snapshot store in a daemon thread."""
+    import threading
+    import time
+
+    def _follow():
+        while True:
+            try:
+                load_snapshots()
+            except Exception as e:
+                print(f"{datetime.datetime.now()} - Error loading snapshots: {e}")
+            time.sleep(SNAPSHOT_POLL_SECONDS)
+
+    threading.Thread(target=_follow, daemon=True).start()
+
+
+if APP_ROLE in ("all", "loader"):
+    if APP_ROLE == "loader" or leader_elector is not None:
+        scheduler.add_job(func=publish_snapshots, trigger="interval", seconds=SNAPSHOT_PUBLISH_SECONDS)
+    if leader_elector is not None:
+        scheduler.add_job(func=persist_shared_state, trigger="interval", seconds=SHARED_STATE_PERSIST_SECONDS)
+        # Every node schedules the jobs, but only the leader's scheduler runs;
+        # the others stay paused and follow its snapshots, ready to take over
+        leader_elector.tick()
+        scheduler.start(paused=not leader_elector.is_leader)
+        leader_elector.start(on_change=lambda leader: scheduler.resume() if leader else scheduler.pause())
+        atexit.register(leader_elector.resign)
+        start_snapshot_follower()
+    else:
+        scheduler.start()
+
+    # Ensure the scheduler is shut down when the app exits
+    atexit.register(lambda: scheduler.shutdown())
 
 
 @app.route('/getplayers', methods=['POST'])
@@ -1847,6 +2310,22 @@ def get_bestball_players():
 
     return jsonify({"players": players_data})
 
+def _bulk_response(name, data):
+    """
+    A keyed dataset as a cached JSON body: whole, or narrowed by fields= and
+    paged by page_size= / cursor= (see pagination.py).
+    """
+    query = pagination.parse(request.args)
+    version = http_cache.stamp(name)
+    if not query.active:
+        return http_cache.json_response((name, version), lambda: data)
+    keys, next_cursor = pagination.page_keys(query, pagination.sorted_keys(name, version, data))
+    response = http_cache.json_response(
+        (name, version, *query.key), lambda: pagination.project_dict(data, keys, query.fields)
+    )
+    return pagination.with_next_cursor(response, next_cursor)
+
+
 @app.route('/getplayers/data', methods=['POST'])
 def get_all_players():
     """
@@ -1856,12 +2335,16 @@ def get_all_players():
     Request Body:
         {
             "playerlist": [12345, 67890, ...],
-            "include_picks": true/false (optional, defaults to false)
+            "include_picks": true/false (optional, defaults to false),
+            "fields": ["name", "position", ...] (optional, see pagination.py)
         }
 
+    Query Parameters:
+        fields, page_size, cursor (optional): projection and paging over playerlist (see pagination.py)
+
     Returns:
         JSON response containing the filtered players matching the Sleeper IDs.
-        If include_picks is true, also includes draft picks.
+        If include_picks is true, also includes draft picks (on the last page).
     """
     request_data = request.json
     player_ids = request_data.get("playerlist", [])
@@ -1870,20 +2353,44 @@ def get_all_players():
     if not isinstance(player_ids, list):
         return jsonify({"error": "Invalid player_list format. Must be a list of Sleeper IDs."}), 400
 
+    query = pagination.parse(request.args, request_data.get("fields"))
+    page, next_cursor = pagination.page_rows(query, player_ids, None)
+
     # Filter players based on the provided Sleeper IDs
-    players_info = {
-        pid: filtered_players.get(pid)
-        for pid in player_ids if pid in filtered_players
-    }
+    players_info = pagination.project_dict(filtered_players, page, query.fields)
 
     # Add picks if requested
-    if include_picks:
+    if include_picks and next_cursor is None:
         # Add all picks to the response
-        players_info.update(picks_data)
+        players_info.update(pagination.project_dict(picks_data, list(picks_data), query.fields))
+
+    return pagination.with_next_cursor(jsonify(players_info), next_cursor), 200
+
+@app.route('/changes', methods=['GET'])
+def get_changes():
+    """
+    Incremental sync of filtered_players, teams_data and DFS salaries (see changefeed.py).
+
+    Query Parameters:
+        since (optional): the "version" of the client's last /changes response.
+            Omitted, too old or from before a restart → a full snapshot.
+
+    Returns:
+        JSON {"version", "full", "changes": {"players"|"teams"|"dfs_salaries": {key: changed fields}},
+        "removed": {dataset: [keys]}}. Apply removed, then merge changes; replace everything when full.
+    """
+    since = request.args.get("since")
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({"error": "since must be an integer version"}), 400
+    return http_cache.cached_json(http_cache.etag("changes", changefeed.version(), since),
+                                  lambda: jsonify(changefeed.changes(since)))
 
-    return jsonify(players_info), 200
 
 @app.route('/picks/data', methods=['GET'])
+@http_cache.versioned(lambda: ("picks", http_cache.version("picks")))
 def get_all_picks():
     """
     Endpoint to return all draft picks data.
@@ -1891,18 +2398,22 @@ def get_all_picks():
     Returns:
         JSON response containing all draft picks with their values and metadata.
     """
-    return jsonify(picks_data), 200
+    return http_cache.json_response(("picks", http_cache.version("picks")), lambda: picks_data)
 
 
 @app.route('/fantasy-points/data', methods=['GET'])
+@http_cache.versioned(lambda: ("fantasy_points", http_cache.version("fantasy_points")))
 def get_fantasy_points_data():
     """
     Endpoint to return all fantasy points data.
 
+    Query Parameters:
+        fields, page_size, cursor (optional): projection and paging in key order (see pagination.py)
+
     Returns:
         JSON response containing fantasy points data with Sleeper IDs.
     """
-    return jsonify(fantasy_points_data), 200
+    return _bulk_response("fantasy_points", fantasy_points_data)
 
 
 @app.route('/fantasy-points/week/<int:week>', methods=['GET'])
@@ -1948,6 +2459,7 @@ def get_teams():
 
 
 @app.route('/teams/schedules', methods=['GET'])
+@http_cache.versioned(lambda: ("team_schedules",), max_age=3600)
 def get_team_schedules():
     """
     Endpoint to return the 2025 NFL team schedules.
@@ -1955,7 +2467,7 @@ def get_team_schedules():
     Returns:
         JSON response containing the team schedules for 2025.
     """
-    return jsonify(TEAM_SCHEDULES_2025), 200
+    return http_cache.json_response(("team_schedules",), lambda: TEAM_SCHEDULES_2025)
 
 
 @app.route('/statistics', methods=['GET'])
@@ -1964,9 +2476,10 @@ def get_statistics():
     Endpoint to return request statistics.
 
     Returns:
-        JSON response containing uptime, request counts per endpoint, and average requests per day.
+        JSON response containing uptime, request counts per endpoint, average requests per day,
+        per-endpoint latency (ms) and response size percentiles, upstream call timings and dataset sizes.
     """
-    global request_statistics, startup_time, last_players_update, last_rankings_update, last_fantasy_points_update, last_dfs_salaries_update, dfs_salaries_data
+    global startup_time, last_players_update, last_rankings_update, last_fantasy_points_update, last_dfs_salaries_update
 
     try:
         # Calculate uptime
@@ -1974,7 +2487,9 @@ def get_statistics():
         uptime = current_time - startup_time
 
         # Calculate the total number of requests
-        total_requests = sum(request_statistics["endpoints"].values())
+        collected = metrics.collect()
+        requests_per_endpoint = metrics.counter_totals("http_requests_total", "endpoint", collected)
+        total_requests = sum(requests_per_endpoint.values())
 
         # Calculate the number of days since startup
         days_since_startup = max(uptime.days + 1, 1)  # Add 1 to avoid division by zero
@@ -1982,43 +2497,34 @@ def get_statistics():
         # Calculate the average requests per day
         average_requests_per_day = total_requests / days_since_startup
 
-        # Count DFS salaries entries
-        total_dfs_salaries = len(dfs_salaries_data)
-        
-        # Get weeks and dates from DFS data
-        dfs_weeks = set()
-        dfs_dates = set()
-        if dfs_salaries_data:
-            for player_data in dfs_salaries_data.values():
-                week = player_data.get("week")
-                date = player_data.get("date")
-                if week:
-                    dfs_weeks.add(week)
-                if date:
-                    dfs_dates.add(date)
-        
+        # Dataset sizes (and DFS weeks/dates), maintained per dataset version
+        datasets = metrics.dataset_stats()
+        dfs_stats = datasets["dfs_salaries"]
+
         # Prepare the response
         response = {
             "uptime": str(uptime),  # Format uptime as a string
             "total_requests": total_requests,
             "average_requests_per_day": average_requests_per_day,
-            "requests_per_endpoint": request_statistics["endpoints"],
-            "total_dfs_salaries": total_dfs_salaries,
-            "dfs_salaries_weeks": sorted(list(dfs_weeks)) if dfs_weeks else [],
-            "dfs_salaries_dates": sorted(list(dfs_dates)) if dfs_dates else [],
+            "requests_per_endpoint": requests_per_endpoint,
+            "latency_ms": metrics.summary("http_request_duration_seconds", "endpoint", collected, scale=1000),
+            "response_bytes": metrics.summary("http_response_size_bytes", "endpoint", collected),
+            "upstream_ms": metrics.summary("upstream_request_duration_seconds", "host", collected, scale=1000),
+            "datasets": {name: {k: v for k, v in stats.items() if not isinstance(v, list)}
+                         for name, stats in datasets.items()},
+            "total_dfs_salaries": dfs_stats["entries"],
+            "dfs_salaries_weeks": dfs_stats["weeks"],
+            "dfs_salaries_dates": dfs_stats["dates"],
             "last_players_update": str(last_players_update) if last_players_update else "Never",
             "last_rankings_update": str(last_rankings_update) if last_rankings_update else "Never",
             "last_fantasy_points_update": str(last_fantasy_points_update) if last_fantasy_points_update else "Never",
-            "last_dfs_salaries_update": str(last_dfs_salaries_update) if last_dfs_salaries_update else "Never"
+            "last_dfs_salaries_update": str(last_dfs_salaries_update) if last_dfs_salaries_update else "Never",
+            "app_role": APP_ROLE,
+            "snapshot_versions": _loaded_versions,
+            "shared_backend": shared_backend.backend is not None,
+            "leader": is_leader() if APP_ROLE != "web" else False,
         }
 
-        # Filter valid endpoints
-        valid_endpoints = {
-            str(key): int(value) for key, value in request_statistics["endpoints"].items()
-            if isinstance(key, str) and isinstance(value, int)
-        }
-        response["requests_per_endpoint"] = valid_endpoints
-
         return jsonify(response), 200
 
     except Exception as e:
@@ -2029,6 +2535,17 @@ def get_statistics():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Request, upstream and dataset metrics in the Prometheus text format.
+
+    Returns:
+        text/plain exposition (version 0.0.4) for a Prometheus scrape job.
+    """
+    return metrics.render_prometheus(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+
 @app.route('/currentweek', methods=['GET'])
 def get_current_week():
     """
@@ -2142,6 +2659,7 @@ def update_fantasy_points_for_week(week):
                     else:
                         print(f"No Sleeper ID found for: {player_name} ({position})")
         
+        http_cache.bump("fantasy_points")
         print(f"Fantasy points updated for week {week} at {datetime.datetime.now()}")
         print(f"Updated {players_updated} players for week {week}")
         print(f"Total fantasy points entries: {len(fantasy_points_data)}")
@@ -2158,14 +2676,18 @@ def update_fantasy_points_for_week(week):
 
 
 @app.route('/dfs-salaries/data', methods=['GET'])
+@http_cache.versioned(lambda: ("dfs_salaries", http_cache.version("dfs_salaries")))
 def get_dfs_salaries_data():
     """
     Endpoint to return all DFS salaries data.
 
+    Query Parameters:
+        fields, page_size, cursor (optional): projection and paging in key order (see pagination.py)
+
     Returns:
         JSON response containing DFS salaries data with Sleeper IDs.
     """
-    return jsonify(dfs_salaries_data), 200
+    return _bulk_response("dfs_salaries", dfs_salaries_data)
 
 
 @app.route('/dfs-salaries/player/<sleeper_id>', methods=['GET'])
@@ -2401,6 +2923,8 @@ def admin_scrape_specific_slate():
                 added_count += 1
             
             dfs_salaries_data[key] = player_with_date
+        http_cache.bump("dfs_salaries")
+        changefeed.record("dfs_salaries")
         
         # Log salary differences
         if salary_differences:
@@ -2505,6 +3029,8 @@ def admin_add_test_data():
         
         # Add to dfs_salaries_data
         dfs_salaries_data[key] = player_data
+        http_cache.bump("dfs_salaries")
+        changefeed.record("dfs_salaries")
         
         return jsonify({
             "message": f"Test data added successfully for {key}",
@@ -4522,7 +5048,12 @@ def initialize_data_in_background():
         print(f"{datetime.datetime.now()} - Persistence: USE_GIST={USE_GIST}, GIST_ID={gist_mask}")
         load_tinyurl_data()
         load_tournament_data()
-        
+
+        if not is_leader():
+            print(f"{datetime.datetime.now()} - Not the leader ({leader_elector.node_id}); serving the leader's snapshots")
+            refresh_nflverse_history()    # per-node files; see _apply_nflverse
+            return
+
         # 1. Fetch and filter player data
         print(f"{datetime.datetime.now()} - Fetching and filtering player data...")
         fetch_and_filter_data()
@@ -4537,18 +5068,26 @@ def initialize_data_in_background():
         update_dfs_salaries_data()
 
         # 4. Load nflverse player/team/schedule stats
-        # Force GC before the memory-intensive nflverse download so freed heap
-        # space from KTC/DFS scraping is reused rather than growing RSS further.
-        import gc
-        gc.collect()
-        gc.collect()
+        # Without worker processes, force GC before the memory-intensive nflverse
+        # download so freed heap space from KTC/DFS scraping is reused rather than
+        # growing RSS further. Worker processes hand their memory back on exit.
+        if not workers.USE_WORKER_PROCESSES:
+            import gc
+            gc.collect()
+            gc.collect()
         print(f"{datetime.datetime.now()} - Loading nflverse stats data...")
         refresh_nflverse_data()
+        refresh_nflverse_history()
 
         # 5. Load betting odds + history
         print(f"{datetime.datetime.now()} - Loading odds data...")
+        load_odds_movement()   # before the refresh so its quotes append to the stored series
         odds_api.refresh_odds_data(ODDS_API_KEY)
         load_odds_history()
+        save_odds_movement()
+
+        if APP_ROLE == "loader" or leader_elector is not None:
+            publish_snapshots()
 
         print(f"{datetime.datetime.now()} - Background data initialization completed!")
     
@@ -4558,6 +5097,26 @@ def initialize_data_in_background():
     print(f"{datetime.datetime.now()} - Flask app starting, data initialization running in background...")
 
 
+def start_web_role():
+    """
+    APP_ROLE=web: load the persisted TinyURL/Tournament state and follow the
+    loader's snapshots instead of scraping.
+    """
+    import threading
+
+    def _load_persisted():
+        load_tinyurl_data()
+        load_tournament_data()
+
+    threading.Thread(target=_load_persisted, daemon=True).start()
+    start_snapshot_follower()
+    print(f"{datetime.datetime.now()} - Web role: following snapshots in {'the shared backend' if shared_backend.backend else snapshot_store.SNAPSHOT_DIR}")
+
+
+if APP_ROLE == "web":
+    start_web_role()
+
+
 if __name__ == '__main__':
     # 1. Parse command-line arguments
     parser = argparse.ArgumentParser(description="Run NFL Fantasy Helper")
@@ -4571,8 +5130,9 @@ if __name__ == '__main__':
     # 3. Start Flask app immediately
     port = int(os.environ.get("PORT", 5000))  # Default to port 5000 if not set
     
-    # 4. Initialize data in background thread (non-blocking)
-    initialize_data_in_background()
+    # 4. Initialize data in background thread (non-blocking); web workers follow snapshots instead
+    if APP_ROLE != "web":
+        initialize_data_in_background()
     
     # 5. Run the Flask app (this will block, but app is already listening)
     app.run(host='0.0.0.0', port=port)
@@ -0,0 +1,165 @@
+"""
+nflverse_cache.py — on-disk Parquet cache for nflverse downloads.
+
+Each dataset/season is stored as DATA_DIR/nflverse/<dataset>_<season>.parquet
+with a small JSON sidecar recording the upstream ETag/Last-Modified stamp and
+when it was fetched and last checked. A refresh only re-downloads a file when
+the upstream stamp has changed; historic seasons never change, so a file
+fetched (or confirmed unchanged upstream) after its season ended is marked
+season_complete and from then on served from disk without touching the
+network. A file cached while its season was still running is checked like
+any other until then.
+
+On Koyeb the filesystem is ephemeral, so the cache only helps within one
+deployment — but that still covers every scheduled refresh and warm restarts.
+Any cache failure falls back to the plain in-memory loader result.
+"""
+
+import json
+import logging
+import os
+import datetime
+from pathlib import Path
+
+import polars as pl
+import requests
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR  = Path(os.environ.get("DATA_DIR", "./data"))
+CACHE_DIR = DATA_DIR / "nflverse"
+
+# Skip the upstream check if we already checked within this many seconds
+# (covers restarts; the Tue/Fri/Mon refreshes are days apart and always check).
+CHECK_INTERVAL_SECONDS = int(os.environ.get("NFLVERSE_CACHE_CHECK_SECONDS", 3600))
+
+# Same release URLs nflreadpy downloads from
+_BASE_URLS = {
+    "nflverse-data": "https://github.com/nflverse/nflverse-data/releases/download/",
+    "ffopportunity": "https://github.com/ffverse/ffopportunity/releases/download/",
+}
+
+# dataset → (repository, path template); "{season}"-less paths hold every season
+DATASETS = {
+    "rosters":        ("nflverse-data", "rosters/roster_{season}"),
+    "player_stats":   ("nflverse-data", "stats_player/stats_player_week_{season}"),
+    "team_stats":     ("nflverse-data", "stats_team/stats_team_week_{season}"),
+    "snap_counts":    ("nflverse-data", "snap_counts/snap_counts_{season}"),
+    "ff_opportunity": ("ffopportunity", "latest-data/ep_weekly_{season}"),
+    "schedules":      ("nflverse-data", "schedules/games"),
+}
+
+
+def dataset_url(dataset: str, season: int) -> str:
+    repo, path = DATASETS[dataset]
+    return f"{_BASE_URLS[repo]}{path.format(season=season)}.parquet"
+
+
+def _paths(dataset: str, season: int) -> tuple[Path, Path]:
+    stem = f"{dataset}_{season}"
+    return CACHE_DIR / f"{stem}.parquet", CACHE_DIR / f"{stem}.json"
+
+
+def _read_meta(meta_path: Path) -> dict:
+    try:
+        with open(meta_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(meta_path: Path, meta: dict) -> None:
+    tmp = meta_path.with_suffix(".json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+
+
+def _upstream_stamp(url: str) -> str | None:
+    """ETag (or Last-Modified) of the upstream file; None if it can't be determined."""
+    try:
+        resp = requests.head(url, allow_redirects=True, timeout=15)
+        if resp.status_code != 200:
+            return None
+        return resp.headers.get("ETag") or resp.headers.get("Last-Modified")
+    except requests.exceptions.RequestException:
+        return None
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.UTC)
+
+
+def _parse_time(value: str) -> datetime.datetime:
+    # Sidecars written before timestamps carried an offset are naive UTC
+    parsed = datetime.datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.UTC)
+
+
+def cached_scan(dataset: str, season: int, loader, permanent: bool = False) -> pl.LazyFrame:
+    """
+    Return a lazy scan of dataset/season, downloading via loader() only when needed.
+
+    loader:    zero-arg callable returning the full Polars DataFrame (an nflreadpy loader)
+    permanent: historic season — a copy fetched after the season ended is served
+               without any upstream check
+    """
+    parquet_path, meta_path = _paths(dataset, season)
+    meta = _read_meta(meta_path) if parquet_path.exists() else {}
+
+    if meta:
+        if permanent and meta.get("season_complete"):
+            return pl.scan_parquet(parquet_path)
+        checked_at = meta.get("checked_at")
+        if checked_at:
+            age = (_now() - _parse_time(checked_at)).total_seconds()
+            if age < CHECK_INTERVAL_SECONDS:
+                return pl.scan_parquet(parquet_path)
+
+    stamp = None if permanent and not meta else _upstream_stamp(dataset_url(dataset, season))
+    if meta and (stamp is None or stamp == meta.get("stamp")):
+        # Unchanged upstream (or upstream unreachable) — keep serving the cached file
+        meta["checked_at"] = _now().isoformat()
+        if permanent and stamp is not None:
+            meta["season_complete"] = True
+        try:
+            _write_meta(meta_path, meta)
+        except OSError:
+            pass
+        logger.info("nflverse cache: %s %d unchanged, using disk copy", dataset, season)
+        return pl.scan_parquet(parquet_path)
+
+    df = loader()
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = parquet_path.with_suffix(".parquet.tmp")
+        df.write_parquet(tmp)
+        os.replace(tmp, parquet_path)
+        now = _now().isoformat()
+        _write_meta(meta_path, {
+            "url":        dataset_url(dataset, season),
+            "stamp":      stamp,
+            "rows":       df.height,
+            "fetched_at": now,
+            "checked_at": now,
+            "season_complete": permanent,
+        })
+    except OSError as e:
+        logger.warning("nflverse cache: could not write %s %d (%s), using in-memory copy", dataset, season, e)
+        return df.lazy()
+
+    logger.info("nflverse cache: stored %s %d (%d rows)", dataset, season, df.height)
+    del df
+    return pl.scan_parquet(parquet_path)
+
+
+def cache_status() -> list[dict]:
+    """Sidecar metadata for every cached file (for /stats/status)."""
+    if not CACHE_DIR.exists():
+        return []
+    entries = []
+    for meta_path in sorted(CACHE_DIR.glob("*.json")):
+        meta = _read_meta(meta_path)
+        if meta:
+            entries.append({"file": meta_path.stem, **meta})
+    return entries
@@ -0,0 +1,137 @@
+"""
+nflverse_history.py — multi-season nflverse history in memory-mapped Arrow files.
+
+nflverse_stats keeps only the latest REG season in Python dicts. Older seasons
+are written once to uncompressed Arrow IPC (Feather v2) files under
+DATA_DIR/nflverse_history and read back with memory_map=True, so a query only
+pages in the rows it touches and resident memory does not grow with the number
+of seasons kept. Per-query dicts are built with the same build_* functions the
+live pipeline uses, so a historic season looks exactly like the current one.
+
+Each season is downloaded and written through workers.run_job, so with
+REFRESH_IN_WORKER set the build runs in a child process and the calling (web)
+process only sees the finished files.
+"""
+
+import logging
+import os
+import functools
+from pathlib import Path
+
+import polars as pl
+import nflreadpy as nfl
+
+import nflverse_cache
+import nflverse_stats as ns
+import workers
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIR = nflverse_cache.DATA_DIR / "nflverse_history"
+
+# How many completed seasons (before the current one) to keep on disk
+HISTORY_SEASONS = int(os.environ.get("NFLVERSE_HISTORY_SEASONS", 3))
+
+TABLES = ("players", "teams", "schedule")
+
+
+def _path(table: str, season: int) -> Path:
+    return HISTORY_DIR / f"{table}_{season}.arrow"
+
+
+def _write(df: pl.DataFrame, path: Path) -> None:
+    tmp = path.with_suffix(f".arrow.{os.getpid()}.tmp")     # workers on one host may write at once
+    df.write_ipc(tmp, compression="uncompressed")   # uncompressed → mmappable
+    os.replace(tmp, path)
+
+
+def _read(table: str, season: int) -> pl.DataFrame:
+    return pl.read_ipc(_path(table, season), memory_map=True)
+
+
+def available_seasons() -> list[int]:
+    """Seasons with a complete set of history files, oldest first."""
+    if not HISTORY_DIR.exists():
+        return []
+    seasons = {int(p.stem.rsplit("_", 1)[1]) for p in HISTORY_DIR.glob("players_*.arrow")}
+    return sorted(s for s in seasons if all(_path(t, s).exists() for t in TABLES))
+
+
+# ── Writing ───────────────────────────────────────────────────────────────────
+
+def store_season(season: int) -> None:
+    """Download (via the Parquet cache) and persist one season's REG player, team and schedule tables."""
+    gsis_map, _ = ns.build_id_maps(season)
+
+    players = (
+        ns._scan(ns._load("player_stats", season, nfl.load_player_stats), ns._PLAYER_COLS, "season_type")
+        .filter(pl.col("position").is_in(list(ns.SKILL_POSITIONS)))
+        .with_columns(
+            pl.col("player_id").cast(pl.Utf8)
+            .replace_strict(gsis_map, default=None, return_dtype=pl.Utf8)
+            .alias("sleeper_id")
+        )
+        .collect()
+    )
+    teams    = ns._scan(ns._load("team_stats", season, nfl.load_team_stats), ns._TEAM_COLS, "season_type").collect()
+    schedule = ns._scan(ns._load("schedules", season, nfl.load_schedules), ns._SCHED_COLS, "game_type").collect()
+
+    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    # players last: its presence is what available_seasons() keys on
+    _write(teams, _path("teams", season))
+    _write(schedule, _path("schedule", season))
+    _write(players, _path("players", season))
+    logger.info("nflverse history: stored season %d (%d player rows)", season, players.height)
+
+
+def refresh_history(current_season: int | None = None) -> list[int]:
+    """
+    Make sure the last HISTORY_SEASONS completed seasons are on disk. Historic
+    seasons never change, so seasons already stored are skipped. Returns the
+    seasons written by this call.
+    """
+    current = current_season or ns.nflverse_current_season or ns._current_nfl_season()
+    have = set(available_seasons())
+    written = []
+    for season in range(current - HISTORY_SEASONS, current):
+        if season in have:
+            continue
+        try:
+            workers.run_job(store_season, season)
+            written.append(season)
+        except Exception:
+            logger.exception("nflverse history: failed to store season %d", season)
+    return written
+
+
+# ── Queries ───────────────────────────────────────────────────────────────────
+
+def get_player(sleeper_id: str, season: int) -> dict | None:
+    """Same shape as an nflverse_player_stats entry, for a stored season."""
+    if season not in available_seasons():
+        return None
+    rows = _read("players", season).filter(pl.col("sleeper_id") == str(sleeper_id))
+    if rows.is_empty():
+        return None
+    built = ns.build_player_stats_dict(rows, {gsis: str(sleeper_id) for gsis in rows["player_id"].unique()})
+    return built.get(str(sleeper_id))
+
+
+@functools.lru_cache(maxsize=4)
+def _season_teams(season: int, mtime: float) -> tuple[dict, dict]:
+    # 32 small dicts per season; the LRU bounds how many seasons stay resident
+    schedule = _read("schedule", season)
+    team_stats = ns.build_team_stats_dict(_read("teams", season), _read("players", season), schedule)
+    team_schedule, _, _ = ns.build_schedule_dicts(schedule)
+    return team_stats, team_schedule
+
+
+def get_team(team: str, season: int) -> dict | None:
+    """Same shape as /stats/team/<team> for a stored season (schedule = that season's final game)."""
+    if season not in available_seasons():
+        return None
+    team_stats, team_schedule = _season_teams(season, _path("players", season).stat().st_mtime)
+    stats = team_stats.get(team)
+    if not stats:
+        return None
+    return {**stats, "schedule": team_schedule.get(team, {})}
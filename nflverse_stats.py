@@ -2,14 +2,23 @@
 nflverse_stats.py — nflverse data pipeline using nflreadpy.
 
 All data is held in in-memory dicts, rebuilt on startup and refreshed weekly.
-No local files — Koyeb has an ephemeral filesystem.
+Raw downloads are cached as Parquet under DATA_DIR (see nflverse_cache), which
+only lives as long as the Koyeb instance but spares re-downloads on refresh.
+
+Builds run on (lazy) Polars frames straight from the loaders: only the needed
+columns and REG rows are ever materialised, and pandas is not involved.
 """
 
-import gc
+import contextlib
 import logging
 import datetime
-import pandas as pd
+import threading
+import polars as pl
 import nflreadpy as nfl
+from nflreadpy.config import get_config as nfl_get_config, update_config as nfl_update_config
+
+import nflverse_cache
+import workers
 
 logger = logging.getLogger(__name__)
 
@@ -35,9 +44,19 @@ nflverse_player_advanced: dict = {} # sleeper_id → snap% + expected points
 nflverse_team_stats: dict = {}      # team abbr → offensive + defensive aggregates
 nflverse_schedule: dict = {}        # team abbr → most-recent-week game info
 nflverse_games: dict = {}           # week (int) → list of game dicts
+nflverse_game_index: dict = {}      # (home, away, gameday) → game dict from nflverse_games
 nflverse_current_season: int | None = None
 nflverse_last_updated: str | None = None
 
+# Read-only views derived from the stores above; rebuilt by rebuild_views()
+# on every publish. nflverse_version increments each time so response caches
+# can key on it.
+nflverse_version: int = 0
+nflverse_week_index: dict = {}     # week (int) → {sleeper_id → name/position/team + week stats}
+nflverse_week_rankings: dict = {}  # week (int) → [sleeper_id, ...] by fantasy_points_ppr desc
+nflverse_leaderboards: dict = {}   # "all" → [row], "position"/"team" → {key: [row]}; rows by season ppr desc
+nflverse_projection_tables: dict = {}  # week (int) → {"all": [...], "position": {pos: [...]}, "team": {team: [...]}}
+
 
 # ── Season detection ──────────────────────────────────────────────────────────
 
@@ -50,7 +69,7 @@ def _current_nfl_season() -> int:
       Oct 2026  → 2026 (2026 season in progress)
       Jan 2027  → 2026 (2026 playoffs)
     """
-    now = datetime.datetime.utcnow()
+    now = datetime.datetime.now(datetime.UTC)
     return now.year - 1 if now.month < 9 else now.year
 
 
@@ -75,6 +94,67 @@ def _rolling_avg(weekly: list, n: int) -> dict:
     return result
 
 
+def _lazy(frame) -> pl.LazyFrame:
+    """Accept an eager or lazy Polars frame; always hand back a LazyFrame."""
+    return frame.lazy() if isinstance(frame, pl.DataFrame) else frame
+
+
+def _present(lf: pl.LazyFrame, cols) -> list[str]:
+    """Subset of cols that exist in lf, in the order given."""
+    names = set(lf.collect_schema().names())
+    return [c for c in cols if c in names]
+
+
+def _clean_floats(cols) -> list[pl.Expr]:
+    """Cast stat columns to Float64 with NaN/null → 0.0 (the _safe_float rule, vectorised)."""
+    return [pl.col(c).cast(pl.Float64).fill_nan(0.0).fill_null(0.0) for c in cols]
+
+
+_uncached_lock = threading.Lock()
+_uncached_depth = 0
+_saved_cache_mode = None
+
+
+@contextlib.contextmanager
+def _nflreadpy_uncached():
+    """
+    Turn nflreadpy's cache off for the downloads inside the block and restore
+    the caller's setting afterwards (once the last overlapping block exits).
+    Downloads are cached as Parquet on disk; nflreadpy's own in-memory cache
+    would just pin a second copy of every frame for 24h.
+    """
+    global _uncached_depth, _saved_cache_mode
+    with _uncached_lock:
+        if _uncached_depth == 0:
+            _saved_cache_mode = nfl_get_config().cache_mode
+            nfl_update_config(cache_mode="off")
+        _uncached_depth += 1
+    try:
+        yield
+    finally:
+        with _uncached_lock:
+            _uncached_depth -= 1
+            if _uncached_depth == 0:
+                nfl_update_config(cache_mode=_saved_cache_mode)
+
+
+def _load(dataset: str, season: int, loader) -> pl.LazyFrame:
+    """Loader result for one season via the on-disk Parquet cache (historic seasons never re-checked)."""
+    permanent = season < _current_nfl_season()
+
+    def download() -> pl.DataFrame:
+        with _nflreadpy_uncached():
+            return loader([season])
+
+    return nflverse_cache.cached_scan(dataset, season, download, permanent)
+
+
+def _latest_season(lf: pl.LazyFrame, type_col: str) -> int | None:
+    """Most recent season that has REG rows, or None if there are none."""
+    val = lf.filter(pl.col(type_col) == "REG").select(pl.col("season").max()).collect().item()
+    return None if val is None else int(val)
+
+
 # ── ID maps ───────────────────────────────────────────────────────────────────
 
 def build_id_maps(season: int) -> tuple[dict, dict]:
@@ -84,24 +164,25 @@ def build_id_maps(season: int) -> tuple[dict, dict]:
       pfr_map:  pfr_id   → sleeper_id  (used for snap_counts)
     Falls back to season-1 if the requested season isn't published yet.
     """
-    _ROSTER_COLS = {"week", "gsis_id", "sleeper_id", "pfr_id"}
+    _ROSTER_COLS = ["week", "gsis_id", "sleeper_id", "pfr_id"]
     try:
-        pl_df = nfl.load_rosters([season])
-        df = pl_df.select([c for c in _ROSTER_COLS if c in pl_df.columns]).to_pandas()
-        del pl_df
+        lf = _load("rosters", season, nfl.load_rosters)
     except Exception:
         logger.warning("rosters %d unavailable, falling back to %d", season, season - 1)
-        pl_df = nfl.load_rosters([season - 1])
-        df = pl_df.select([c for c in _ROSTER_COLS if c in pl_df.columns]).to_pandas()
-        del pl_df
+        lf = _load("rosters", season - 1, nfl.load_rosters)
 
     # One row per player per week — keep the most recent entry per gsis_id
-    df = df.sort_values("week").drop_duplicates("gsis_id", keep="last")
+    df = (
+        lf.select(_present(lf, _ROSTER_COLS))
+        .sort("week")
+        .unique("gsis_id", keep="last", maintain_order=True)
+        .collect()
+    )
 
     gsis_map, pfr_map = {}, {}
-    for _, row in df.iterrows():
+    for row in df.iter_rows(named=True):
         sleeper = row.get("sleeper_id")
-        if not sleeper or pd.isna(sleeper):
+        if sleeper is None or sleeper == "":
             continue
         try:
             sleeper_str = str(int(float(sleeper)))
@@ -109,11 +190,11 @@ def build_id_maps(season: int) -> tuple[dict, dict]:
             continue
 
         gsis = row.get("gsis_id")
-        if gsis and pd.notna(gsis):
+        if gsis:
             gsis_map[str(gsis)] = sleeper_str
 
         pfr = row.get("pfr_id")
-        if pfr and pd.notna(pfr):
+        if pfr:
             pfr_map[str(pfr)] = sleeper_str
 
     return gsis_map, pfr_map
@@ -121,57 +202,65 @@ def build_id_maps(season: int) -> tuple[dict, dict]:
 
 # ── Core player stats ─────────────────────────────────────────────────────────
 
-def build_player_stats_dict(df: pd.DataFrame, gsis_map: dict) -> dict:
+def build_player_stats_dict(df, gsis_map: dict) -> dict:
     """
-    Build nflverse_player_stats from a player_stats DataFrame.
+    Build nflverse_player_stats from a player_stats frame (eager or lazy Polars).
     Filters to REG season, most recent year, skill positions only.
     Keyed by sleeper_id.
     """
-    reg = df[df["season_type"] == "REG"].copy()
-    if reg.empty:
+    lf = _lazy(df)
+    latest_season = _latest_season(lf, "season_type")
+    if latest_season is None:
         logger.error("No REG season data in player_stats")
         return {}
 
-    latest_season = int(reg["season"].max())
-    reg = reg[(reg["season"] == latest_season) & reg["position"].isin(SKILL_POSITIONS)]
+    names     = lf.collect_schema().names()
+    team_col  = "team" if "team" in names else "recent_team"
+    stat_cols = [c for c in STAT_COLS if c in names]
+    meta_cols = _present(lf, ["player_display_name", "position", team_col, "headshot_url"])
 
-    result = {}
-    team_col = "team" if "team" in reg.columns else "recent_team"
+    frame = (
+        lf.filter(
+            (pl.col("season_type") == "REG")
+            & (pl.col("season") == latest_season)
+            & pl.col("position").is_in(list(SKILL_POSITIONS))
+        )
+        .select(["player_id", "week", *meta_cols, *stat_cols])
+        .with_columns(pl.col("player_id").cast(pl.Utf8), *_clean_floats(stat_cols))
+        .filter(pl.col("player_id").is_in(list(gsis_map)))
+        .sort(["player_id", "week"])
+        .collect()
+    )
 
-    for gsis_id, group in reg.groupby("player_id"):
-        sleeper_id = gsis_map.get(str(gsis_id))
-        if not sleeper_id:
-            continue
+    totals = frame.group_by("player_id", maintain_order=True).agg(
+        *[pl.col(c).first() for c in meta_cols],
+        *[pl.col(c).sum() if c in SUM_COLS else pl.col(c).mean() for c in stat_cols],
+    )
+
+    weekly_by_player: dict[str, list] = {}
+    for row in frame.select(["player_id", "week", *stat_cols]).iter_rows(named=True):
+        gsis_id = row.pop("player_id")
+        row["week"] = int(row["week"])
+        weekly_by_player.setdefault(gsis_id, []).append(row)
+
+    result = {}
+    for row in totals.iter_rows(named=True):
+        gsis_id = row["player_id"]
+        weekly  = weekly_by_player[gsis_id]
 
-        group_sorted = group.sort_values("week")
-        first = group_sorted.iloc[0]
-
-        weekly = []
-        for _, row in group_sorted.iterrows():
-            entry = {"week": int(row["week"])}
-            for col in STAT_COLS:
-                if col in row.index:
-                    entry[col] = _safe_float(row[col])
-            weekly.append(entry)
-
-        season_totals: dict = {}
-        for col in STAT_COLS:
-            if col not in reg.columns:
-                continue
-            if col in SUM_COLS:
-                season_totals[col] = round(_safe_float(group_sorted[col].sum()), 1)
-            else:
-                vals = [_safe_float(v) for v in group_sorted[col]]
-                season_totals[col] = round(sum(vals) / len(vals), 3) if vals else 0.0
+        season_totals: dict = {
+            col: round(row[col], 1) if col in SUM_COLS else round(row[col], 3)
+            for col in stat_cols
+        }
         season_totals["games_played"] = len(weekly)
 
-        result[sleeper_id] = {
-            "name": str(first.get("player_display_name", "") or ""),
-            "position": str(first.get("position", "") or ""),
-            "team": str(first.get(team_col, "") or ""),
-            "gsis_id": str(gsis_id),
+        result[gsis_map[gsis_id]] = {
+            "name": str(row.get("player_display_name") or ""),
+            "position": str(row.get("position") or ""),
+            "team": str(row.get(team_col) or ""),
+            "gsis_id": gsis_id,
             "season": latest_season,
-            "headshot_url": str(first.get("headshot_url", "") or ""),
+            "headshot_url": str(row.get("headshot_url") or ""),
             "season_totals": season_totals,
             "weekly": weekly,
             "rolling_3": _rolling_avg(weekly, 3),
@@ -183,12 +272,7 @@ def build_player_stats_dict(df: pd.DataFrame, gsis_map: dict) -> dict:
 
 # ── Advanced player stats (snap% + expected points) ──────────────────────────
 
-def build_player_advanced_dict(
-    snap_df: pd.DataFrame,
-    opp_df: pd.DataFrame,
-    gsis_map: dict,
-    pfr_map: dict,
-) -> dict:
+def build_player_advanced_dict(snap_df, opp_df, gsis_map: dict, pfr_map: dict) -> dict:
     """
     Build nflverse_player_advanced keyed by sleeper_id.
 
@@ -199,30 +283,39 @@ def build_player_advanced_dict(
     week_data: dict[str, dict[int, dict]] = {}
 
     # ── Snap counts ──
-    reg_snaps = snap_df[snap_df["game_type"] == "REG"] if "game_type" in snap_df.columns else snap_df
-    if "pfr_player_id" not in reg_snaps.columns:
-        reg_snaps = pd.DataFrame()
-    for pfr_id, group in (reg_snaps.groupby("pfr_player_id") if not reg_snaps.empty else []):
-        sleeper_id = pfr_map.get(str(pfr_id))
-        if not sleeper_id:
-            continue
-        week_data.setdefault(sleeper_id, {})
-        for _, row in group.iterrows():
+    snaps = _lazy(snap_df)
+    snap_names = snaps.collect_schema().names()
+    if "pfr_player_id" in snap_names:
+        if "game_type" in snap_names:
+            snaps = snaps.filter(pl.col("game_type") == "REG")
+        snaps = (
+            snaps.select(_present(snaps, ["pfr_player_id", "week", "offense_pct"]))
+            .with_columns(pl.col("pfr_player_id").cast(pl.Utf8))
+            .filter(pl.col("pfr_player_id").is_in(list(pfr_map)))
+            .collect()
+        )
+        for row in snaps.iter_rows(named=True):
+            sleeper_id = pfr_map[row["pfr_player_id"]]
             week = int(row["week"])
-            week_data[sleeper_id].setdefault(week, {})
+            week_data.setdefault(sleeper_id, {}).setdefault(week, {})
             week_data[sleeper_id][week]["snap_pct"] = round(_safe_float(row.get("offense_pct")), 3)
 
     # ── FF opportunity (expected vs actual fantasy points) ──
-    if "player_id" not in opp_df.columns:
-        opp_df = pd.DataFrame()
-    for gsis_id, group in (opp_df.groupby("player_id") if not opp_df.empty else []):
-        sleeper_id = gsis_map.get(str(gsis_id))
-        if not sleeper_id:
-            continue
-        week_data.setdefault(sleeper_id, {})
-        for _, row in group.dropna(subset=["week"]).iterrows():
+    opp = _lazy(opp_df)
+    if "player_id" in opp.collect_schema().names():
+        opp = (
+            opp.select(_present(opp, [
+                "player_id", "week", "total_fantasy_points_exp",
+                "total_fantasy_points", "total_fantasy_points_diff",
+            ]))
+            .with_columns(pl.col("player_id").cast(pl.Utf8))
+            .filter(pl.col("week").is_not_null() & pl.col("player_id").is_in(list(gsis_map)))
+            .collect()
+        )
+        for row in opp.iter_rows(named=True):
+            sleeper_id = gsis_map[row["player_id"]]
             week = int(row["week"])
-            week_data[sleeper_id].setdefault(week, {})
+            week_data.setdefault(sleeper_id, {}).setdefault(week, {})
             week_data[sleeper_id][week].update({
                 "expected_fp": round(_safe_float(row.get("total_fantasy_points_exp")), 2),
                 "actual_fp":   round(_safe_float(row.get("total_fantasy_points")), 2),
@@ -230,96 +323,251 @@ def build_player_advanced_dict(
             })
 
     # ── Assemble final dict ──
-    result = {}
-    for sleeper_id, weeks in week_data.items():
-        weekly = [{"week": w, **data} for w, data in sorted(weeks.items())]
+    return {
+        sleeper_id: _advanced_entry([{"week": w, **data} for w, data in sorted(weeks.items())])
+        for sleeper_id, weeks in week_data.items()
+    }
 
-        snap_vals = [w["snap_pct"] for w in weekly if "snap_pct" in w]
-        exp_vals  = [w["expected_fp"] for w in weekly if "expected_fp" in w]
-        diff_vals = [w["fp_diff"] for w in weekly if "fp_diff" in w]
 
-        result[sleeper_id] = {
-            "snap_pct_avg":    round(sum(snap_vals) / len(snap_vals), 3) if snap_vals else None,
-            "expected_fp_avg": round(sum(exp_vals)  / len(exp_vals),  2) if exp_vals  else None,
-            "fp_diff_avg":     round(sum(diff_vals) / len(diff_vals), 2) if diff_vals else None,
+def _advanced_entry(weekly: list) -> dict:
+    snap_vals = [w["snap_pct"] for w in weekly if "snap_pct" in w]
+    exp_vals  = [w["expected_fp"] for w in weekly if "expected_fp" in w]
+    diff_vals = [w["fp_diff"] for w in weekly if "fp_diff" in w]
+
+    return {
+        "snap_pct_avg":    round(sum(snap_vals) / len(snap_vals), 3) if snap_vals else None,
+        "expected_fp_avg": round(sum(exp_vals)  / len(exp_vals),  2) if exp_vals  else None,
+        "fp_diff_avg":     round(sum(diff_vals) / len(diff_vals), 2) if diff_vals else None,
+        "weekly": weekly,
+    }
+
+
+# ── Incremental week updates ─────────────────────────────────────────────────
+
+def _week_fingerprints(df) -> dict[int, int]:
+    """week → order-independent hash of that week's rows; a changed value means changed rows."""
+    lf = _lazy(df)
+    fp = (
+        lf.select(pl.col("week").cast(pl.Int64), pl.struct(pl.all()).hash().alias("_h"))
+        .filter(pl.col("week").is_not_null())
+        .group_by("week").agg(pl.col("_h").sum())
+        .collect()
+    )
+    return {int(w): int(h) for w, h in fp.iter_rows()}
+
+
+def _changed_weeks(old: dict[int, int], new: dict[int, int]) -> set[int] | None:
+    """Weeks that are new or whose rows changed; None if a week disappeared (needs a full rebuild)."""
+    if set(old) - set(new):
+        return None
+    return {w for w, h in new.items() if old.get(w) != h}
+
+
+def _season_totals(weekly: list) -> dict:
+    """Same totals build_player_stats_dict produces, recomputed from a weekly array."""
+    totals: dict = {}
+    for col in STAT_COLS:
+        vals = [w[col] for w in weekly if col in w]
+        if not vals:
+            continue
+        totals[col] = round(sum(vals), 1) if col in SUM_COLS else round(sum(vals) / len(vals), 3)
+    totals["games_played"] = len(weekly)
+    return totals
+
+
+def _splice_weeks(old_weekly: list, new_weekly: list, weeks: set[int]) -> list:
+    kept = [w for w in old_weekly if w["week"] not in weeks]
+    return sorted(kept + new_weekly, key=lambda w: w["week"])
+
+
+def update_player_stats_weeks(existing: dict, df, gsis_map: dict, weeks: set[int]) -> dict:
+    """
+    Incremental counterpart of build_player_stats_dict: re-read only `weeks`
+    and splice them into the affected players' weekly arrays, recomputing their
+    season totals and rolling windows. Untouched players are shared with `existing`.
+    """
+    fresh = build_player_stats_dict(_lazy(df).filter(pl.col("week").is_in(sorted(weeks))), gsis_map)
+
+    touched = set(fresh) | {
+        sid for sid, p in existing.items()
+        if any(w["week"] in weeks for w in p["weekly"])
+    }
+    result = dict(existing)
+    for sid in touched:
+        old, new = existing.get(sid), fresh.get(sid)
+        weekly = _splice_weeks(old["weekly"] if old else [], new["weekly"] if new else [], weeks)
+        if not weekly:
+            result.pop(sid, None)
+            continue
+        # Name/position/team come from the player's earliest week, as in a full build
+        base = new if new and (not old or new["weekly"][0]["week"] == weekly[0]["week"]) else old
+        result[sid] = {
+            **base,
+            "season_totals": _season_totals(weekly),
             "weekly": weekly,
+            "rolling_3": _rolling_avg(weekly, 3),
+            "rolling_5": _rolling_avg(weekly, 5),
         }
+    return result
 
+
+def update_player_advanced_weeks(
+    existing: dict, snap_df, opp_df, gsis_map: dict, pfr_map: dict, weeks: set[int],
+) -> dict:
+    """Incremental counterpart of build_player_advanced_dict for the given weeks."""
+    in_weeks = pl.col("week").cast(pl.Int64).is_in(sorted(weeks))
+    fresh = build_player_advanced_dict(
+        _lazy(snap_df).filter(in_weeks), _lazy(opp_df).filter(in_weeks), gsis_map, pfr_map,
+    )
+
+    touched = set(fresh) | {
+        sid for sid, a in existing.items()
+        if any(w["week"] in weeks for w in a["weekly"])
+    }
+    result = dict(existing)
+    for sid in touched:
+        old, new = existing.get(sid), fresh.get(sid)
+        weekly = _splice_weeks(old["weekly"] if old else [], new["weekly"] if new else [], weeks)
+        if weekly:
+            result[sid] = _advanced_entry(weekly)
+        else:
+            result.pop(sid, None)
     return result
 
 
+def _remapped_ids(old: dict, new: dict) -> set[str]:
+    """Source IDs whose sleeper mapping was added, changed or removed."""
+    return {k for k in set(old) | set(new) if old.get(k) != new.get(k)}
+
+
 # ── Team stats (offense + defense) ───────────────────────────────────────────
 
-def build_team_stats_dict(df: pd.DataFrame, player_df: pd.DataFrame, schedule_df: pd.DataFrame | None = None) -> dict:
+_TEAM_OFF_SUMS = [
+    "targets", "passing_tds", "rushing_tds", "passing_epa", "rushing_epa",
+    "def_sacks", "def_interceptions", "def_pass_defended",
+]
+_TEAM_DEF_SUMS = ["passing_yards", "rushing_yards", "passing_tds", "rushing_tds", "targets"]
+_TEAM_AVG_SRC  = ["passing_yards", "rushing_yards", "attempts", "carries", "fantasy_points_ppr"]
+
+
+def build_team_stats_dict(df, player_df=None, schedule_df=None) -> dict:
     """
-    Build nflverse_team_stats from the team_stats DataFrame.
+    Build nflverse_team_stats from the team_stats frame (eager or lazy Polars).
 
     Each row is one team's stats for one game (their offense + their defensive
     counting stats). Defensive allowed stats are derived by flipping perspective:
     how opponents performed when playing against team X.
 
     Fantasy points allowed per position use player_df (1 PPR = fantasy_points_ppr).
+    Per-game offensive volume also comes from player_df when given, otherwise
+    from the team frame itself.
     Real points scored/allowed use schedule_df (home_score/away_score per game).
     """
-    reg = df[df["season_type"] == "REG"].copy()
-    if reg.empty:
+    lf = _lazy(df)
+    latest_season = _latest_season(lf, "season_type")
+    if latest_season is None:
         return {}
 
-    latest_season = int(reg["season"].max())
-    reg = reg[reg["season"] == latest_season]
+    off_cols = _present(lf, _TEAM_OFF_SUMS)
+    def_cols = _present(lf, _TEAM_DEF_SUMS)
+    reg = (
+        lf.filter((pl.col("season_type") == "REG") & (pl.col("season") == latest_season))
+        .with_columns(_clean_floats(sorted(set(off_cols) | set(def_cols))))
+    )
 
-    # Player-level: REG rows with opponent_team, for def fpts allowed by position
-    p_reg = player_df[
-        (player_df["season_type"] == "REG") &
-        (player_df["season"] == latest_season) &
-        (player_df["position"].isin(SKILL_POSITIONS))
-    ].copy()
-    if "opponent_team" not in p_reg.columns:
-        p_reg["opponent_team"] = None
+    # Offense per team (and the team's own defensive counting stats)
+    off_totals = {
+        row["team"]: row
+        for row in reg.group_by("team").agg(
+            pl.col("week").n_unique().alias("_n_games"),
+            *[pl.col(c).sum() for c in off_cols],
+        ).collect().iter_rows(named=True)
+        if row["team"] is not None
+    }
+    # Opponent offense vs each team = yards/TDs/targets allowed
+    allowed_totals = {
+        row["opponent_team"]: row
+        for row in reg.group_by("opponent_team").agg(
+            *[pl.col(c).sum() for c in def_cols],
+        ).collect().iter_rows(named=True)
+        if row["opponent_team"] is not None
+    }
 
     # Per-week fpts allowed per (defending_team, position): used for season avg + rolling
-    def_weekly = (
-        p_reg.groupby(["opponent_team", "week", "position"])["fantasy_points_ppr"]
-        .sum()
-        .reset_index()
-        .rename(columns={"opponent_team": "def_team", "fantasy_points_ppr": "fpts"})
-    )
+    _def_weeks: dict[tuple[str, str], list[float]] = {}   # (team, pos) → fpts per week (chronological)
+    _off_avgs: dict[str, dict] = {}
+    if player_df is not None:
+        p_lf = _lazy(player_df)
+        p_reg = p_lf.filter(
+            (pl.col("season_type") == "REG")
+            & (pl.col("season") == latest_season)
+            & pl.col("position").is_in(list(SKILL_POSITIONS))
+        )
+        p_names = p_lf.collect_schema().names()
+
+        if "opponent_team" in p_names:
+            def_weekly = (
+                p_reg.filter(pl.col("opponent_team").is_not_null())
+                .group_by(["opponent_team", "week", "position"])
+                .agg(pl.col("fantasy_points_ppr").cast(pl.Float64).fill_nan(0.0).sum().alias("fpts"))
+                .sort("week")
+                .collect()
+            )
+            for row in def_weekly.iter_rows(named=True):
+                _def_weeks.setdefault((row["opponent_team"], row["position"]), []).append(row["fpts"] or 0.0)
+
+        # Aggregate key offensive stats per (team, week) from player_df — column names
+        # are guaranteed correct here (same source as player stats endpoints).
+        p_team_col = "team" if "team" in p_names else "recent_team"
+        _src_cols = _present(p_lf, _TEAM_AVG_SRC)
+        if _src_cols and p_team_col in p_names:
+            weekly_sums = (
+                p_reg.with_columns(_clean_floats(_src_cols))
+                .group_by([p_team_col, "week"]).agg(*[pl.col(c).sum() for c in _src_cols])
+                .group_by(p_team_col).agg(*[pl.col(c).mean() for c in _src_cols])
+                .collect()
+            )
+            for row in weekly_sums.iter_rows(named=True):
+                _off_avgs[str(row[p_team_col])] = {c: round(_safe_float(row[c]), 1) for c in _src_cols}
+    else:
+        _src_cols = _present(lf, _TEAM_AVG_SRC)
+        if _src_cols:
+            weekly_sums = (
+                reg.with_columns(_clean_floats(_src_cols))
+                .group_by(["team", "week"]).agg(*[pl.col(c).sum() for c in _src_cols])
+                .group_by("team").agg(*[pl.col(c).mean() for c in _src_cols])
+                .collect()
+            )
+            for row in weekly_sums.iter_rows(named=True):
+                _off_avgs[str(row["team"])] = {c: round(_safe_float(row[c]), 1) for c in _src_cols}
 
     def _def_season(team: str, pos: str, n_games: int) -> float:
-        rows = def_weekly[(def_weekly["def_team"] == team) & (def_weekly["position"] == pos)]
-        if rows.empty or n_games == 0:
+        vals = _def_weeks.get((team, pos))
+        if not vals or n_games == 0:
             return 0.0
-        return round(_safe_float(rows["fpts"].sum()) / n_games, 1)
+        return round(sum(vals) / n_games, 1)
 
     def _def_rolling(team: str, pos: str, n: int) -> float:
-        rows = (
-            def_weekly[(def_weekly["def_team"] == team) & (def_weekly["position"] == pos)]
-            .sort_values("week")
-            .tail(n)
-        )
-        if rows.empty:
-            return 0.0
-        return round(_safe_float(rows["fpts"].mean()), 1)
-
-    # Aggregate key offensive stats per (team, week) from player_df — column names
-    # are guaranteed correct here (same source as player stats endpoints).
-    p_team_col = "team" if "team" in p_reg.columns else "recent_team"
-    _src_cols = [c for c in ["passing_yards", "rushing_yards", "attempts", "carries", "fantasy_points_ppr"] if c in p_reg.columns]
-    _off_avgs: dict[str, dict] = {}
-    if _src_cols and p_team_col in p_reg.columns:
-        _wk = p_reg.groupby([p_team_col, "week"])[_src_cols].sum().reset_index()
-        for _t, _grp in _wk.groupby(p_team_col):
-            _off_avgs[str(_t)] = {c: round(_safe_float(_grp[c].mean()), 1) for c in _src_cols}
+        vals = _def_weeks.get((team, pos), [])[-n:]
+        return round(sum(vals) / len(vals), 1) if vals else 0.0
 
     # Build per-team points scored and allowed from schedule (regular season, completed games)
     _pts_for: dict[str, list[int]] = {}      # team → list of points scored per game (chronological)
     _pts_against: dict[str, list[int]] = {}  # team → list of points allowed per game (chronological)
-    if schedule_df is not None and not schedule_df.empty:
-        sched_reg = schedule_df[schedule_df["game_type"] == "REG"].copy()
-        sched_reg = sched_reg[sched_reg["season"] == int(reg["season"].max())]
-        sched_reg = sched_reg.dropna(subset=["home_score", "away_score"])
-        sched_reg = sched_reg.sort_values("week")
-        for _, row in sched_reg.iterrows():
+    if schedule_df is not None:
+        sched_reg = (
+            _lazy(schedule_df)
+            .filter(
+                (pl.col("game_type") == "REG")
+                & (pl.col("season") == latest_season)
+                & pl.col("home_score").is_not_null()
+                & pl.col("away_score").is_not_null()
+            )
+            .select(["week", "home_team", "away_team", "home_score", "away_score"])
+            .sort("week")
+            .collect()
+        )
+        for row in sched_reg.iter_rows(named=True):
             h, a = str(row["home_team"]), str(row["away_team"])
             hs, as_ = int(row["home_score"]), int(row["away_score"])
             _pts_for.setdefault(h, []).append(hs)
@@ -335,23 +583,25 @@ def build_team_stats_dict(df: pd.DataFrame, player_df: pd.DataFrame, schedule_df
         vals = data.get(team, [])[-n:]
         return round(sum(vals) / len(vals), 1) if vals else 0.0
 
-    all_teams = set(reg["team"].dropna()) | set(reg["opponent_team"].dropna())
+    all_teams = set(off_totals) | set(allowed_totals)
     result = {}
 
     for team in all_teams:
         team = str(team)
-        off = reg[reg["team"] == team]
-        opp = reg[reg["opponent_team"] == team]
+        off = off_totals.get(team)
+        if not off:
+            continue
+        opp = allowed_totals.get(team, {})
 
-        n_games = len(off["week"].unique())
+        n_games = off["_n_games"]
         if n_games == 0:
             continue
 
-        def _pg(series, n=n_games):
-            return round(_safe_float(series.sum()) / n, 1)
+        def _pg(row, col, n=n_games):
+            return round(_safe_float(row.get(col)) / n, 1)
 
-        def _pg2(series, n=n_games):
-            return round(_safe_float(series.sum()) / n, 2)
+        def _pg2(row, col, n=n_games):
+            return round(_safe_float(row.get(col)) / n, 2)
 
         ta = _off_avgs.get(team, {})
 
@@ -362,7 +612,7 @@ def build_team_stats_dict(df: pd.DataFrame, player_df: pd.DataFrame, schedule_df
             "pass_attempts_per_game":   ta.get("attempts", 0.0),
             "rush_attempts_per_game":   ta.get("carries", 0.0),
             "plays_per_game":           round(ta.get("attempts", 0.0) + ta.get("carries", 0.0), 1),
-            "targets_per_game":         _pg(off["targets"]),
+            "targets_per_game":         _pg(off, "targets"),
             "passing_yards_per_game":   ta.get("passing_yards", 0.0),
             "rushing_yards_per_game":   ta.get("rushing_yards", 0.0),
             "fpts_per_game":            ta.get("fantasy_points_ppr", 0.0),
@@ -372,19 +622,19 @@ def build_team_stats_dict(df: pd.DataFrame, player_df: pd.DataFrame, schedule_df
             "points_rolling5":          _score_rolling(team, _pts_for, 5),
             "points_allowed_rolling3":  _score_rolling(team, _pts_against, 3),
             "points_allowed_rolling5":  _score_rolling(team, _pts_against, 5),
-            "passing_tds_per_game":     _pg2(off["passing_tds"]),
-            "rushing_tds_per_game":     _pg2(off["rushing_tds"]),
-            "passing_epa_per_game":     _pg2(off["passing_epa"]),
-            "rushing_epa_per_game":     _pg2(off["rushing_epa"]),
+            "passing_tds_per_game":     _pg2(off, "passing_tds"),
+            "rushing_tds_per_game":     _pg2(off, "rushing_tds"),
+            "passing_epa_per_game":     _pg2(off, "passing_epa"),
+            "rushing_epa_per_game":     _pg2(off, "rushing_epa"),
             # ── Defense (yardage / td / pressure) ──
-            "def_pass_yards_allowed_per_game":  _pg(opp["passing_yards"]),
-            "def_rush_yards_allowed_per_game":  _pg(opp["rushing_yards"]),
-            "def_pass_tds_allowed_per_game":    _pg2(opp["passing_tds"]),
-            "def_rush_tds_allowed_per_game":    _pg2(opp["rushing_tds"]),
-            "def_targets_allowed_per_game":     _pg(opp["targets"]),
-            "def_sacks_per_game":               _pg2(off["def_sacks"]),
-            "def_interceptions_per_game":       _pg2(off["def_interceptions"]),
-            "def_pass_defended_per_game":       _pg2(off["def_pass_defended"]),
+            "def_pass_yards_allowed_per_game":  _pg(opp, "passing_yards"),
+            "def_rush_yards_allowed_per_game":  _pg(opp, "rushing_yards"),
+            "def_pass_tds_allowed_per_game":    _pg2(opp, "passing_tds"),
+            "def_rush_tds_allowed_per_game":    _pg2(opp, "rushing_tds"),
+            "def_targets_allowed_per_game":     _pg(opp, "targets"),
+            "def_sacks_per_game":               _pg2(off, "def_sacks"),
+            "def_interceptions_per_game":       _pg2(off, "def_interceptions"),
+            "def_pass_defended_per_game":       _pg2(off, "def_pass_defended"),
             # ── Defense: fantasy points allowed per position (1 PPR) ──
             "def_fpts_allowed_qb_per_game": _def_season(team, "QB", n_games),
             "def_fpts_allowed_rb_per_game": _def_season(team, "RB", n_games),
@@ -425,20 +675,31 @@ def build_team_stats_dict(df: pd.DataFrame, player_df: pd.DataFrame, schedule_df
 
 # ── Schedule ─────────────────────────────────────────────────────────────────
 
-def build_schedule_dicts(df: pd.DataFrame) -> tuple:
-    """Build (team_schedule, games_by_week) from a schedules DataFrame."""
-    reg = df[df["game_type"] == "REG"].copy()
-    if reg.empty:
-        return {}, {}
+def _opt_float(val) -> float | None:
+    return None if val is None or val != val else float(val)
+
+
+def _opt_int(val) -> int | None:
+    return None if val is None or val != val else int(val)
 
-    latest_season = int(reg["season"].max())
-    reg = reg[reg["season"] == latest_season]
+
+def build_schedule_dicts(df) -> tuple:
+    """
+    Build (team_schedule, games_by_week, game_index) from a schedules frame
+    (eager or lazy Polars). game_index maps (home_team, away_team, gameday) to
+    the same game dict held in games_by_week.
+    """
+    lf = _lazy(df)
+    latest_season = _latest_season(lf, "game_type")
+    if latest_season is None:
+        return {}, {}, {}
+
+    reg = lf.filter((pl.col("game_type") == "REG") & (pl.col("season") == latest_season)).collect()
 
     games_by_week: dict = {}
-    for _, row in reg.iterrows():
+    game_index: dict = {}
+    for row in reg.iter_rows(named=True):
         week = int(row["week"])
-        home_score = row.get("home_score")
-        away_score = row.get("away_score")
         game = {
             "home_team":   str(row["home_team"]),
             "away_team":   str(row["away_team"]),
@@ -448,16 +709,17 @@ def build_schedule_dicts(df: pd.DataFrame) -> tuple:
             "gametime":    str(row.get("gametime", "") or ""),
             "roof":        str(row.get("roof", "") or ""),
             "surface":     str(row.get("surface", "") or ""),
-            "temp":        None if pd.isna(row.get("temp")) else float(row["temp"]),
-            "wind":        None if pd.isna(row.get("wind")) else float(row["wind"]),
-            "home_score":  None if pd.isna(home_score) else int(home_score),
-            "away_score":  None if pd.isna(away_score) else int(away_score),
-            "home_moneyline": None if pd.isna(row.get("home_moneyline")) else float(row["home_moneyline"]),
-            "away_moneyline": None if pd.isna(row.get("away_moneyline")) else float(row["away_moneyline"]),
+            "temp":        _opt_float(row.get("temp")),
+            "wind":        _opt_float(row.get("wind")),
+            "home_score":  _opt_int(row.get("home_score")),
+            "away_score":  _opt_int(row.get("away_score")),
+            "home_moneyline": _opt_float(row.get("home_moneyline")),
+            "away_moneyline": _opt_float(row.get("away_moneyline")),
             "home_qb":     str(row.get("home_qb_name", "") or ""),
             "away_qb":     str(row.get("away_qb_name", "") or ""),
         }
         games_by_week.setdefault(week, []).append(game)
+        game_index[(game["home_team"], game["away_team"], game["gameday"])] = game
 
     # team → most-recent-week game (iterate weeks in reverse so first hit wins)
     team_schedule: dict = {}
@@ -479,106 +741,314 @@ def build_schedule_dicts(df: pd.DataFrame) -> tuple:
                     "home_score": game["home_score"], "away_score": game["away_score"],
                 }
 
-    return team_schedule, games_by_week
+    return team_schedule, games_by_week, game_index
 
 
 # ── Refresh orchestrator ──────────────────────────────────────────────────────
 
-def refresh_nflverse_data():
-    """Download and rebuild all nflverse in-memory data. Safe to call repeatedly."""
-    global nflverse_player_stats, nflverse_player_advanced, nflverse_team_stats
-    global nflverse_schedule, nflverse_games
-    global nflverse_current_season, nflverse_last_updated
+_PLAYER_COLS = sorted({
+    "season_type", "season", "position", "player_id", "week",
+    "player_display_name", "team", "recent_team", "headshot_url",
+    "opponent_team",
+} | SUM_COLS | AVG_COLS)
+_SNAP_COLS = ["game_type", "pfr_player_id", "week", "offense_pct"]
+_OPP_COLS  = ["player_id", "week", "total_fantasy_points_exp",
+              "total_fantasy_points", "total_fantasy_points_diff"]
+_TEAM_COLS = [
+    "season_type", "season", "team", "opponent_team", "week",
+    "targets", "passing_yards", "rushing_yards", "passing_tds", "rushing_tds",
+    "passing_epa", "rushing_epa", "def_sacks", "def_interceptions", "def_pass_defended",
+]
+_SCHED_COLS = [
+    "game_type", "season", "week", "home_team", "away_team",
+    "spread_line", "total_line", "gameday", "gametime", "roof", "surface",
+    "temp", "wind", "home_score", "away_score",
+    "home_moneyline", "away_moneyline", "home_qb_name", "away_qb_name",
+]
+
+
+def _scan(frame, cols: list[str], type_col: str | None) -> pl.LazyFrame:
+    """
+    Lazy view of a loader result: only the needed columns and only REG rows,
+    so nothing else is ever materialised by the builds.
+    """
+    lf = _lazy(frame)
+    lf = lf.select(_present(lf, cols))
+    if type_col and type_col in lf.collect_schema().names():
+        lf = lf.filter(pl.col(type_col) == "REG")
+    return lf
+
+
+# State carried between refreshes so the next one can work week-by-week
+_refresh_state: dict = {}   # season, gsis_map, pfr_map, fingerprints {dataset: {week: hash}}
+
+
+def previous_build() -> dict:
+    """What an incremental build needs from the published one (see build_nflverse_snapshot)."""
+    return {
+        "refresh_state":   _refresh_state,
+        "player_stats":    nflverse_player_stats,
+        "player_advanced": nflverse_player_advanced,
+    }
+
+
+def build_nflverse_snapshot(full: bool = False, previous: dict | None = None) -> dict:
+    """
+    Download and build a complete nflverse snapshot without touching the
+    published stores (safe to run in a worker process — see workers.py).
+
+    After the first full build, later builds of the same season only re-read
+    the weeks whose rows changed (normally just the latest one) and splice them
+    into the existing per-player arrays. Team stats and the schedule are small
+    and always rebuilt. Pass full=True to force a complete rebuild. `previous`
+    is a previous_build() dict; a worker process has no stores of its own, so
+    refresh_nflverse_data() hands it one. Defaults to this process's stores.
+    """
+    if previous is None:
+        previous = previous_build()
 
     season = _current_nfl_season()
     print(f"{datetime.datetime.now()} - nflverse: refreshing season {season}")
     logger.info("nflverse: refreshing season %d", season)
 
-    try:
-        # 1. ID maps — load rosters, build maps, free immediately
-        gsis_map, pfr_map = build_id_maps(season)
-        gc.collect()
-        logger.info("nflverse: id maps built (gsis=%d, pfr=%d)", len(gsis_map), len(pfr_map))
-
-        # 2. Player stats — keep in memory until team_stats is built (used by both)
-        _PLAYER_COLS = list({
-            "season_type", "season", "position", "player_id", "week",
-            "player_display_name", "team", "recent_team", "headshot_url",
-            "opponent_team",
-        } | SUM_COLS | AVG_COLS)
-        pl_df = nfl.load_player_stats([season])
-        stats_df = pl_df.select([c for c in _PLAYER_COLS if c in pl_df.columns]).to_pandas()
-        del pl_df; gc.collect()
-        logger.info("nflverse: player_stats loaded (%d rows)", len(stats_df))
+    # 1. ID maps
+    gsis_map, pfr_map = build_id_maps(season)
+    logger.info("nflverse: id maps built (gsis=%d, pfr=%d)", len(gsis_map), len(pfr_map))
+
+    # 2. Player stats — materialised once (REG, needed columns only), then
+    #    shared by the player and team builds as a lazy view
+    stats_df = _scan(_load("player_stats", season, nfl.load_player_stats), _PLAYER_COLS, "season_type").collect()
+    logger.info("nflverse: player_stats loaded (%d rows)", stats_df.height)
+    current_season = int(stats_df["season"].max()) if stats_df.height else season
 
+    snap_lf = _scan(_load("snap_counts", season, nfl.load_snap_counts), _SNAP_COLS, "game_type")
+    opp_lf  = _scan(_load("ff_opportunity", season, nfl.load_ff_opportunity), _OPP_COLS, None)
+
+    fingerprints = {
+        "player_stats":   _week_fingerprints(stats_df),
+        "snap_counts":    _week_fingerprints(snap_lf),
+        "ff_opportunity": _week_fingerprints(opp_lf),
+    }
+
+    # 3. Decide between a week-level update and a full rebuild
+    stats_weeks = adv_weeks = None
+    prev = previous["refresh_state"]
+    if not full and prev.get("season") == current_season and previous["player_stats"]:
+        stats_weeks = _changed_weeks(prev["fingerprints"]["player_stats"], fingerprints["player_stats"])
+        snap_weeks  = _changed_weeks(prev["fingerprints"]["snap_counts"], fingerprints["snap_counts"])
+        opp_weeks   = _changed_weeks(prev["fingerprints"]["ff_opportunity"], fingerprints["ff_opportunity"])
+        adv_weeks   = None if snap_weeks is None or opp_weeks is None else snap_weeks | opp_weeks
+
+        # A player whose ID mapping changed may have rows in untouched weeks
+        if stats_weeks is not None:
+            remapped = _remapped_ids(prev["gsis_map"], gsis_map)
+            if remapped and stats_df.filter(
+                pl.col("player_id").is_in(list(remapped)) & ~pl.col("week").is_in(sorted(stats_weeks))
+            ).height:
+                stats_weeks = None
+        if adv_weeks is not None and (
+            _remapped_ids(prev["pfr_map"], pfr_map) or _remapped_ids(prev["gsis_map"], gsis_map)
+        ):
+            adv_weeks = None
+
+    if stats_weeks is None:
         player_stats = build_player_stats_dict(stats_df, gsis_map)
+    elif stats_weeks:
+        player_stats = update_player_stats_weeks(previous["player_stats"], stats_df, gsis_map, stats_weeks)
+    else:
+        player_stats = previous["player_stats"]
 
-        # 3. Snap counts — load, build partial advanced, free
-        _SNAP_COLS = ["game_type", "pfr_player_id", "week", "offense_pct"]
-        pl_snap = nfl.load_snap_counts([season])
-        snap_df = pl_snap.select([c for c in _SNAP_COLS if c in pl_snap.columns]).to_pandas()
-        del pl_snap; gc.collect()
-        logger.info("nflverse: snap_counts loaded (%d rows)", len(snap_df))
-
-        # 4. FF opportunity — load, build advanced, free both
-        _OPP_COLS = ["player_id", "week", "total_fantasy_points_exp",
-                     "total_fantasy_points", "total_fantasy_points_diff"]
-        pl_opp = nfl.load_ff_opportunity([season])
-        opp_df = pl_opp.select([c for c in _OPP_COLS if c in pl_opp.columns]).to_pandas()
-        del pl_opp; gc.collect()
-        logger.info("nflverse: ff_opportunity loaded (%d rows)", len(opp_df))
-
-        player_advanced = build_player_advanced_dict(snap_df, opp_df, gsis_map, pfr_map)
-        del snap_df, opp_df; gc.collect()
-
-        # 5. Team stats — load, build, free
-        _TEAM_COLS = [
-            "season_type", "season", "team", "opponent_team", "week",
-            "targets", "passing_yards", "rushing_yards", "passing_tds", "rushing_tds",
-            "passing_epa", "rushing_epa", "def_sacks", "def_interceptions", "def_pass_defended",
-        ]
-        pl_team = nfl.load_team_stats([season])
-        team_df = pl_team.select([c for c in _TEAM_COLS if c in pl_team.columns]).to_pandas()
-        del pl_team; gc.collect()
-        logger.info("nflverse: team_stats loaded (%d rows)", len(team_df))
-
-        # 6. Schedules — load, build dicts, free
-        _SCHED_COLS = [
-            "game_type", "season", "week", "home_team", "away_team",
-            "spread_line", "total_line", "gameday", "gametime", "roof", "surface",
-            "temp", "wind", "home_score", "away_score",
-            "home_moneyline", "away_moneyline", "home_qb_name", "away_qb_name",
-        ]
-        pl_sched = nfl.load_schedules([season])
-        schedule_df = pl_sched.select([c for c in _SCHED_COLS if c in pl_sched.columns]).to_pandas()
-        del pl_sched; gc.collect()
-        logger.info("nflverse: schedules loaded (%d rows)", len(schedule_df))
-
-        team_stats      = build_team_stats_dict(team_df, stats_df, schedule_df)
-        schedule, games = build_schedule_dicts(schedule_df)
-
-        reg = stats_df[stats_df["season_type"] == "REG"]
-        current_season = int(reg["season"].max()) if not reg.empty else season
-
-        del team_df, stats_df, schedule_df; gc.collect()
-
-        nflverse_player_stats.clear();    nflverse_player_stats.update(player_stats)
-        nflverse_player_advanced.clear(); nflverse_player_advanced.update(player_advanced)
-        nflverse_team_stats.clear();      nflverse_team_stats.update(team_stats)
-        nflverse_schedule.clear();        nflverse_schedule.update(schedule)
-        nflverse_games.clear();           nflverse_games.update(games)
-        nflverse_current_season = current_season
-        nflverse_last_updated   = datetime.datetime.utcnow().isoformat() + "Z"
-
-        print(
-            f"{datetime.datetime.now()} - nflverse: done — "
-            f"{len(player_stats)} players, {len(player_advanced)} advanced, "
-            f"{len(team_stats)} teams, season={current_season}"
+    if adv_weeks is None:
+        player_advanced = build_player_advanced_dict(snap_lf, opp_lf, gsis_map, pfr_map)
+    elif adv_weeks:
+        player_advanced = update_player_advanced_weeks(
+            previous["player_advanced"], snap_lf, opp_lf, gsis_map, pfr_map, adv_weeks,
         )
+    else:
+        player_advanced = previous["player_advanced"]
+
+    mode = "full" if stats_weeks is None else f"incremental weeks={sorted(stats_weeks)}"
+    logger.info("nflverse: player stats %s", mode)
+
+    # 4. Team stats + schedules (32 teams — always rebuilt, ranks included)
+    team_lf  = _scan(_load("team_stats", season, nfl.load_team_stats), _TEAM_COLS, "season_type")
+    sched_lf = _scan(_load("schedules", season, nfl.load_schedules), _SCHED_COLS, "game_type")
+
+    team_stats      = build_team_stats_dict(team_lf, stats_df, sched_lf)
+    schedule, games, game_index = build_schedule_dicts(sched_lf)
+
+    return {
+        "season":          current_season,
+        "mode":            mode,
+        "player_stats":    player_stats,
+        "player_advanced": player_advanced,
+        "team_stats":      team_stats,
+        "schedule":        schedule,
+        "games":           games,
+        "game_index":      game_index,
+        "refresh_state": {
+            "season": current_season, "gsis_map": gsis_map, "pfr_map": pfr_map,
+            "fingerprints": fingerprints,
+        },
+    }
+
+
+def publish_nflverse_snapshot(snapshot: dict, version: int | None = None):
+    """
+    Swap a snapshot from build_nflverse_snapshot() into the module-level stores.
+    Each store is rebound to the snapshot's dict, so a concurrent request reads
+    either the old store or the new one, never a half-filled one. `version`
+    replaces the usual nflverse_version bump (web workers use the snapshot_store
+    version).
+    """
+    global nflverse_player_stats, nflverse_player_advanced, nflverse_team_stats
+    global nflverse_schedule, nflverse_games, nflverse_game_index
+    global nflverse_current_season, nflverse_last_updated
+
+    nflverse_player_stats    = snapshot["player_stats"]
+    nflverse_player_advanced = snapshot["player_advanced"]
+    nflverse_team_stats      = snapshot["team_stats"]
+    nflverse_schedule        = snapshot["schedule"]
+    nflverse_games           = snapshot["games"]
+    nflverse_game_index      = snapshot["game_index"]
+    nflverse_current_season  = snapshot["season"]
+    nflverse_last_updated    = datetime.datetime.now(datetime.UTC).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    rebuild_views(version)
+
+    _refresh_state.clear()
+    _refresh_state.update(snapshot["refresh_state"])
+
+    print(
+        f"{datetime.datetime.now()} - nflverse: done ({snapshot['mode']}) — "
+        f"{len(nflverse_player_stats)} players, {len(nflverse_player_advanced)} advanced, "
+        f"{len(nflverse_team_stats)} teams, season={nflverse_current_season}"
+    )
+
+
+def current_snapshot() -> dict:
+    """The published stores in build_nflverse_snapshot() shape (for snapshot_store)."""
+    return {
+        "season":          nflverse_current_season,
+        "mode":            "snapshot",
+        "player_stats":    nflverse_player_stats,
+        "player_advanced": nflverse_player_advanced,
+        "team_stats":      nflverse_team_stats,
+        "schedule":        nflverse_schedule,
+        "games":           nflverse_games,
+        "game_index":      nflverse_game_index,
+        "refresh_state":   _refresh_state,
+    }
+
+
+def refresh_nflverse_data(full: bool = False):
+    """
+    Download and rebuild all nflverse in-memory data. Safe to call repeatedly.
+    The build runs in a worker process when REFRESH_IN_WORKER is set; it gets
+    the published stores and refresh state, so it stays incremental there too.
+    """
+    try:
+        previous = None if full else previous_build()
+        publish_nflverse_snapshot(workers.run_job(build_nflverse_snapshot, full, previous))
     except Exception:
         logger.exception("nflverse: refresh failed")
 
 
+# ── Derived views ─────────────────────────────────────────────────────────────
+
+def rebuild_views(version: int | None = None):
+    """
+    Rebuild the week index and per-week rankings from nflverse_player_stats and
+    bump nflverse_version (or set it to `version`). Called after every publish
+    (and by tests after seeding the stores directly).
+    """
+    global nflverse_version, nflverse_week_index, nflverse_week_rankings
+    global nflverse_leaderboards, nflverse_projection_tables
+
+    week_index: dict = {}
+    for sleeper_id, player in nflverse_player_stats.items():
+        meta = {"name": player["name"], "position": player["position"], "team": player["team"]}
+        for week_data in player.get("weekly", []):
+            week_index.setdefault(week_data["week"], {})[sleeper_id] = {**meta, **week_data}
+
+    week_rankings = {
+        week: sorted(rows, key=lambda sid: rows[sid].get("fantasy_points_ppr", 0), reverse=True)
+        for week, rows in week_index.items()
+    }
+
+    leaderboards = _build_leaderboards()
+
+    # Materialise the weeks the frontend asks for (each team's upcoming game);
+    # any other week is built on first request by projection_table()
+    schedule_weeks = {info["week"] for info in nflverse_schedule.values() if info.get("week")}
+    tables = {week: _build_projection_table(week) for week in schedule_weeks}
+
+    # Rebound, not refilled, so readers never see a partial view
+    nflverse_week_index        = week_index
+    nflverse_week_rankings     = week_rankings
+    nflverse_leaderboards      = leaderboards
+    nflverse_projection_tables = tables
+    nflverse_version = nflverse_version + 1 if version is None else version
+
+
+def _build_leaderboards() -> dict:
+    """
+    Season leaderboard rows ({"sleeper_id", **player, "matchup"}) sorted by
+    season fantasy_points_ppr, overall and grouped by position and by team.
+    Built once per rebuild; the grouped lists share the row dicts.
+    """
+    matchups: dict = {}
+    rows = []
+    for sleeper_id, player in nflverse_player_stats.items():
+        key = (player["team"], player["position"])
+        if key not in matchups:
+            matchups[key] = _matchup_block(*key)
+        rows.append({"sleeper_id": sleeper_id, **player, "matchup": matchups[key]})
+    rows.sort(key=lambda p: p["season_totals"].get("fantasy_points_ppr", 0), reverse=True)
+
+    by_position: dict = {}
+    by_team: dict = {}
+    for row in rows:
+        by_position.setdefault(row["position"], []).append(row)
+        by_team.setdefault(row["team"], []).append(row)
+    return {"all": rows, "position": by_position, "team": by_team}
+
+
+# Highest week number a projection table is cached for (REG + POST)
+_MAX_NFL_WEEK = 22
+
+
+def _build_projection_table(week: int) -> dict:
+    """
+    Every player's projection for week, sorted by projected_ppr, plus the same
+    rows grouped by position and by team (lists share the row dicts, order kept).
+    """
+    matchups: dict = {}
+    rows = []
+    for sleeper_id, player in nflverse_player_stats.items():
+        key = (player.get("team", ""), player.get("position", ""))
+        if key not in matchups:
+            matchups[key] = _matchup_block(*key)
+        rows.append(_projection(sleeper_id, player, week, matchups[key]))
+    rows.sort(key=lambda r: r["projected_ppr"], reverse=True)
+
+    by_position: dict = {}
+    by_team: dict = {}
+    for row in rows:
+        by_position.setdefault(row["position"], []).append(row)
+        by_team.setdefault(row["team"], []).append(row)
+    return {"all": rows, "position": by_position, "team": by_team}
+
+
+def projection_table(week: int) -> dict:
+    """Projection table for week, built and cached on first use."""
+    table = nflverse_projection_tables.get(week)
+    if table is None:
+        table = _build_projection_table(week)
+        if 1 <= week <= _MAX_NFL_WEEK:
+            nflverse_projection_tables[week] = table
+    return table
+
+
 # ── Query helpers ─────────────────────────────────────────────────────────────
 
 _POS_DEF_KEY = {"QB": "qb", "RB": "rb", "WR": "wr", "TE": "te", "K": None}
@@ -621,14 +1091,17 @@ def _matchup_block(team: str, position: str) -> dict:
 
 
 def get_top_players(limit: int = 300, position: str = None, team: str = None) -> list:
-    players = [{"sleeper_id": sid, **p} for sid, p in nflverse_player_stats.items()]
-    if position:
-        players = [p for p in players if p["position"] == position.upper()]
+    """Slice of the prebuilt season leaderboard (rows are shared — do not mutate)."""
+    if not nflverse_leaderboards:
+        return []
     if team:
-        players = [p for p in players if p["team"] == team.upper()]
-    for p in players:
-        p["matchup"] = _matchup_block(p["team"], p["position"])
-    players.sort(key=lambda p: p["season_totals"].get("fantasy_points_ppr", 0), reverse=True)
+        players = nflverse_leaderboards["team"].get(team.upper(), [])
+        if position:
+            players = [p for p in players if p["position"] == position.upper()]
+    elif position:
+        players = nflverse_leaderboards["position"].get(position.upper(), [])
+    else:
+        players = nflverse_leaderboards["all"]
     return players[:limit]
 
 
@@ -640,7 +1113,11 @@ def project_player(sleeper_id: str, week: int) -> dict:
     player = nflverse_player_stats.get(str(sleeper_id))
     if not player:
         return {}
+    return _projection(str(sleeper_id), player, week,
+                       _matchup_block(player.get("team", ""), player.get("position", "")))
+
 
+def _projection(sleeper_id: str, player: dict, week: int, matchup: dict) -> dict:
     rolling = player.get("rolling_5") or player.get("rolling_3") or {}
     base_proj = rolling.get("fantasy_points_ppr", 0.0)
 
@@ -660,5 +1137,5 @@ def project_player(sleeper_id: str, week: int) -> dict:
         "projected_ppr":     round(base_proj * adj, 2),
         "rolling_5_ppr":     rolling.get("fantasy_points_ppr", 0.0),
         "adjustment_factor": round(adj, 3),
-        "matchup":           _matchup_block(team, position),
+        "matchup":           matchup,
     }
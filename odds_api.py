@@ -8,8 +8,16 @@ value flags.
 
 import logging
 import datetime
+import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
+from requests.adapters import HTTPAdapter
+
+import odds_hitrate
+import odds_pricing
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +78,21 @@ NFL_TEAM_MAP = {
     "Washington Commanders": "WAS",
 }
 
+# Odds API abbreviations that differ from nflverse's
+NFLVERSE_ABBR = {"LAR": "LA", "WSH": "WAS", "JAX": "JAC"}
+
+
+def nflverse_game_key(game: dict) -> tuple:
+    """(home, away, gameday) key into nflverse_stats.nflverse_game_index for an odds game dict."""
+    home = game.get("home_abbr", "")
+    away = game.get("away_abbr", "")
+    return (
+        NFLVERSE_ABBR.get(home, home),
+        NFLVERSE_ABBR.get(away, away),
+        (game.get("commence_time") or "")[:10],
+    )
+
+
 # ── In-memory stores ──────────────────────────────────────────────────────────
 
 odds_games: dict = {}               # event_id → game dict
@@ -77,6 +100,17 @@ odds_props: list = []               # list of player prop dicts (one per player)
 odds_history: dict = {}             # event_id → snapshotted game dict (persisted before games play)
 odds_credits_remaining: int | None = None
 odds_last_updated: str | None = None
+odds_lines_updated_at: str | None = None   # last game-lines fetch (UTC ISO)
+odds_props_updated_at: dict = {}           # event_id → last props fetch (UTC ISO)
+
+# Read-only indexes over odds_props, rebuilt by rebuild_indexes() whenever the
+# stores above are republished; odds_version increments each time.
+odds_version: int = 0
+odds_props_by_id: dict = {}        # sleeper_id → player prop dict (same object as in odds_props)
+odds_props_by_market: dict = {}    # market key → [player prop dict, ...] (odds_props order)
+odds_value_props: list = []        # flattened value-flagged props, by abs(value_pct) desc
+odds_value_ids: set = set()        # sleeper_ids with at least one value flag
+odds_status_counts: dict = {}      # counts for /odds/status
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
@@ -119,14 +153,40 @@ def _best_price(outcomes: list, side: str) -> tuple[float | None, str | None]:
     return best_price, best_book
 
 
+_credits_lock = threading.Lock()
+
+
 def _extract_headers(resp: requests.Response) -> None:
-    global odds_credits_remaining
     remaining = resp.headers.get("x-requests-remaining")
     if remaining is not None:
         try:
-            odds_credits_remaining = int(remaining)
+            _set_credits_remaining(int(remaining))
         except ValueError:
-            pass
+            return
+
+
+def _set_credits_remaining(value: int | None) -> None:
+    """Record the API's credit balance. Concurrent prop fetches report it once
+    per batch (the lowest figure any response carried), never response by response."""
+    global odds_credits_remaining
+    if value is None:
+        return
+    with _credits_lock:
+        odds_credits_remaining = value
+
+
+_session: requests.Session | None = None
+
+
+def _get_session() -> requests.Session:
+    """Shared keep-alive session; the pool is sized for the concurrent prop fetches."""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=PROPS_MAX_WORKERS)
+        session.mount("https://", adapter)
+        _session = session
+    return _session
 
 
 # ── Game odds ─────────────────────────────────────────────────────────────────
@@ -140,7 +200,7 @@ def fetch_game_odds(api_key: str) -> dict:
         "markets":     GAME_MARKETS,
         "oddsFormat":  ODDS_FORMAT,
     }
-    resp = requests.get(url, params=params, timeout=15)
+    resp = _get_session().get(url, params=params, timeout=15)
     _extract_headers(resp)
     resp.raise_for_status()
     events = resp.json()
@@ -157,9 +217,11 @@ def fetch_game_odds(api_key: str) -> dict:
         h2h     = {}
         spread  = {}
         total   = {}
+        books   = {}   # book_key → that book's own quote (see BOOK_QUOTE_FIELDS)
 
         for book in event.get("bookmakers", []):
             book_key = book["key"]
+            quote    = books.setdefault(book_key, {})
             for market in book.get("markets", []):
                 mkey     = market["key"]
                 outcomes = market.get("outcomes", [])
@@ -171,10 +233,12 @@ def fetch_game_odds(api_key: str) -> dict:
                         if price is None:
                             continue
                         if team == home_abbr:
+                            quote["home_price"] = price
                             if "home_price" not in h2h or price > h2h["home_price"]:
                                 h2h["home_price"] = price
                                 h2h["home_book"]  = book_key
                         elif team == away_abbr:
+                            quote["away_price"] = price
                             if "away_price" not in h2h or price > h2h["away_price"]:
                                 h2h["away_price"] = price
                                 h2h["away_book"]  = book_key
@@ -187,10 +251,14 @@ def fetch_game_odds(api_key: str) -> dict:
                         if point is None or price is None:
                             continue
                         if team == home_abbr:
+                            quote["home_spread"]       = point
+                            quote["home_spread_price"] = price
                             if "home_spread" not in spread or price > spread.get("home_price", -9999):
                                 spread["home_spread"] = point
                                 spread["home_price"]  = price
                                 spread["home_book"]   = book_key
+                        elif team == away_abbr:
+                            quote["away_spread_price"] = price
 
                 elif mkey == "totals":
                     for o in outcomes:
@@ -200,11 +268,14 @@ def fetch_game_odds(api_key: str) -> dict:
                         if point is None or price is None:
                             continue
                         if side == "Over":
+                            quote["total_line"] = point
+                            quote["over_price"] = price
                             if "line" not in total or price > total.get("over_price", -9999):
                                 total["line"]       = point
                                 total["over_price"] = price
                                 total["over_book"]  = book_key
                         elif side == "Under":
+                            quote["under_price"] = price
                             if price > total.get("under_price", -9999):
                                 total["under_price"] = price
                                 total["under_book"]  = book_key
@@ -219,25 +290,121 @@ def fetch_game_odds(api_key: str) -> dict:
             "h2h":           h2h   or None,
             "spread":        spread or None,
             "total":         total  or None,
+            "books":         {k: q for k, q in books.items() if q},
         }
 
+    odds_pricing.price_games(games)
     logger.info("odds: fetched %d games", len(games))
     return games
 
 
+# Fields of a per-book game quote (games[event_id]["books"][book_key])
+BOOK_QUOTE_FIELDS = (
+    "home_price", "away_price", "home_spread", "home_spread_price",
+    "away_spread_price", "total_line", "over_price", "under_price",
+)
+
+
 # ── Player props ──────────────────────────────────────────────────────────────
 
 PROPS_LOOKAHEAD_DAYS = 14   # only fetch props for games within this window
 PROPS_REGION = "us"         # single region for props to minimise credit use
+PROPS_MAX_WORKERS = int(os.environ.get("ODDS_PROPS_CONCURRENCY", 6))
+# Credits to leave untouched for game-line refreshes; props stop short of this
+ODDS_CREDIT_RESERVE = int(os.environ.get("ODDS_CREDIT_RESERVE", 20))
+
+
+def props_credit_cost() -> int:
+    """Credits one per-event props call costs (markets × regions)."""
+    return len(PROP_MARKETS) * len(PROPS_REGION.split(","))
+
+
+def _fetch_event_props(api_key: str, event_id: str, budget: dict) -> dict | None:
+    """
+    GET one event's props and return its parsed market outcomes (None if the
+    event has no props yet or the credit budget ran out before the call).
+    """
+    with budget["lock"]:
+        if budget["remaining"] is not None and budget["remaining"] - props_credit_cost() < ODDS_CREDIT_RESERVE:
+            budget["skipped"] += 1
+            return None
+        if budget["remaining"] is not None:
+            budget["remaining"] -= props_credit_cost()
+
+    url = f"{BASE_URL}/sports/{SPORT}/events/{event_id}/odds"
+    params = {
+        "apiKey":     api_key,
+        "regions":    PROPS_REGION,
+        "markets":    ",".join(PROP_MARKETS),
+        "oddsFormat": ODDS_FORMAT,
+    }
+    resp = _get_session().get(url, params=params, timeout=15)
+    reported = resp.headers.get("x-requests-remaining")
+    if reported is not None and reported.isdigit():
+        with budget["lock"]:
+            # Responses land out of order — the lowest figure is the freshest
+            if budget["remaining"] is None or int(reported) < budget["remaining"]:
+                budget["remaining"] = int(reported)
+            if budget["reported"] is None or int(reported) < budget["reported"]:
+                budget["reported"] = int(reported)
+    if resp.status_code in (404, 422):
+        # No props available for this event yet
+        return None
+    try:
+        resp.raise_for_status()
+    except requests.exceptions.HTTPError:
+        return None
+    return _parse_event_props(resp.json())
+
+
+def _parse_event_props(event: dict) -> dict[str, dict[str, list]]:
+    """
+    Collect all outcomes across all bookmakers, tagged with book key:
+    market_outcomes[market_key][player_name_norm] = [{"name":side, "point":..., "price":..., "_book":...}]
+    """
+    market_outcomes: dict[str, dict[str, list]] = {}
+
+    for book in event.get("bookmakers", []):
+        book_key = book["key"]
+        for market in book.get("markets", []):
+            mkey = market["key"]
+            if mkey not in PROP_MARKETS:
+                continue
+            market_outcomes.setdefault(mkey, {})
+            for o in market.get("outcomes", []):
+                desc  = o.get("description", "")
+                norm  = _normalize(desc)
+                if not norm:
+                    continue
+                market_outcomes[mkey].setdefault(norm, []).append({
+                    "name":  o.get("name"),   # "Over" / "Under" / player name
+                    "point": o.get("point"),
+                    "price": o.get("price"),
+                    "_book": book_key,
+                })
+    return market_outcomes
+
+
+def game_lines_credit_cost() -> int:
+    """Credits one bulk game-lines call costs (markets × regions)."""
+    return len(GAME_MARKETS.split(",")) * len(REGIONS.split(","))
 
-def fetch_player_props(api_key: str, name_lookup: dict[str, str], games: dict) -> list:
+
+def fetch_player_props(api_key: str, name_lookup: dict[str, str], games: dict) -> tuple[list, set]:
     """
     Fetch player props per event (the bulk /odds endpoint does not support prop
     markets). Only processes games starting within PROPS_LOOKAHEAD_DAYS to
     avoid burning credits on fixtures that have no lines yet.
-    """
-    import nflverse_stats as ns
 
+    Returns (props list, ids of the events whose props were fetched and parsed).
+    Events that failed, had no props yet or were skipped for the credit
+    reserve are not in the set — callers keep their old props.
+
+    Events are fetched concurrently (PROPS_MAX_WORKERS) on a pooled session and
+    parsed as they arrive; soonest kickoffs are requested first, and no call is
+    made that would take the credit balance below ODDS_CREDIT_RESERVE. Results
+    are merged in event order, so the output doesn't depend on response timing.
+    """
     cutoff = datetime.datetime.utcnow() + datetime.timedelta(days=PROPS_LOOKAHEAD_DAYS)
     upcoming = []
     for g in games.values():
@@ -250,124 +417,129 @@ def fetch_player_props(api_key: str, name_lookup: dict[str, str], games: dict) -
 
     logger.info("odds: fetching props for %d events within %d days", len(upcoming), PROPS_LOOKAHEAD_DAYS)
 
+    budget = {"lock": threading.Lock(), "remaining": odds_credits_remaining, "reported": None, "skipped": 0}
+    fetch_order = sorted(upcoming, key=lambda g: g["commence_time"])
+    parsed: dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, PROPS_MAX_WORKERS)) as pool:
+        futures = {
+            pool.submit(_fetch_event_props, api_key, g["event_id"], budget): g["event_id"]
+            for g in fetch_order
+        }
+        for future in as_completed(futures):
+            event_id = futures[future]
+            try:
+                outcomes = future.result()
+            except requests.exceptions.RequestException as e:
+                logger.warning("odds: props fetch failed for %s (%s)", event_id, e)
+                continue
+            if outcomes is not None:
+                parsed[event_id] = outcomes
+
+    _set_credits_remaining(budget["reported"])
+
+    if budget["skipped"]:
+        logger.warning("odds: skipped props for %d events — credit reserve (%d) reached",
+                       budget["skipped"], ODDS_CREDIT_RESERVE)
+
     player_data: dict[str, dict] = {}
     player_event: dict[str, dict] = {}
     player_meta: dict[str, dict] = {}
 
     for g in upcoming:
-        event_id  = g["event_id"]
-        home_abbr = g["home_abbr"]
-        away_abbr = g["away_abbr"]
-        commence  = g["commence_time"]
-
-        url = f"{BASE_URL}/sports/{SPORT}/events/{event_id}/odds"
-        params = {
-            "apiKey":     api_key,
-            "regions":    PROPS_REGION,
-            "markets":    ",".join(PROP_MARKETS),
-            "oddsFormat": ODDS_FORMAT,
-        }
-        try:
-            resp = requests.get(url, params=params, timeout=15)
-            _extract_headers(resp)
-            if resp.status_code in (404, 422):
-                # No props available for this event yet
-                continue
-            resp.raise_for_status()
-        except requests.exceptions.HTTPError:
+        market_outcomes = parsed.get(g["event_id"])
+        if market_outcomes is None:
             continue
+        _merge_event_props(g, market_outcomes, name_lookup, player_data, player_event, player_meta)
 
-        event = resp.json()
+    # No-vig pricing across books and weekly hit rates (one batched pass each),
+    # then value flags and the final list
+    odds_pricing.price_props(player_data)
+    odds_hitrate.apply(player_data)
+    props_list = _compute_value_flags(player_data, player_event, player_meta)
+    logger.info("odds: fetched props for %d players", len(props_list))
+    return props_list, set(parsed)
 
-        # Collect all outcomes across all bookmakers, tagged with book key
-        # market_outcomes[market_key][player_name_norm] = [{"name":side, "point":..., "price":..., "_book":...}]
-        market_outcomes: dict[str, dict[str, list]] = {}
 
-        for book in event.get("bookmakers", []):
-            book_key = book["key"]
-            for market in book.get("markets", []):
-                mkey = market["key"]
-                if mkey not in PROP_MARKETS:
-                    continue
-                market_outcomes.setdefault(mkey, {})
-                for o in market.get("outcomes", []):
-                    desc  = o.get("description", "")
-                    norm  = _normalize(desc)
-                    if not norm:
-                        continue
-                    market_outcomes[mkey].setdefault(norm, []).append({
-                        "name":  o.get("name"),   # "Over" / "Under" / player name
-                        "point": o.get("point"),
-                        "price": o.get("price"),
-                        "_book": book_key,
-                    })
-
-        for mkey, players_outcomes in market_outcomes.items():
-            for norm_name, outcomes in players_outcomes.items():
-                sleeper_id = name_lookup.get(norm_name)
-                if not sleeper_id:
-                    continue
+def _merge_event_props(g, market_outcomes, name_lookup, player_data, player_event, player_meta) -> None:
+    """Fold one event's parsed outcomes into the per-player accumulators."""
+    import nflverse_stats as ns
 
-                # Determine line (use first point value found)
-                line = next((o["point"] for o in outcomes if o.get("point") is not None), None)
-
-                # Best over price (highest = best for bettor)
-                over_outcomes  = [o for o in outcomes if o["name"] == "Over"]
-                under_outcomes = [o for o in outcomes if o["name"] == "Under"]
-
-                best_over_price, best_over_book   = None, None
-                best_under_price, best_under_book = None, None
-
-                for o in over_outcomes:
-                    if o["price"] is not None:
-                        if best_over_price is None or o["price"] > best_over_price:
-                            best_over_price = o["price"]
-                            best_over_book  = o["_book"]
-
-                for o in under_outcomes:
-                    if o["price"] is not None:
-                        if best_under_price is None or o["price"] > best_under_price:
-                            best_under_price = o["price"]
-                            best_under_book  = o["_book"]
-
-                player_data.setdefault(sleeper_id, {})
-                existing = player_data[sleeper_id].get(mkey, {})
-
-                # Keep whichever book/line we found first (all books should agree on the line)
-                if mkey not in player_data[sleeper_id] or (
-                    best_over_price is not None and
-                    best_over_price > existing.get("best_over_price", -9999)
-                ):
-                    player_data[sleeper_id][mkey] = {
-                        "line":             line,
-                        "best_over_price":  best_over_price,
-                        "best_over_book":   best_over_book,
-                        "best_under_price": best_under_price,
-                        "best_under_book":  best_under_book,
-                    }
-
-                # Store event context (first seen wins)
-                if sleeper_id not in player_event:
-                    player_event[sleeper_id] = {
-                        "event_id":      event_id,
-                        "home_abbr":     home_abbr,
-                        "away_abbr":     away_abbr,
-                        "commence_time": commence,
-                    }
-
-                # Store meta from nflverse (authoritative)
-                if sleeper_id not in player_meta:
-                    p = ns.nflverse_player_stats.get(sleeper_id, {})
-                    player_meta[sleeper_id] = {
-                        "name":     p.get("name", ""),
-                        "position": p.get("position", ""),
-                        "team":     p.get("team", ""),
-                    }
-
-    # Compute value flags and assemble final list
-    props_list = _compute_value_flags(player_data, player_event, player_meta)
-    logger.info("odds: fetched props for %d players", len(props_list))
-    return props_list
+    event_id  = g["event_id"]
+    home_abbr = g["home_abbr"]
+    away_abbr = g["away_abbr"]
+    commence  = g["commence_time"]
+
+    for mkey, players_outcomes in market_outcomes.items():
+        for norm_name, outcomes in players_outcomes.items():
+            sleeper_id = name_lookup.get(norm_name)
+            if not sleeper_id:
+                continue
+
+            # Determine line (use first point value found)
+            line = next((o["point"] for o in outcomes if o.get("point") is not None), None)
+
+            # Best over price (highest = best for bettor)
+            over_outcomes  = [o for o in outcomes if o["name"] == "Over"]
+            under_outcomes = [o for o in outcomes if o["name"] == "Under"]
+
+            best_over_price, best_over_book   = None, None
+            best_under_price, best_under_book = None, None
+
+            for o in over_outcomes:
+                if o["price"] is not None:
+                    if best_over_price is None or o["price"] > best_over_price:
+                        best_over_price = o["price"]
+                        best_over_book  = o["_book"]
+
+            for o in under_outcomes:
+                if o["price"] is not None:
+                    if best_under_price is None or o["price"] > best_under_price:
+                        best_under_price = o["price"]
+                        best_under_book  = o["_book"]
+
+            # Every book's own quote, for odds_pricing
+            books: dict[str, dict] = {}
+            for o in over_outcomes + under_outcomes:
+                if o["price"] is None:
+                    continue
+                quote = books.setdefault(o["_book"], {})
+                quote["point"] = o.get("point")
+                quote["over_price" if o["name"] == "Over" else "under_price"] = o["price"]
+
+            player_data.setdefault(sleeper_id, {})
+            existing = player_data[sleeper_id].get(mkey, {})
+
+            # Keep whichever book/line we found first (all books should agree on the line)
+            if mkey not in player_data[sleeper_id] or (
+                best_over_price is not None and
+                best_over_price > existing.get("best_over_price", -9999)
+            ):
+                player_data[sleeper_id][mkey] = {
+                    "line":             line,
+                    "best_over_price":  best_over_price,
+                    "best_over_book":   best_over_book,
+                    "best_under_price": best_under_price,
+                    "best_under_book":  best_under_book,
+                    "books":            books,
+                }
+
+            # Store event context (first seen wins)
+            if sleeper_id not in player_event:
+                player_event[sleeper_id] = {
+                    "event_id":      event_id,
+                    "home_abbr":     home_abbr,
+                    "away_abbr":     away_abbr,
+                    "commence_time": commence,
+                }
+
+            # Store meta from nflverse (authoritative)
+            if sleeper_id not in player_meta:
+                p = ns.nflverse_player_stats.get(sleeper_id, {})
+                player_meta[sleeper_id] = {
+                    "name":     p.get("name", ""),
+                    "position": p.get("position", ""),
+                    "team":     p.get("team", ""),
+                }
 
 
 # ── Value flags ───────────────────────────────────────────────────────────────
@@ -428,25 +600,137 @@ def _compute_value_flags(
 
 # ── History snapshot ─────────────────────────────────────────────────────────
 
-def snapshot_current_games(ou_eval_fn) -> int:
-    """Copy current odds_games into odds_history. Idempotent — skips existing event_ids."""
+def snapshot_current_games(ou_evals: dict) -> int:
+    """
+    Copy current odds_games into odds_history, with the precomputed ou_eval per
+    event_id. Idempotent — skips existing event_ids. Bumps odds_version when
+    anything was added.
+    """
+    global odds_version
+
     added = 0
     for event_id, game in odds_games.items():
         if event_id not in odds_history:
             entry = dict(game)
-            total_line = (game.get("total") or {}).get("line")
-            entry["ou_eval"] = ou_eval_fn(game.get("home_abbr", ""), game.get("away_abbr", ""), total_line)
+            entry["ou_eval"] = ou_evals.get(event_id)
             entry["snapshotted_at"] = datetime.datetime.utcnow().isoformat() + "Z"
             odds_history[event_id] = entry
             added += 1
+    if added:
+        odds_version += 1
     return added
 
 
+# ── Snapshot export / import (snapshot_store) ───────────────────────────────
+
+def export_state() -> dict:
+    """The published odds stores, for handing to another process."""
+    return {
+        "games":             odds_games,
+        "props":             odds_props,
+        "history":           odds_history,
+        "credits_remaining": odds_credits_remaining,
+        "last_updated":      odds_last_updated,
+        "lines_updated_at":  odds_lines_updated_at,
+        "props_updated_at":  odds_props_updated_at,
+    }
+
+
+def load_state(state: dict, version: int | None = None) -> None:
+    """
+    Replace the odds stores with an export_state() dict and rebuild the indexes.
+    The stores are rebound (not refilled) so readers never see them half-loaded;
+    `version` replaces the odds_version bump.
+    """
+    global odds_games, odds_props, odds_history, odds_props_updated_at
+    global odds_credits_remaining, odds_last_updated, odds_lines_updated_at
+
+    odds_games             = state["games"]
+    odds_props             = state["props"]
+    odds_history           = state["history"]
+    odds_props_updated_at  = state["props_updated_at"]
+    odds_credits_remaining = state["credits_remaining"]
+    odds_last_updated      = state["last_updated"]
+    odds_lines_updated_at  = state["lines_updated_at"]
+    rebuild_indexes(version)
+
+
 # ── Refresh orchestrator ──────────────────────────────────────────────────────
 
+def _now_iso() -> str:
+    return datetime.datetime.utcnow().isoformat() + "Z"
+
+
+def rebuild_indexes(version: int | None = None) -> None:
+    """
+    Rebuild the lookup indexes and the presorted value list from odds_props /
+    odds_games and bump odds_version (or set it to `version`). Called after
+    every publish (and by tests after seeding the stores directly).
+    """
+    global odds_version, odds_value_ids
+
+    by_id: dict = {}
+    by_market: dict = {}
+    value_flat: list = []
+    value_ids: set = set()
+    for p in odds_props:
+        by_id.setdefault(p["sleeper_id"], p)
+        for mkey, m in p.get("props", {}).items():
+            by_market.setdefault(mkey, []).append(p)
+            if not m.get("value_flag"):
+                continue
+            value_ids.add(p["sleeper_id"])
+            value_flat.append({
+                "sleeper_id":    p["sleeper_id"],
+                "name":          p["name"],
+                "position":      p["position"],
+                "team":          p["team"],
+                "event_id":      p.get("event_id"),
+                "home_abbr":     p.get("home_abbr"),
+                "away_abbr":     p.get("away_abbr"),
+                "commence_time": p.get("commence_time"),
+                "market":        mkey,
+                **m,
+            })
+    value_flat.sort(key=lambda x: abs(x.get("value_pct") or 0), reverse=True)
+
+    odds_props_by_id.clear();     odds_props_by_id.update(by_id)
+    odds_props_by_market.clear(); odds_props_by_market.update(by_market)
+    odds_value_props[:] = value_flat
+    odds_value_ids = value_ids
+    odds_status_counts.clear()
+    odds_status_counts.update({
+        "game_count":        len(odds_games),
+        "player_prop_count": len(odds_props),
+        "value_flag_count":  len(value_flat),
+    })
+    odds_version = odds_version + 1 if version is None else version
+
+
+def _record_movement(games: dict) -> None:
+    import odds_movement
+    try:
+        odds_movement.record(games)
+    except Exception:
+        logger.exception("odds: recording line movement failed")
+
+
+def _splice_props(props: list, fetched: set, keep: dict | None = None) -> None:
+    """
+    Replace the props of the `fetched` events with `props`; every other event
+    keeps what it had (restricted to the events in `keep`, if given).
+    """
+    kept = [p for p in odds_props
+            if p.get("event_id") not in fetched and (keep is None or p.get("event_id") in keep)]
+    kept_ids = {p["sleeper_id"] for p in kept}
+    odds_props.clear()
+    odds_props.extend(kept)
+    odds_props.extend(p for p in props if p["sleeper_id"] not in kept_ids)
+
+
 def refresh_odds_data(api_key: str | None = None) -> None:
     """Download and rebuild all odds in-memory data. Safe to call repeatedly."""
-    global odds_games, odds_props, odds_last_updated
+    global odds_games, odds_props, odds_last_updated, odds_lines_updated_at
 
     if not api_key:
         logger.warning("odds: no ODDS_API_KEY set, skipping refresh")
@@ -457,13 +741,17 @@ def refresh_odds_data(api_key: str | None = None) -> None:
         name_lookup = _build_name_lookup()
 
         games = fetch_game_odds(api_key)
-        props = fetch_player_props(api_key, name_lookup, games)
+        props, fetched = fetch_player_props(api_key, name_lookup, games)
 
         odds_games.clear()
         odds_games.update(games)
-        odds_props.clear()
-        odds_props.extend(props)
-        odds_last_updated = datetime.datetime.utcnow().isoformat() + "Z"
+        _splice_props(props, fetched, keep=games)
+        odds_last_updated = odds_lines_updated_at = _now_iso()
+        _record_movement(games)
+        for event_id in [e for e in odds_props_updated_at if e not in games]:
+            del odds_props_updated_at[event_id]
+        odds_props_updated_at.update({event_id: odds_last_updated for event_id in fetched})
+        rebuild_indexes()
 
         logger.info(
             "odds: done — %d games, %d players with props, credits_remaining=%s",
@@ -471,3 +759,62 @@ def refresh_odds_data(api_key: str | None = None) -> None:
         )
     except Exception:
         logger.exception("odds: refresh failed")
+
+
+def refresh_game_lines(api_key: str | None = None) -> bool:
+    """
+    Re-fetch game lines only (one bulk call). Props are kept for events that
+    are still listed. Returns True on success.
+    """
+    global odds_last_updated, odds_lines_updated_at
+
+    if not api_key:
+        logger.warning("odds: no ODDS_API_KEY set, skipping lines refresh")
+        return False
+    try:
+        games = fetch_game_odds(api_key)
+    except Exception:
+        logger.exception("odds: lines refresh failed")
+        return False
+
+    odds_games.clear()
+    odds_games.update(games)
+    kept = [p for p in odds_props if p.get("event_id") in games]
+    odds_props.clear()
+    odds_props.extend(kept)
+    for event_id in [e for e in odds_props_updated_at if e not in games]:
+        del odds_props_updated_at[event_id]
+    odds_last_updated = odds_lines_updated_at = _now_iso()
+    _record_movement(games)
+    rebuild_indexes()
+    logger.info("odds: lines refreshed — %d games, credits_remaining=%s", len(games), odds_credits_remaining)
+    return True
+
+
+def refresh_event_props(api_key: str | None, event_ids: list[str]) -> bool:
+    """
+    Re-fetch props for the given events only and splice them into odds_props;
+    players from other events are left as they are. Returns True on success.
+    """
+    global odds_last_updated
+
+    if not api_key:
+        logger.warning("odds: no ODDS_API_KEY set, skipping props refresh")
+        return False
+    games = {eid: odds_games[eid] for eid in event_ids if eid in odds_games}
+    if not games:
+        return False
+    try:
+        props, fetched = fetch_player_props(api_key, _build_name_lookup(), games)
+    except Exception:
+        logger.exception("odds: props refresh failed")
+        return False
+
+    _splice_props(props, fetched)
+    now = _now_iso()
+    odds_props_updated_at.update({eid: now for eid in fetched})
+    odds_last_updated = now
+    rebuild_indexes()
+    logger.info("odds: props refreshed for %d of %d events — %d players total",
+                len(fetched), len(games), len(odds_props))
+    return True
@@ -0,0 +1,277 @@
+"""
+odds_backtest.py — replay odds_history against final scores to tune _ou_eval.
+
+For every stored snapshot with a final score, the season / rolling-5 /
+rolling-3 implied totals are rebuilt point-in-time from the nflverse games
+of the same season played before that gameday (the same blend _ou_eval uses
+on live, season-to-date team stats).
+The whole weight × threshold grid is then evaluated at once with NumPy
+broadcasting — implied totals are (weights × games), signals
+(weights × thresholds × games) — and each configuration reports bets,
+accuracy, ROI at the snapshotted over/under prices, and how well its implied
+totals track the actual ones (bias, MAE).
+
+Served on /odds/backtest for the coarse SERVED_WEIGHT_STEPS; finer grids
+(memory grows with W × T × G) are for the command line:
+
+    python odds_backtest.py --history data/odds_history.json --seasons 2024 2025 --step 0.01
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
+import nflverse_stats as ns
+import odds_api as oa
+
+logger = logging.getLogger(__name__)
+
+# _ou_eval blend of season / rolling-5 / rolling-3 implied totals; without
+# rolling-3 data the rolling-5 weight takes the remainder, without rolling-5
+# the season average is used alone. Tuned with this module.
+OU_WEIGHT_SEASON = 0.40
+OU_WEIGHT_R5     = 0.35
+OU_WEIGHT_R3     = 0.25
+# |implied − line| / line needed for an over/under signal
+OU_EDGE_THRESHOLD = 0.05
+
+DEFAULT_WEIGHT_STEP = 0.05
+# Weight steps /odds/backtest accepts (0.05 → 231 weight combinations)
+SERVED_WEIGHT_STEPS = (0.05, 0.1, 0.2, 0.25)
+DEFAULT_THRESHOLDS = np.round(np.arange(0.0, 0.1501, 0.005), 3)
+
+
+# ── Point-in-time features ────────────────────────────────────────────────────
+
+def _season_games(games_by_week: dict):
+    """(season, game) for every game; games_by_week is keyed (season, week) when
+    it spans several seasons (the CLI), by week alone for the live season."""
+    for key, games in games_by_week.items():
+        season = key[0] if isinstance(key, tuple) else None
+        for g in games:
+            yield g.get("season", season), g
+
+
+def _team_logs(games_by_week: dict) -> dict:
+    """(season, team) → [(gameday, points_for, points_against), ...] for finished games, by gameday."""
+    logs: dict = {}
+    for season, g in _season_games(games_by_week):
+        if g.get("home_score") is None or g.get("away_score") is None:
+            continue
+        logs.setdefault((season, g["home_team"]), []).append((g["gameday"], g["home_score"], g["away_score"]))
+        logs.setdefault((season, g["away_team"]), []).append((g["gameday"], g["away_score"], g["home_score"]))
+    for log in logs.values():
+        log.sort()
+    return logs
+
+
+def _form(log: list, before: str) -> tuple | None:
+    """(ppg, papg, r5, ar5, r3, ar3) from a team's games of one season strictly before a gameday."""
+    prior = [(pf, pa) for day, pf, pa in log if day < before]
+    if not prior:
+        return None
+    pf = np.array([p[0] for p in prior], dtype=float)
+    pa = np.array([p[1] for p in prior], dtype=float)
+    return pf.mean(), pa.mean(), pf[-5:].mean(), pa[-5:].mean(), pf[-3:].mean(), pa[-3:].mean()
+
+
+def build_features(history: dict, games_by_week: dict) -> dict:
+    """
+    Join odds_history snapshots to final scores and rebuild the model inputs.
+
+    Returns arrays over the G usable games: components (3 × G: season,
+    rolling-5, rolling-3 implied totals), line, actual, over_price,
+    under_price, plus the matching event_ids.
+    """
+    index = {(g["home_team"], g["away_team"], g["gameday"]): (season, g)
+             for season, g in _season_games(games_by_week)}
+    logs = _team_logs(games_by_week)
+
+    rows, event_ids = [], []
+    for event_id, stored in history.items():
+        total = stored.get("total") or {}
+        line = total.get("line")
+        season, game = index.get(oa.nflverse_game_key(stored), (None, None))
+        if not line or game is None or game.get("home_score") is None:
+            continue
+        home = _form(logs.get((season, game["home_team"]), []), game["gameday"])
+        away = _form(logs.get((season, game["away_team"]), []), game["gameday"])
+        if home is None or away is None:
+            continue
+        h_ppg, h_apg, h_r5, h_ar5, h_r3, h_ar3 = home
+        a_ppg, a_apg, a_r5, a_ar5, a_r3, a_ar3 = away
+        # home + away implied points per window, as in _ou_eval
+        season = (h_ppg + a_apg) / 2 + (a_ppg + h_apg) / 2
+        r5 = (h_r5 + a_ar5) / 2 + (a_r5 + h_ar5) / 2
+        r3 = (h_r3 + a_ar3) / 2 + (a_r3 + h_ar3) / 2
+        rows.append((season, r5, r3, line, game["home_score"] + game["away_score"],
+                     total.get("over_price") or np.nan, total.get("under_price") or np.nan))
+        event_ids.append(event_id)
+
+    data = np.array(rows, dtype=float).reshape(-1, 7)
+    return {
+        "components":  data[:, :3].T,
+        "line":        data[:, 3],
+        "actual":      data[:, 4],
+        "over_price":  data[:, 5],
+        "under_price": data[:, 6],
+        "event_ids":   event_ids,
+    }
+
+
+# ── Grid search ───────────────────────────────────────────────────────────────
+
+def weight_grid(step: float = DEFAULT_WEIGHT_STEP) -> np.ndarray:
+    """All (season, rolling-5, rolling-3) weights on a `step` lattice summing to 1."""
+    n = int(round(1 / step))
+    i, j = np.meshgrid(np.arange(n + 1), np.arange(n + 1), indexing="ij")
+    keep = i + j <= n
+    ws, w5 = i[keep], j[keep]
+    return np.stack([ws, w5, n - ws - w5], axis=1) / n
+
+
+def grid_search(features: dict, weights: np.ndarray, thresholds: np.ndarray) -> dict:
+    """
+    Evaluate every (weights, threshold) pair. Returns (W × T) arrays bets,
+    wins, accuracy, profit, roi and (W,) arrays bias, mae.
+    """
+    implied = weights @ features["components"]                       # W × G
+    line, actual = features["line"], features["actual"]
+    edge = (implied - line) / line                                   # W × G
+
+    t = thresholds[None, :, None]
+    bet_over = edge[:, None, :] > t                                  # W × T × G
+    bet_under = edge[:, None, :] < -t
+    went_over, went_under = actual > line, actual < line             # G
+
+    # Profit per unit staked; a push returns the stake, a missing price counts as even money
+    over_win = np.nan_to_num(features["over_price"], nan=2.0) - 1.0
+    under_win = np.nan_to_num(features["under_price"], nan=2.0) - 1.0
+    profit_over = np.where(went_over, over_win, np.where(went_under, -1.0, 0.0))
+    profit_under = np.where(went_under, under_win, np.where(went_over, -1.0, 0.0))
+
+    bets = (bet_over | bet_under).sum(axis=2)
+    decided = (bet_over & (went_over | went_under)).sum(axis=2) + (bet_under & (went_over | went_under)).sum(axis=2)
+    wins = (bet_over & went_over).sum(axis=2) + (bet_under & went_under).sum(axis=2)
+    profit = (bet_over * profit_over).sum(axis=2) + (bet_under * profit_under).sum(axis=2)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        accuracy = np.where(decided > 0, wins / decided, np.nan)
+        roi = np.where(bets > 0, profit / bets, np.nan)
+
+    error = implied - actual
+    return {
+        "bets": bets, "wins": wins, "accuracy": accuracy, "profit": profit, "roi": roi,
+        "bias": error.mean(axis=1) if error.size else np.full(len(weights), np.nan),
+        "mae": np.abs(error).mean(axis=1) if error.size else np.full(len(weights), np.nan),
+    }
+
+
+def _num(x, digits: int = 4):
+    return None if not np.isfinite(x) else round(float(x), digits)
+
+
+def _config(weights, thresholds, result, wi: int, ti: int) -> dict:
+    return {
+        "weights":   {"season": _num(weights[wi][0], 3), "rolling5": _num(weights[wi][1], 3),
+                      "rolling3": _num(weights[wi][2], 3)},
+        "threshold": _num(thresholds[ti], 3),
+        "bets":      int(result["bets"][wi, ti]),
+        "accuracy":  _num(result["accuracy"][wi, ti]),
+        "roi":       _num(result["roi"][wi, ti]),
+        "bias":      _num(result["bias"][wi], 2),
+        "mae":       _num(result["mae"][wi], 2),
+    }
+
+
+def evaluate(history: dict, games_by_week: dict, step: float = DEFAULT_WEIGHT_STEP,
+             thresholds: np.ndarray | None = None) -> dict:
+    """
+    The grid search behind a report: the current _ou_eval configuration (weight
+    row 0) and the `step` weight grid, against every threshold. The result only
+    holds (W × T) summaries, so it is cheap to keep and re-rank with report().
+    """
+    thresholds = DEFAULT_THRESHOLDS if thresholds is None else np.asarray(thresholds, dtype=float)
+    current_w = np.array([[OU_WEIGHT_SEASON, OU_WEIGHT_R5, OU_WEIGHT_R3]])
+    weights = np.vstack([current_w, weight_grid(step)])
+    thresholds = np.unique(np.append(thresholds, OU_EDGE_THRESHOLD))
+
+    features = build_features(history, games_by_week)
+    return {
+        "weights":    weights,
+        "thresholds": thresholds,
+        "result":     grid_search(features, weights, thresholds),
+        "games":      len(features["event_ids"]),
+        "history":    len(history),
+    }
+
+
+def report(evaluated: dict, min_bets: int = 10, top: int = 20) -> dict:
+    """Backtest report from evaluate(): the current configuration and the top configurations by ROI."""
+    weights, thresholds, result = evaluated["weights"], evaluated["thresholds"], evaluated["result"]
+    current = _config(weights, thresholds, result, 0, int(np.searchsorted(thresholds, OU_EDGE_THRESHOLD)))
+    roi = np.where(result["bets"][1:] >= min_bets, result["roi"][1:], np.nan)
+    order = np.argsort(np.nan_to_num(-roi, nan=np.inf), axis=None)
+    best = []
+    for flat in order[:top]:
+        wi, ti = np.unravel_index(flat, roi.shape)
+        if np.isnan(roi[wi, ti]):
+            break
+        best.append(_config(weights, thresholds, result, wi + 1, ti))
+
+    return {
+        "games":          evaluated["games"],
+        "history":        evaluated["history"],
+        "configurations": int(roi.size),
+        "min_bets":       min_bets,
+        "current":        current,
+        "best":           best,
+    }
+
+
+def run_backtest(history: dict, games_by_week: dict, step: float = DEFAULT_WEIGHT_STEP,
+                 thresholds: np.ndarray | None = None, min_bets: int = 10, top: int = 20) -> dict:
+    """Backtest report: the current _ou_eval configuration and the top configurations by ROI."""
+    return report(evaluate(history, games_by_week, step, thresholds), min_bets, top)
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def _load_games(seasons: list[int]) -> dict:
+    """Regular-season games for the given seasons, keyed (season, week) like games_by_week values."""
+    import nflreadpy as nfl
+    import nflverse_history as nh
+
+    games: dict = {}
+    stored = set(nh.available_seasons())
+    for season in seasons:
+        if season in stored:
+            frame = nh._read("schedule", season)
+        else:
+            frame = ns._scan(ns._load("schedules", season, nfl.load_schedules), ns._SCHED_COLS, "game_type")
+        _, by_week, _ = ns.build_schedule_dicts(frame)
+        for week, week_games in by_week.items():
+            games[(season, week)] = week_games
+    return games
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Backtest the over/under model against odds_history")
+    parser.add_argument("--history", default="data/odds_history.json", help="odds_history JSON file")
+    parser.add_argument("--seasons", type=int, nargs="+", required=True, help="NFL seasons to load scores for")
+    parser.add_argument("--step", type=float, default=DEFAULT_WEIGHT_STEP, help="weight grid step")
+    parser.add_argument("--min-bets", type=int, default=10)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    history = json.loads(Path(args.history).read_text())
+    report = run_backtest(history, _load_games(args.seasons), step=args.step,
+                          min_bets=args.min_bets, top=args.top)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
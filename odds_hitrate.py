@@ -0,0 +1,108 @@
+"""
+odds_hitrate.py — prop hit rates against nflverse weekly distributions.
+
+The rolling-5 value flag compares a line to a single average. This module
+looks at the distribution instead: for every prop market it takes the player's
+last HITRATE_GAMES weekly values from nflverse_player_stats and reports how
+often the line went over / under, a smoothed empirical probability and the
+expected value of the best available price at that probability.
+
+All (player, market) pairs of a props fetch are packed into one
+(props × games) matrix, NaN-padded for players with fewer games, and
+evaluated together.
+"""
+
+import os
+
+import numpy as np
+
+import nflverse_stats as ns
+
+HITRATE_GAMES = int(os.environ.get("ODDS_HITRATE_GAMES", 10))
+
+# Market key → weekly stat columns summed for the market
+HITRATE_STATS = {
+    "player_pass_yds":      ("passing_yards",),
+    "player_rush_yds":      ("rushing_yards",),
+    "player_reception_yds": ("receiving_yards",),
+    "player_anytime_td":    ("rushing_tds", "receiving_tds"),
+}
+
+# Markets without a posted line (yes/no) are evaluated at this line
+DEFAULT_LINES = {"player_anytime_td": 0.5}
+
+
+def _recent_values(weekly: list, cols: tuple, n: int) -> list:
+    rows = weekly[-n:]
+    return [sum(w.get(c) or 0.0 for c in cols) for w in rows]
+
+
+def hit_rates(values: np.ndarray, lines: np.ndarray, over_prices: np.ndarray, under_prices: np.ndarray) -> dict:
+    """
+    values: (N × games) weekly stat values, NaN where the player has no game.
+    lines / prices: length N. Pushes count as games but neither over nor under.
+
+    Returns arrays of length N: games, over, under (hit rates), p_over, p_under
+    (Laplace-smoothed probabilities) and ev_over, ev_under (per unit staked).
+    """
+    played = ~np.isnan(values)
+    games = played.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        over = np.where(played, values > lines[:, None], False).sum(axis=1)
+        under = np.where(played, values < lines[:, None], False).sum(axis=1)
+        rate_over = np.where(games > 0, over / games, np.nan)
+        rate_under = np.where(games > 0, under / games, np.nan)
+        decided = over + under
+        p_over = np.where(games > 0, (over + 1) / (decided + 2), np.nan)
+        p_under = 1.0 - p_over
+        ev_over = p_over * over_prices - 1.0
+        ev_under = p_under * under_prices - 1.0
+    return {
+        "games": games, "over": rate_over, "under": rate_under,
+        "p_over": p_over, "p_under": p_under, "ev_over": ev_over, "ev_under": ev_under,
+    }
+
+
+def _num(x, digits: int = 3):
+    return None if not np.isfinite(x) else round(float(x), digits)
+
+
+def apply(player_data: dict, n: int = HITRATE_GAMES) -> None:
+    """
+    Attach a "hit_rate" block to every market in player_data
+    (sleeper_id → market key → {"line", "best_over_price", "best_under_price", ...})
+    using the players' nflverse weekly arrays.
+    """
+    entries, rows, lines, over_prices, under_prices = [], [], [], [], []
+    for sleeper_id, markets in player_data.items():
+        weekly = (ns.nflverse_player_stats.get(sleeper_id) or {}).get("weekly") or []
+        for mkey, m in markets.items():
+            cols = HITRATE_STATS.get(mkey)
+            line = m.get("line") if m.get("line") is not None else DEFAULT_LINES.get(mkey)
+            if cols is None or line is None or not weekly:
+                m["hit_rate"] = None
+                continue
+            entries.append(m)
+            rows.append(_recent_values(weekly, cols, n))
+            lines.append(line)
+            over_prices.append(np.nan if m.get("best_over_price") is None else m["best_over_price"])
+            under_prices.append(np.nan if m.get("best_under_price") is None else m["best_under_price"])
+    if not entries:
+        return
+
+    values = np.full((len(rows), n), np.nan)
+    for i, row in enumerate(rows):
+        if row:
+            values[i, -len(row):] = row
+    r = hit_rates(values, np.array(lines, dtype=float), np.array(over_prices), np.array(under_prices))
+
+    for i, m in enumerate(entries):
+        m["hit_rate"] = {
+            "games":   int(r["games"][i]),
+            "line":    lines[i],
+            "over":    _num(r["over"][i]),
+            "under":   _num(r["under"][i]),
+            "p_over":  _num(r["p_over"][i]),
+            "p_under": _num(r["p_under"][i]),
+            "ev":      {"over": _num(r["ev_over"][i]), "under": _num(r["ev_under"][i])},
+        }
@@ -0,0 +1,206 @@
+"""
+odds_movement.py — append-only line-movement history for odds_games.
+
+Every game-lines refresh records each event's quote per book (plus a "best"
+series built from the best-available prices) into a delta-encoded series:
+the first quote is stored in full, later points only as
+[seconds since previous point, {changed fields}], and a point is appended only
+when something changed. Persisted by nfl-helper next to odds_history
+(Supabase key "odds_movement" or DATA_DIR/odds_movement.json).
+
+Layout, indexed by event then book:
+    odds_movement[event_id] = {
+        "home_abbr", "away_abbr", "commence_time",
+        "books": {book_key: {"t0": epoch, "base": {...}, "deltas": [[dt, {...}], ...]}},
+    }
+The latest quote per series is cached alongside (not persisted) so appends and
+"current" reads don't replay the series.
+"""
+
+import datetime
+import logging
+import os
+import threading
+
+import odds_api as oa
+
+logger = logging.getLogger(__name__)
+
+# Events whose kickoff is older than this are dropped from the store
+RETENTION_DAYS = int(os.environ.get("ODDS_MOVEMENT_RETENTION_DAYS", 21))
+
+BEST_BOOK = "best"
+
+odds_movement: dict = {}
+_latest: dict = {}          # (event_id, book) → (epoch, quote) of the last point
+_lock = threading.Lock()
+
+
+def _epoch(iso: str) -> int:
+    dt = datetime.datetime.fromisoformat(iso.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return int(dt.timestamp())
+
+
+def _iso(epoch: int) -> str:
+    return datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _best_quote(game: dict) -> dict:
+    h2h, spread, total = game.get("h2h") or {}, game.get("spread") or {}, game.get("total") or {}
+    quote = {
+        "home_price":        h2h.get("home_price"),
+        "away_price":        h2h.get("away_price"),
+        "home_spread":       spread.get("home_spread"),
+        "home_spread_price": spread.get("home_price"),
+        "total_line":        total.get("line"),
+        "over_price":        total.get("over_price"),
+        "under_price":       total.get("under_price"),
+    }
+    return {k: v for k, v in quote.items() if v is not None}
+
+
+def _append(series: dict, key: tuple, ts: int, quote: dict) -> bool:
+    last = _latest.get(key)
+    if last is None:
+        series.update({"t0": ts, "base": dict(quote), "deltas": []})
+    else:
+        last_ts, last_quote = last
+        changed = {f: quote.get(f) for f in sorted(set(last_quote) | set(quote)) if quote.get(f) != last_quote.get(f)}
+        if not changed:
+            return False
+        series["deltas"].append([ts - last_ts, changed])
+    _latest[key] = (ts, dict(quote))
+    return True
+
+
+def record(games: dict, now: datetime.datetime | None = None) -> int:
+    """Append the current quotes of games (odds_games shape). Returns the number of points added."""
+    ts = int((now or datetime.datetime.now(datetime.timezone.utc)).timestamp())
+    added = 0
+    with _lock:
+        for event_id, game in games.items():
+            entry = odds_movement.setdefault(event_id, {"books": {}})
+            entry.update({
+                "home_abbr":     game.get("home_abbr"),
+                "away_abbr":     game.get("away_abbr"),
+                "commence_time": game.get("commence_time"),
+            })
+            quotes = dict(game.get("books") or {})
+            quotes[BEST_BOOK] = _best_quote(game)
+            for book, quote in quotes.items():
+                if not quote:
+                    continue
+                book_series = entry["books"].setdefault(book, {})
+                added += _append(book_series, (event_id, book), ts, quote)
+        _prune(ts)
+    return added
+
+
+def _prune(now_ts: int) -> None:
+    cutoff = now_ts - RETENTION_DAYS * 86400
+    for event_id in list(odds_movement):
+        commence = odds_movement[event_id].get("commence_time")
+        try:
+            stale = commence and _epoch(commence) < cutoff
+        except ValueError:
+            stale = False
+        if stale:
+            for book in odds_movement[event_id]["books"]:
+                _latest.pop((event_id, book), None)
+            del odds_movement[event_id]
+
+
+# ── Reads ─────────────────────────────────────────────────────────────────────
+
+def _replay(series: dict):
+    """Yield (epoch, quote) for every point of a series."""
+    ts, quote = series["t0"], dict(series["base"])
+    yield ts, dict(quote)
+    for dt, changed in series["deltas"]:
+        ts += dt
+        for field, value in changed.items():
+            if value is None:
+                quote.pop(field, None)
+            else:
+                quote[field] = value
+        yield ts, dict(quote)
+
+
+def series(event_id: str, book: str | None = None) -> dict | None:
+    """Expanded points per book: {book: [{"ts", **quote}, ...]}; None if the event is unknown."""
+    entry = odds_movement.get(event_id)
+    if entry is None:
+        return None
+    books = entry["books"] if book is None else {b: s for b, s in entry["books"].items() if b == book}
+    return {b: [{"ts": _iso(ts), **q} for ts, q in _replay(s)] for b, s in books.items()}
+
+
+def _closing(series_: dict, kickoff_ts: int | None):
+    """Last point at or before kickoff (None if the game hasn't started or no point qualifies)."""
+    if kickoff_ts is None or kickoff_ts > datetime.datetime.now(datetime.timezone.utc).timestamp():
+        return None
+    closing = None
+    for ts, quote in _replay(series_):
+        if ts > kickoff_ts:
+            break
+        closing = (ts, quote)
+    return closing
+
+
+def lines(event_id: str) -> dict | None:
+    """Open, current and (once kicked off) closing quote per book, with open→current change."""
+    entry = odds_movement.get(event_id)
+    if entry is None:
+        return None
+    try:
+        kickoff_ts = _epoch(entry["commence_time"]) if entry.get("commence_time") else None
+    except ValueError:
+        kickoff_ts = None
+
+    books = {}
+    for book, s in entry["books"].items():
+        current_ts, current = _latest.get((event_id, book)) or list(_replay(s))[-1]
+        closing = _closing(s, kickoff_ts)
+        books[book] = {
+            "open":    {"ts": _iso(s["t0"]), **s["base"]},
+            "current": {"ts": _iso(current_ts), **current},
+            "closing": {"ts": _iso(closing[0]), **closing[1]} if closing else None,
+            "change":  {
+                f: round(current[f] - s["base"][f], 3)
+                for f in oa.BOOK_QUOTE_FIELDS
+                if isinstance(current.get(f), (int, float)) and isinstance(s["base"].get(f), (int, float))
+            },
+            "points":  1 + len(s["deltas"]),
+        }
+    return {
+        "event_id":      event_id,
+        "home_abbr":     entry.get("home_abbr"),
+        "away_abbr":     entry.get("away_abbr"),
+        "commence_time": entry.get("commence_time"),
+        "books":         books,
+    }
+
+
+# ── Persistence helpers ───────────────────────────────────────────────────────
+
+def export() -> dict:
+    """JSON-ready copy of the store (the per-series latest cache is rebuilt on load)."""
+    with _lock:
+        return {
+            event_id: {**entry, "books": {b: dict(s, deltas=list(s["deltas"])) for b, s in entry["books"].items()}}
+            for event_id, entry in odds_movement.items()
+        }
+
+
+def load(data: dict) -> None:
+    """Replace the store with persisted data and rebuild the latest-point cache."""
+    with _lock:
+        odds_movement.clear()
+        odds_movement.update(data or {})
+        _latest.clear()
+        for event_id, entry in odds_movement.items():
+            for book, s in entry.get("books", {}).items():
+                *_, last = _replay(s)
+                _latest[(event_id, book)] = last
@@ -0,0 +1,229 @@
+"""
+odds_planner.py — credit-aware scheduling for The Odds API refreshes.
+
+Instead of refreshing everything on a fixed cron, a short interval job asks
+plan_refresh() what is worth buying right now. Game lines (one bulk call) and
+per-event props each have a maximum age that shrinks as kickoff approaches;
+whatever is stale is bought soonest-kickoff first, as long as it fits the
+day's credit allowance — the credits left above ODDS_CREDIT_RESERVE spread
+over the days until the monthly reset, with a multiplier on game days.
+
+plan_refresh() is pure (all inputs passed in) so it can be tested and shown on
+/odds/status; run_planned_refresh() gathers the inputs, executes the plan and
+records what it cost.
+"""
+
+import datetime
+import logging
+import os
+import threading
+from zoneinfo import ZoneInfo
+
+import odds_api as oa
+
+logger = logging.getLogger(__name__)
+
+PLAN_INTERVAL_MINUTES = int(os.environ.get("ODDS_PLAN_INTERVAL_MINUTES", 15))
+
+# (hours to kickoff ≤ bound, max age in hours); None = any further out
+LINES_MAX_AGE = [(3, 0.5), (24, 2), (72, 6), (None, 24)]
+PROPS_MAX_AGE = [(3, 1), (24, 3), (72, 12), (None, 24)]
+
+# On a day with a kickoff the planner may spend this many days' allowance
+GAMEDAY_MULTIPLIER = 3.0
+
+_ET = ZoneInfo("America/New_York")
+
+# Credits spent per UTC day (date iso → credits), last ~40 days
+_spend: dict = {}
+_spend_lock = threading.Lock()
+last_plan: dict | None = None
+
+
+def _max_age_hours(hours_to_kickoff: float, table: list) -> float:
+    for bound, age in table:
+        if bound is None or hours_to_kickoff <= bound:
+            return age
+    return table[-1][1]
+
+
+def _age_hours(now: datetime.datetime, iso: str | None) -> float | None:
+    if not iso:
+        return None
+    return (now - datetime.datetime.fromisoformat(iso.rstrip("Z"))).total_seconds() / 3600
+
+
+def _days_until_reset(now: datetime.datetime) -> int:
+    """Days left in the month including today (Odds API credits reset monthly)."""
+    first_next = (now.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+    return max(1, (first_next.date() - now.date()).days)
+
+
+def daily_allowance(credits_remaining: int | None, now: datetime.datetime) -> float | None:
+    """Credits that can be spent per day without dipping into the reserve before the reset."""
+    if credits_remaining is None:
+        return None
+    return max(0, credits_remaining - oa.ODDS_CREDIT_RESERVE) / _days_until_reset(now)
+
+
+def plan_refresh(
+    now: datetime.datetime,
+    kickoffs: dict,
+    credits_remaining: int | None,
+    lines_updated_at: str | None,
+    props_updated_at: dict,
+    spent_today: int = 0,
+    schedule_kickoffs: list | None = None,
+) -> dict:
+    """
+    Decide what to refresh now.
+
+    kickoffs:          event_id → kickoff (naive UTC datetime) for events in odds_games
+    schedule_kickoffs: extra kickoffs (e.g. from the nflverse schedule) used only
+                       to time the lines refresh when odds_games is empty/stale
+    Returns {"refresh_lines", "props_events", "estimated_cost", "budget", "deferred", ...}.
+    """
+    upcoming = {eid: t for eid, t in kickoffs.items() if t > now}
+    all_kickoffs = list(upcoming.values()) + [t for t in (schedule_kickoffs or []) if t > now]
+    next_kickoff = min(all_kickoffs) if all_kickoffs else None
+    hours_to_next = (next_kickoff - now).total_seconds() / 3600 if next_kickoff else None
+
+    allowance = daily_allowance(credits_remaining, now)
+    if allowance is None:
+        budget = float("inf")          # balance unknown until the first response
+    else:
+        if hours_to_next is not None and hours_to_next <= 24:
+            allowance *= GAMEDAY_MULTIPLIER
+        budget = min(allowance - spent_today, max(0, credits_remaining - oa.ODDS_CREDIT_RESERVE))
+
+    plan = {
+        "at":             now.isoformat() + "Z",
+        "next_kickoff":   next_kickoff.isoformat() + "Z" if next_kickoff else None,
+        "refresh_lines":  False,
+        "props_events":   [],
+        "estimated_cost": 0,
+        "budget":         None if budget == float("inf") else round(budget, 1),
+        "deferred":       [],
+    }
+
+    # Game lines: one call covers every event
+    lines_age = _age_hours(now, lines_updated_at)
+    max_age   = _max_age_hours(hours_to_next, LINES_MAX_AGE) if hours_to_next is not None else 24
+    if lines_age is None or lines_age >= max_age:
+        cost = oa.game_lines_credit_cost()
+        if cost <= budget:
+            plan["refresh_lines"] = True
+            plan["estimated_cost"] += cost
+            budget -= cost
+        else:
+            plan["deferred"].append("lines")
+
+    # Props: per event, soonest kickoff first, only inside the lookahead window
+    horizon = now + datetime.timedelta(days=oa.PROPS_LOOKAHEAD_DAYS)
+    cost = oa.props_credit_cost()
+    for event_id, kickoff in sorted(upcoming.items(), key=lambda kv: kv[1]):
+        if kickoff > horizon:
+            continue
+        age = _age_hours(now, props_updated_at.get(event_id))
+        if age is not None and age < _max_age_hours((kickoff - now).total_seconds() / 3600, PROPS_MAX_AGE):
+            continue
+        if cost <= budget:
+            plan["props_events"].append(event_id)
+            plan["estimated_cost"] += cost
+            budget -= cost
+        else:
+            plan["deferred"].append(event_id)
+
+    return plan
+
+
+# ── Inputs from the live stores ───────────────────────────────────────────────
+
+def odds_kickoffs() -> dict:
+    kickoffs = {}
+    for event_id, g in oa.odds_games.items():
+        try:
+            kickoffs[event_id] = datetime.datetime.fromisoformat(g["commence_time"].replace("Z", ""))
+        except (KeyError, ValueError):
+            pass
+    return kickoffs
+
+
+def schedule_kickoffs() -> list:
+    """Kickoffs (naive UTC) from the nflverse schedule; gameday/gametime are US Eastern."""
+    import nflverse_stats as ns
+    result = []
+    for games in ns.nflverse_games.values():
+        for g in games:
+            try:
+                local = datetime.datetime.fromisoformat(f"{g['gameday']}T{g.get('gametime') or '13:00'}")
+            except (KeyError, TypeError, ValueError):
+                continue
+            result.append(local.replace(tzinfo=_ET).astimezone(datetime.timezone.utc).replace(tzinfo=None))
+    return result
+
+
+def spent_today(now: datetime.datetime | None = None) -> int:
+    now = now or datetime.datetime.utcnow()
+    return _spend.get(now.date().isoformat(), 0)
+
+
+def record_spend(credits: int, now: datetime.datetime | None = None) -> None:
+    now = now or datetime.datetime.utcnow()
+    with _spend_lock:
+        day = now.date().isoformat()
+        _spend[day] = _spend.get(day, 0) + credits
+        for old in sorted(_spend)[:-40]:
+            del _spend[old]
+
+
+def current_plan(now: datetime.datetime | None = None) -> dict:
+    now = now or datetime.datetime.utcnow()
+    return plan_refresh(
+        now, odds_kickoffs(), oa.odds_credits_remaining,
+        oa.odds_lines_updated_at, oa.odds_props_updated_at,
+        spent_today(now), schedule_kickoffs(),
+    )
+
+
+def run_planned_refresh(api_key: str | None) -> dict | None:
+    """Interval job: plan, execute, record the credits used."""
+    global last_plan
+
+    if not api_key:
+        return None
+    now = datetime.datetime.utcnow()
+    plan = current_plan(now)
+    if not plan["refresh_lines"] and not plan["props_events"]:
+        return plan
+
+    before = oa.odds_credits_remaining
+    if plan["refresh_lines"]:
+        oa.refresh_game_lines(api_key)
+    if plan["props_events"]:
+        oa.refresh_event_props(api_key, plan["props_events"])
+    after = oa.odds_credits_remaining
+
+    spent = before - after if before is not None and after is not None and after <= before else plan["estimated_cost"]
+    record_spend(spent, now)
+    plan["spent"] = spent
+    last_plan = plan
+    logger.info("odds planner: lines=%s props=%d spent=%d credits_remaining=%s deferred=%d",
+                plan["refresh_lines"], len(plan["props_events"]), spent, after, len(plan["deferred"]))
+    return plan
+
+
+def status() -> dict:
+    """Planner block for /odds/status."""
+    now = datetime.datetime.utcnow()
+    month = now.strftime("%Y-%m")
+    return {
+        "last_plan": last_plan,
+        "next_plan": current_plan(now),
+        "spend": {
+            "today":           spent_today(now),
+            "month":           sum(v for k, v in _spend.items() if k.startswith(month)),
+            "daily_allowance": daily_allowance(oa.odds_credits_remaining, now),
+            "reserve":         oa.ODDS_CREDIT_RESERVE,
+        },
+    }
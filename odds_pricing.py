@@ -0,0 +1,160 @@
+"""
+odds_pricing.py — no-vig consensus pricing across every bookmaker.
+
+fetch_game_odds() and fetch_player_props() keep each book's own quote; this
+module turns those into a fair price. All two-way markets of one kind are
+packed into (markets × books) arrays of decimal prices (NaN where a book has
+no quote) and priced in one pass:
+
+    implied   = 1 / price
+    overround = implied_a + implied_b          (per book; hold = overround − 1)
+    fair_a    = mean over books of implied_a / overround
+    edge_a    = best_price_a × fair_a − 1      (expected return of the best price)
+
+For lined markets (spreads, totals, prop yards) books can hang different
+numbers, so only books quoting the consensus line — the median quoted line,
+rounded down to one a book actually hangs — are priced.
+
+Results are attached as a "pricing" block at fetch time, before the stores are
+published, so /odds/games and /odds/props serve them as-is.
+"""
+
+import numpy as np
+
+# Best price must beat the fair price by this much to set "value"
+EDGE_THRESHOLD = 0.02
+
+
+def _matrix(rows: list[list], width: int) -> np.ndarray:
+    """rows of (possibly short / None-holed) values → float matrix, NaN-padded."""
+    out = np.full((len(rows), max(width, 1)), np.nan)
+    for i, row in enumerate(rows):
+        for j, v in enumerate(row):
+            if v is not None:
+                out[i, j] = v
+    return out
+
+
+def consensus_lines(points: np.ndarray) -> np.ndarray:
+    """Per row: the lower median of the quoted lines (NaN if nothing is quoted)."""
+    out = np.full(points.shape[0], np.nan)
+    quoted = ~np.isnan(points).all(axis=1)
+    if quoted.any():
+        out[quoted] = np.nanquantile(points[quoted], 0.5, axis=1, method="lower")
+    return out
+
+
+def price_two_way(a: np.ndarray, b: np.ndarray) -> dict:
+    """
+    Price N two-way markets from (N × books) decimal price arrays.
+
+    Returns arrays of length N: books (count with both sides quoted), fair_a,
+    fair_b, hold, best_a, best_b, edge_a, edge_b. Rows with no complete quote
+    are NaN (books = 0).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv_a, inv_b = 1.0 / a, 1.0 / b
+        overround = inv_a + inv_b
+        valid = np.isfinite(overround) & (overround > 0)
+        n = valid.sum(axis=1)
+        share_a = np.where(valid, inv_a / overround, 0.0)
+        fair_a = np.where(n > 0, share_a.sum(axis=1) / n, np.nan)
+        hold = np.where(n > 0, np.where(valid, overround - 1.0, 0.0).sum(axis=1) / n, np.nan)
+
+        best_a = np.max(np.where(np.isnan(a), -np.inf, a), axis=1)
+        best_b = np.max(np.where(np.isnan(b), -np.inf, b), axis=1)
+        best_a[np.isinf(best_a)] = np.nan
+        best_b[np.isinf(best_b)] = np.nan
+        fair_b = 1.0 - fair_a
+        edge_a = best_a * fair_a - 1.0
+        edge_b = best_b * fair_b - 1.0
+
+    return {
+        "books": n, "fair_a": fair_a, "fair_b": fair_b, "hold": hold,
+        "best_a": best_a, "best_b": best_b, "edge_a": edge_a, "edge_b": edge_b,
+    }
+
+
+def _num(x, digits: int = 4):
+    return None if x is None or not np.isfinite(x) else round(float(x), digits)
+
+
+def _block(priced: dict, i: int, side_a: str, side_b: str, line=None) -> dict | None:
+    if not priced["books"][i]:
+        return None
+    edge_a, edge_b = _num(priced["edge_a"][i]), _num(priced["edge_b"][i])
+    value = None
+    if edge_a is not None and edge_a > EDGE_THRESHOLD and (edge_b is None or edge_a >= edge_b):
+        value = side_a
+    elif edge_b is not None and edge_b > EDGE_THRESHOLD:
+        value = side_b
+    block = {
+        "books": int(priced["books"][i]),
+        "fair":  {side_a: _num(priced["fair_a"][i]), side_b: _num(priced["fair_b"][i])},
+        "hold":  _num(priced["hold"][i]),
+        "edge":  {side_a: edge_a, side_b: edge_b},
+        "value": value,
+    }
+    if line is not None:
+        block = {"line": _num(line, 2), **block}
+    return block
+
+
+def _price_lined(quotes: list[list[tuple]]) -> tuple[dict, np.ndarray]:
+    """
+    quotes[i] = [(point, price_a, price_b), ...] per book. Prices only the books
+    on row i's consensus line; returns (price_two_way result, consensus lines).
+    """
+    width = max((len(q) for q in quotes), default=0)
+    points = _matrix([[p for p, _, _ in q] for q in quotes], width)
+    a = _matrix([[x for _, x, _ in q] for q in quotes], width)
+    b = _matrix([[x for _, _, x in q] for q in quotes], width)
+    lines = consensus_lines(points)
+    off_line = points != lines[:, None]
+    a[off_line] = np.nan
+    b[off_line] = np.nan
+    return price_two_way(a, b), lines
+
+
+def price_games(games: dict) -> None:
+    """Attach game["pricing"] = {"h2h", "spread", "total"} from each game's per-book quotes."""
+    events = list(games.values())
+    if not events:
+        return
+    books = [list((g.get("books") or {}).values()) for g in events]
+    width = max(len(q) for q in books)
+
+    h2h = price_two_way(
+        _matrix([[q.get("home_price") for q in row] for row in books], width),
+        _matrix([[q.get("away_price") for q in row] for row in books], width),
+    )
+    spread, spread_lines = _price_lined(
+        [[(q.get("home_spread"), q.get("home_spread_price"), q.get("away_spread_price")) for q in row]
+         for row in books]
+    )
+    total, total_lines = _price_lined(
+        [[(q.get("total_line"), q.get("over_price"), q.get("under_price")) for q in row] for row in books]
+    )
+
+    for i, g in enumerate(events):
+        g["pricing"] = {
+            "h2h":    _block(h2h, i, "home", "away"),
+            "spread": _block(spread, i, "home", "away", spread_lines[i]),
+            "total":  _block(total, i, "over", "under", total_lines[i]),
+        }
+
+
+def price_props(player_data: dict) -> None:
+    """
+    Attach a "pricing" block to every market in player_data
+    (sleeper_id → market key → {"books": {book: {"point", "over_price", "under_price"}}, ...}).
+    """
+    entries = [m for markets in player_data.values() for m in markets.values()]
+    if not entries:
+        return
+    priced, lines = _price_lined([
+        [(q.get("point"), q.get("over_price"), q.get("under_price")) for q in (m.get("books") or {}).values()]
+        for m in entries
+    ])
+    for i, m in enumerate(entries):
+        m["pricing"] = _block(priced, i, "over", "under", lines[i])
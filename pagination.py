@@ -0,0 +1,201 @@
+"""
+pagination.py — fields= projection and cursor pagination for bulk endpoints.
+
+Query parameters (all optional; without them the endpoints return exactly
+what they always have):
+
+    fields=name,team,season_totals.fantasy_points_ppr,weekly.week
+        Keep only these fields of each record. Dotted paths select inside
+        nested objects and inside lists of objects (weekly.week keeps just
+        the week of every weekly entry).
+    page_size=200
+        Return one page; the cursor for the next one is in the X-Next-Cursor
+        response header (and a Link: rel="next" URL). No header on the last page.
+    cursor=<X-Next-Cursor>
+        Continue from the previous page. page_size defaults to DEFAULT_PAGE_SIZE.
+
+The response body keeps its usual shape (an object keyed like the dataset, or
+a list), so existing clients are unaffected.
+
+Keyed datasets page in key order over a sorted key index built once per
+dataset version; cursors hold the last key returned and stay valid across
+updates. Ranked lists (leaderboards) page by offset, so their cursors carry
+the dataset version and expire (410) when the ranking is rebuilt.
+"""
+
+import base64
+import bisect
+import json
+import threading
+from typing import NamedTuple
+from urllib.parse import urlencode
+
+from flask import request
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+
+class PageError(ValueError):
+    """Bad fields/page_size/cursor parameter; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class Query(NamedTuple):
+    fields: tuple | None        # sorted field paths, or None for whole records
+    page_size: int | None       # None → no pagination
+    cursor: dict | None
+
+    @property
+    def key(self) -> tuple:
+        """Cache-key part for everything that shapes the body."""
+        return self.fields, self.page_size, json.dumps(self.cursor, sort_keys=True) if self.cursor else None
+
+    @property
+    def active(self) -> bool:
+        return self.fields is not None or self.page_size is not None
+
+
+def parse_fields(raw) -> tuple | None:
+    """"a,b.c" or ["a", "b.c"] → ("a", "b.c"); None / empty → None."""
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    if not isinstance(raw, list):
+        raise PageError("fields must be a comma-separated string or a list of field names")
+    fields = tuple(sorted({str(f).strip() for f in raw if str(f).strip()}))
+    return fields or None
+
+
+def encode_cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(raw: str) -> dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4)))
+    except (ValueError, UnicodeDecodeError):
+        raise PageError("Invalid cursor")
+    if not isinstance(state, dict):
+        raise PageError("Invalid cursor")
+    return state
+
+
+def parse(args, fields=None) -> Query:
+    """Query from request args; `fields` overrides args["fields"] (e.g. from a POST body)."""
+    fields = parse_fields(fields if fields is not None else args.get("fields"))
+    raw_size, raw_cursor = args.get("page_size"), args.get("cursor")
+    if raw_size is None and raw_cursor is None:
+        return Query(fields, None, None)
+    try:
+        page_size = int(raw_size) if raw_size is not None else DEFAULT_PAGE_SIZE
+    except ValueError:
+        raise PageError("page_size must be an integer")
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    return Query(fields, page_size, decode_cursor(raw_cursor) if raw_cursor else None)
+
+
+# ── Projection ────────────────────────────────────────────────────────────────
+
+def _tree(fields: tuple) -> dict:
+    """("a", "b.c", "b.d") → {"a": None, "b": {"c": None, "d": None}}; None means the whole value."""
+    tree: dict = {}
+    for path in fields:
+        node = tree
+        *parents, leaf = path.split(".")
+        for part in parents:
+            child = node.get(part, {})
+            if child is None:           # "b" already selects all of b
+                break
+            node = node.setdefault(part, child)
+        else:
+            node[leaf] = None
+    return tree
+
+
+def _project(value, tree: dict):
+    if isinstance(value, dict):
+        return {k: value[k] if sub is None else _project(value[k], sub)
+                for k, sub in tree.items() if k in value}
+    if isinstance(value, list):
+        return [_project(v, tree) for v in value]
+    return value
+
+
+def project(record, fields: tuple | None):
+    return record if fields is None else _project(record, _tree(fields))
+
+
+# ── Pages ─────────────────────────────────────────────────────────────────────
+
+_key_indexes: dict = {}     # dataset name → (version, sorted keys)
+_key_indexes_lock = threading.Lock()
+
+
+def sorted_keys(name: str, version, data: dict) -> list:
+    """Sorted key index of a keyed dataset, rebuilt only when its version changes."""
+    with _key_indexes_lock:
+        cached = _key_indexes.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    keys = sorted(data)
+    with _key_indexes_lock:
+        _key_indexes[name] = (version, keys)
+    return keys
+
+
+def page_keys(query: Query, keys: list) -> tuple[list, str | None]:
+    """(keys on this page, next cursor) from a keyed dataset's sorted key index."""
+    if query.page_size is None:
+        return keys, None
+    after = (query.cursor or {}).get("after")
+    if after is not None and not isinstance(after, str):
+        raise PageError("Invalid cursor")
+    start = bisect.bisect_right(keys, after) if after is not None else 0
+    page = keys[start:start + query.page_size]
+    more = start + query.page_size < len(keys)
+    return page, encode_cursor({"after": page[-1]}) if more and page else None
+
+
+def page_rows(query: Query, rows: list, version) -> tuple[list, str | None]:
+    """(rows on this page, next cursor) of a ranked list; cursors expire when `version` changes."""
+    if query.page_size is None:
+        return rows, None
+    cursor = query.cursor or {}
+    if cursor and cursor.get("v") != version:
+        raise PageError("Cursor expired: the data was updated, start again without a cursor", 410)
+    start = cursor.get("offset", 0)
+    if not isinstance(start, int) or start < 0:
+        raise PageError("Invalid cursor")
+    end = start + query.page_size
+    return rows[start:end], encode_cursor({"v": version, "offset": end}) if end < len(rows) else None
+
+
+def project_dict(data: dict, keys: list, fields: tuple | None) -> dict:
+    """{key: record projected to fields} for the given keys of a keyed dataset."""
+    if fields is None:
+        return {k: data[k] for k in keys if k in data}
+    tree = _tree(fields)
+    return {k: _project(data[k], tree) for k in keys if k in data}
+
+
+def project_rows(rows: list, fields: tuple | None) -> list:
+    if fields is None:
+        return rows
+    tree = _tree(fields)
+    return [_project(row, tree) for row in rows]
+
+
+def with_next_cursor(response, next_cursor: str | None):
+    """Add the X-Next-Cursor and Link: rel="next" headers for the next page, if any."""
+    if next_cursor is not None:
+        args = request.args.to_dict()
+        args["cursor"] = next_cursor
+        url = f"{request.base_url}?{urlencode(args)}"
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{url}>; rel="next"'
+    return response
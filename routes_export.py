@@ -0,0 +1,196 @@
+"""
+routes_export.py — Flask Blueprint for /export/* bulk downloads for analytics jobs.
+
+Every export is a flat table (one row per record) served in three formats:
+
+    /export/<dataset>.ndjson   one JSON object per line, streamed row by row
+    /export/<dataset>.arrow    Arrow IPC stream, streamed one record batch at a time
+    /export/<dataset>.parquet  Parquet (zstd), one row group per EXPORT_BATCH_ROWS
+
+NDJSON rows are serialized as the response is written, so neither end holds
+the whole document. The columnar formats come from a Polars frame built once
+per dataset version; its Arrow table is shared zero-copy with the IPC writer,
+and an Arrow client can memory-map or read the stream batch by batch.
+?fields=a,b limits the columns. Responses carry the dataset version as an ETag.
+
+nflverse exports are built in here; nfl-helper registers its scraped datasets
+(fantasy_points, dfs_salaries) with register().
+"""
+
+import io
+import json
+import threading
+
+import polars as pl
+import pyarrow as pa
+from flask import Blueprint, Response, jsonify, request
+
+import http_cache
+import nflverse_stats as ns
+import pagination
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+export_bp = Blueprint("export", __name__, url_prefix="/export")
+
+EXPORT_BATCH_ROWS = 10_000
+# NDJSON rows per write
+NDJSON_CHUNK_ROWS = 500
+
+FORMATS = {
+    "ndjson":  "application/x-ndjson",
+    "arrow":   "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_exports: dict = {}         # name → (version(), rows() → iterable of flat dicts)
+_frames: dict = {}          # name → ((boot id, version), pl.DataFrame)
+_frames_lock = threading.Lock()
+
+
+def register(name: str, version, rows) -> None:
+    """Expose rows() as /export/<name>.*; version() must change whenever the rows do."""
+    _exports[name] = (version, rows)
+
+
+# ── nflverse tables ───────────────────────────────────────────────────────────
+
+def _player_rows():
+    for sleeper_id, p in list(ns.nflverse_player_stats.items()):
+        yield {"sleeper_id": sleeper_id, "name": p.get("name"), "position": p.get("position"),
+               "team": p.get("team"), "season": p.get("season"), **(p.get("season_totals") or {})}
+
+
+def _weekly_rows():
+    for sleeper_id, p in list(ns.nflverse_player_stats.items()):
+        for w in p.get("weekly") or []:
+            yield {"sleeper_id": sleeper_id, "name": p.get("name"), "position": p.get("position"),
+                   "team": p.get("team"), **w}
+
+
+def _team_rows():
+    for team, stats in list(ns.nflverse_team_stats.items()):
+        yield {"team": team, **stats}
+
+
+register("stats_players", lambda: ns.nflverse_version, _player_rows)
+register("stats_weekly",  lambda: ns.nflverse_version, _weekly_rows)
+register("stats_teams",   lambda: ns.nflverse_version, _team_rows)
+
+
+# ── Serialization ─────────────────────────────────────────────────────────────
+
+def _dumps(row) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(row, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(row, separators=(",", ":"), default=str).encode()
+
+
+def _ndjson(rows, fields):
+    chunk = []
+    for row in rows:
+        chunk.append(_dumps(pagination.project(row, fields)))
+        if len(chunk) == NDJSON_CHUNK_ROWS:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def frame(name: str) -> pl.DataFrame:
+    """The export as a Polars frame, built once per dataset version."""
+    version, rows = _exports[name]
+    current = (http_cache.boot_id(), version())
+    with _frames_lock:
+        cached = _frames.get(name)
+        if cached is not None and cached[0] == current:
+            return cached[1]
+    records = list(rows())
+    df = pl.from_dicts(records, infer_schema_length=None, strict=False) if records else pl.DataFrame()
+    with _frames_lock:
+        _frames[name] = (current, df)
+    return df
+
+
+class _Chunks:
+    """Write target for the IPC writer; collects what each batch wrote."""
+
+    def __init__(self):
+        self.parts = []
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        out, self.parts = b"".join(self.parts), []
+        return out
+
+
+def _arrow_stream(table: pa.Table):
+    sink = _Chunks()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        yield sink.take()                       # schema message
+        for batch in table.to_batches(max_chunksize=EXPORT_BATCH_ROWS):
+            writer.write_batch(batch)
+            yield sink.take()
+    yield sink.take()                           # end-of-stream marker
+
+
+def _parquet(df: pl.DataFrame):
+    buf = io.BytesIO()
+    df.write_parquet(buf, compression="zstd", row_group_size=EXPORT_BATCH_ROWS)
+    body = buf.getvalue()
+    # WSGI servers only accept bytes chunks (PEP 3333), not memoryviews
+    for start in range(0, len(body), 1 << 20):
+        yield body[start:start + (1 << 20)]
+
+
+# ── Routes ────────────────────────────────────────────────────────────────────
+
+@export_bp.route("")
+def list_exports():
+    """Available exports with their current versions and formats."""
+    return jsonify({
+        "datasets": {name: {"version": version()} for name, (version, _) in sorted(_exports.items())},
+        "formats": sorted(FORMATS),
+    })
+
+
+@export_bp.route("/<string:name>.<string:fmt>")
+def export(name, fmt):
+    """
+    Stream one export. Query params: fields (comma-separated columns to keep).
+    """
+    if name not in _exports:
+        return jsonify({"error": f"Unknown export: {name}"}), 404
+    if fmt not in FORMATS:
+        return jsonify({"error": f"Unknown format: {fmt}", "formats": sorted(FORMATS)}), 404
+    fields = pagination.parse_fields(request.args.get("fields"))
+    version, rows = _exports[name]
+    tag = http_cache.etag("export", name, fmt, version(), *(fields or ()))
+
+    def build():
+        headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+        if fmt == "ndjson":
+            return Response(_ndjson(rows(), fields), mimetype=FORMATS[fmt], headers=headers)
+        df = frame(name)
+        if fields:
+            missing = [f for f in fields if f not in df.columns]
+            if missing:
+                return jsonify({"error": f"Unknown fields: {', '.join(missing)}"}), 400
+            df = df.select(fields)
+        body = _arrow_stream(df.to_arrow()) if fmt == "arrow" else _parquet(df)
+        return Response(body, mimetype=FORMATS[fmt], headers=headers)
+
+    return http_cache.cached_json(tag, build)
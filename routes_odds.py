@@ -3,18 +3,32 @@ routes_odds.py — Flask Blueprint for /odds/* endpoints backed by The Odds API.
 """
 
 from flask import Blueprint, jsonify, request
+import nflverse_stats as ns
+import http_cache
 import odds_api as oa
-from nflverse_stats import nflverse_team_stats, nflverse_schedule, nflverse_games
+import odds_backtest
+from odds_backtest import OU_EDGE_THRESHOLD, OU_WEIGHT_R3, OU_WEIGHT_R5, OU_WEIGHT_SEASON
+import odds_movement
+import odds_planner
 
 odds_bp = Blueprint("odds", __name__, url_prefix="/odds")
 
 
+def _data_version() -> tuple:
+    return ns.nflverse_version, oa.odds_version
+
+
+def _cached_json(key: tuple, build):
+    """JSON response for build(), serialized once per data version (see http_cache)."""
+    return http_cache.json_response(("odds", *_data_version(), *key), build)
+
+
 def _ou_eval(home_abbr: str, away_abbr: str, total_line: float | None):
     """Return implied total + edge signal using season/rolling team score data."""
     if total_line is None:
         return None
-    home = nflverse_team_stats.get(home_abbr, {})
-    away = nflverse_team_stats.get(away_abbr, {})
+    home = ns.nflverse_team_stats.get(home_abbr, {})
+    away = ns.nflverse_team_stats.get(away_abbr, {})
 
     h_ppg = home.get("points_per_game") or 0
     h_apg = home.get("points_allowed_per_game") or 0
@@ -38,9 +52,9 @@ def _ou_eval(home_abbr: str, away_abbr: str, total_line: float | None):
     if not has_season:
         return None
 
-    w_season = 1.0 if not has_r5 else 0.40
-    w_r5     = 0.0 if not has_r5 else (0.60 if not has_r3 else 0.35)
-    w_r3     = 0.0 if not has_r3 else 0.25
+    w_season = 1.0 if not has_r5 else OU_WEIGHT_SEASON
+    w_r5     = 0.0 if not has_r5 else (1.0 - OU_WEIGHT_SEASON if not has_r3 else OU_WEIGHT_R5)
+    w_r3     = 0.0 if not has_r3 else OU_WEIGHT_R3
 
     home_season = (h_ppg + a_apg) / 2
     away_season = (a_ppg + h_apg) / 2
@@ -54,46 +68,71 @@ def _ou_eval(home_abbr: str, away_abbr: str, total_line: float | None):
     implied_total = round(implied_home + implied_away, 1)
 
     edge_pct = round((implied_total - total_line) / total_line, 4)
-    if edge_pct > 0.05:
+    if edge_pct > OU_EDGE_THRESHOLD:
         signal = "over"
-    elif edge_pct < -0.05:
+    elif edge_pct < -OU_EDGE_THRESHOLD:
         signal = "under"
     else:
         signal = None
 
-    return {"implied": implied_total, "edge_pct": edge_pct, "signal": signal}
+    return {
+        "implied":      implied_total,
+        "implied_home": round(implied_home, 1),
+        "implied_away": round(implied_away, 1),
+        "edge_pct":     edge_pct,
+        "signal":       signal,
+    }
+
+
+# (data version, games list) — rebuilt on the first read after either store changes
+_games_view: tuple = (None, [])
+
+
+def games_view() -> list:
+    """
+    odds_games sorted by kickoff, each with its ou_eval and nfl_week. Computed
+    once per (nflverse_version, odds_version) and shared by /odds/games and the
+    odds_history snapshot.
+    """
+    global _games_view
+
+    version = _data_version()
+    if _games_view[0] == version:
+        return _games_view[1]
+
+    result = []
+    for g in sorted(oa.odds_games.values(), key=lambda g: g.get("commence_time", "")):
+        entry = dict(g)
+        total_line = (g.get("total") or {}).get("line")
+        entry["ou_eval"] = _ou_eval(g.get("home_abbr", ""), g.get("away_abbr", ""), total_line)
+        sched = ns.nflverse_schedule.get(g.get("home_abbr", "")) or ns.nflverse_schedule.get(g.get("away_abbr", ""))
+        entry["nfl_week"] = sched.get("week") if sched else None
+        result.append(entry)
+    _games_view = (version, result)
+    return result
 
 
 @odds_bp.route("/status")
 def odds_status():
     """Health/status for the odds data pipeline."""
-    flagged = sum(
-        1 for p in oa.odds_props
-        for m in p.get("props", {}).values()
-        if m.get("value_flag")
-    )
     return jsonify({
         "last_updated":       oa.odds_last_updated,
         "credits_remaining":  oa.odds_credits_remaining,
-        "game_count":         len(oa.odds_games),
-        "player_prop_count":  len(oa.odds_props),
-        "value_flag_count":   flagged,
+        "game_count":         oa.odds_status_counts.get("game_count", 0),
+        "player_prop_count":  oa.odds_status_counts.get("player_prop_count", 0),
+        "value_flag_count":   oa.odds_status_counts.get("value_flag_count", 0),
+        "planner":            odds_planner.status(),
     })
 
 
 @odds_bp.route("/games")
+@http_cache.versioned(lambda: ("odds", *_data_version()))
 def all_games():
-    """All upcoming NFL games with best available moneyline, spread, and total."""
-    games = sorted(oa.odds_games.values(), key=lambda g: g.get("commence_time", ""))
-    result = []
-    for g in games:
-        entry = dict(g)
-        total_line = (g.get("total") or {}).get("line")
-        entry["ou_eval"] = _ou_eval(g.get("home_abbr", ""), g.get("away_abbr", ""), total_line)
-        sched = nflverse_schedule.get(g.get("home_abbr", "")) or nflverse_schedule.get(g.get("away_abbr", ""))
-        entry["nfl_week"] = sched.get("week") if sched else None
-        result.append(entry)
-    return jsonify(result)
+    """
+    All upcoming NFL games with best available moneyline, spread, and total,
+    plus no-vig consensus pricing across books ("pricing").
+    """
+    return _cached_json(("games",), games_view)
 
 
 @odds_bp.route("/games/<event_id>")
@@ -105,6 +144,27 @@ def game_detail(event_id: str):
     return jsonify(game)
 
 
+@odds_bp.route("/movement/<event_id>")
+def line_movement(event_id: str):
+    """
+    Full line-movement series for a game, per book ("best" = best available).
+    Query params: book (only that book's series).
+    """
+    result = odds_movement.series(event_id, request.args.get("book"))
+    if result is None:
+        return jsonify({"error": f"No line history for event_id {event_id}"}), 404
+    return jsonify({"event_id": event_id, "books": result})
+
+
+@odds_bp.route("/movement/<event_id>/lines")
+def line_summary(event_id: str):
+    """Opening vs current line per book, plus the closing line once the game has kicked off."""
+    result = odds_movement.lines(event_id)
+    if result is None:
+        return jsonify({"error": f"No line history for event_id {event_id}"}), 404
+    return jsonify(result)
+
+
 @odds_bp.route("/props")
 def all_props():
     """
@@ -118,63 +178,49 @@ def all_props():
     market     = request.args.get("market", "")
     value_only = request.args.get("value_only", "").lower() == "true"
 
+    candidates = oa.odds_props_by_market.get(market, []) if market else oa.odds_props
+
     result = []
-    for p in oa.odds_props:
+    for p in candidates:
         if position and p.get("position") != position:
             continue
-
-        props = p.get("props", {})
-        if market and market not in props:
-            continue
-
-        if value_only and not any(m.get("value_flag") for m in props.values()):
+        if value_only and p["sleeper_id"] not in oa.odds_value_ids:
             continue
 
         entry = dict(p)
         if market:
-            entry["props"] = {market: props[market]}
-        sched = nflverse_schedule.get(p.get("home_abbr", "")) or nflverse_schedule.get(p.get("away_abbr", ""))
+            entry["props"] = {market: p["props"][market]}
+        sched = ns.nflverse_schedule.get(p.get("home_abbr", "")) or ns.nflverse_schedule.get(p.get("away_abbr", ""))
         entry["nfl_week"] = sched.get("week") if sched else None
         result.append(entry)
 
     return jsonify(result)
 
 
-@odds_bp.route("/results")
-def game_results():
-    """Historical games: stored lines + actual scores from nflverse."""
-    # odds API abbrs → nflverse abbrs
-    ABBR_MAP = {"LAR": "LA", "WSH": "WAS", "JAX": "JAC"}
-
-    def _find_nflverse_game(home_nfl: str, away_nfl: str, gameday: str):
-        for week_games in nflverse_games.values():
-            for g in week_games:
-                if g["home_team"] == home_nfl and g["away_team"] == away_nfl and g["gameday"] == gameday:
-                    return g
+def _ou_result(actual_total: float, total_line: float | None) -> str | None:
+    if total_line is None:
         return None
+    if actual_total > total_line:
+        return "over"
+    if actual_total < total_line:
+        return "under"
+    return "push"
 
-    results = []
-    for event_id, stored in oa.odds_history.items():
-        home_nfl = ABBR_MAP.get(stored.get("home_abbr", ""), stored.get("home_abbr", ""))
-        away_nfl = ABBR_MAP.get(stored.get("away_abbr", ""), stored.get("away_abbr", ""))
-        gameday = (stored.get("commence_time") or "")[:10]
 
-        game = _find_nflverse_game(home_nfl, away_nfl, gameday)
+def build_results() -> list:
+    """
+    Join odds_history to nflverse final scores via the (home, away, gameday)
+    game index and evaluate the stored over/under signal. Newest first.
+    """
+    results = []
+    for stored in oa.odds_history.values():
+        game = ns.nflverse_game_index.get(oa.nflverse_game_key(stored))
 
         entry = dict(stored)
         if game and game.get("home_score") is not None:
             h, a = game["home_score"], game["away_score"]
             actual_total = h + a
-            total_line = (stored.get("total") or {}).get("line")
-            if total_line is not None:
-                if actual_total > total_line:
-                    ou_result = "over"
-                elif actual_total < total_line:
-                    ou_result = "under"
-                else:
-                    ou_result = "push"
-            else:
-                ou_result = None
+            ou_result = _ou_result(actual_total, (stored.get("total") or {}).get("line"))
             signal = (stored.get("ou_eval") or {}).get("signal")
             edge_correct = (signal == ou_result) if signal and ou_result and ou_result != "push" else None
             entry["result"] = {
@@ -187,17 +233,62 @@ def game_results():
             }
         else:
             entry["result"] = None
-
         results.append(entry)
 
     results.sort(key=lambda r: r.get("commence_time", ""), reverse=True)
-    return jsonify(results)
+    return results
+
+
+@odds_bp.route("/results")
+def game_results():
+    """Historical games: stored lines + actual scores from nflverse."""
+    return _cached_json(("results",), build_results)
+
+
+# (data version, {step: odds_backtest.evaluate() result}) — the grid search runs
+# once per served step and data version; min_bets / top only re-rank it
+_backtest_grids: tuple = (None, {})
+
+
+def _backtest_evaluation(step: float) -> dict:
+    global _backtest_grids
+
+    version = _data_version()
+    if _backtest_grids[0] != version:
+        _backtest_grids = (version, {})
+    grids = _backtest_grids[1]
+    if step not in grids:
+        grids[step] = odds_backtest.evaluate(oa.odds_history, ns.nflverse_games, step=step)
+    return grids[step]
+
+
+@odds_bp.route("/backtest")
+def backtest():
+    """
+    Replay odds_history against final scores over a grid of _ou_eval weights
+    and edge thresholds.
+    Query params: step (weight grid step, one of SERVED_WEIGHT_STEPS, default
+                  0.05), min_bets (default 10), top (configurations returned,
+                  default 20, max 100). Finer grids: run odds_backtest.py.
+    """
+    try:
+        step = float(request.args.get("step", odds_backtest.DEFAULT_WEIGHT_STEP))
+        min_bets = max(int(request.args.get("min_bets", 10)), 1)
+        top = min(max(int(request.args.get("top", 20)), 1), 100)
+    except ValueError:
+        return jsonify({"error": "step, min_bets and top must be numbers"}), 400
+    if step not in odds_backtest.SERVED_WEIGHT_STEPS:
+        return jsonify({"error": "Unsupported step", "steps": list(odds_backtest.SERVED_WEIGHT_STEPS)}), 400
+    return _cached_json(
+        ("backtest", step, min_bets, top),
+        lambda: odds_backtest.report(_backtest_evaluation(step), min_bets=min_bets, top=top),
+    )
 
 
 @odds_bp.route("/props/<sleeper_id>")
 def player_props(sleeper_id: str):
     """All props for a single player."""
-    player = next((p for p in oa.odds_props if p["sleeper_id"] == sleeper_id), None)
+    player = oa.odds_props_by_id.get(sleeper_id)
     if not player:
         return jsonify({"error": f"No props found for sleeper_id {sleeper_id}"}), 404
     return jsonify(player)
@@ -212,27 +303,10 @@ def value_props():
     position = request.args.get("position", "").upper()
     market   = request.args.get("market", "")
 
-    flat = []
-    for p in oa.odds_props:
-        if position and p.get("position") != position:
-            continue
-        for mkey, m in p.get("props", {}).items():
-            if not m.get("value_flag"):
-                continue
-            if market and mkey != market:
-                continue
-            flat.append({
-                "sleeper_id":    p["sleeper_id"],
-                "name":          p["name"],
-                "position":      p["position"],
-                "team":          p["team"],
-                "event_id":      p.get("event_id"),
-                "home_abbr":     p.get("home_abbr"),
-                "away_abbr":     p.get("away_abbr"),
-                "commence_time": p.get("commence_time"),
-                "market":        mkey,
-                **m,
-            })
-
-    flat.sort(key=lambda x: abs(x.get("value_pct") or 0), reverse=True)
+    flat = oa.odds_value_props
+    if position or market:
+        flat = [
+            v for v in flat
+            if (not position or v["position"] == position) and (not market or v["market"] == market)
+        ]
     return jsonify(flat)
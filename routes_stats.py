@@ -4,61 +4,102 @@ routes_stats.py — Flask Blueprint for /stats/* endpoints backed by nflverse da
 
 from flask import Blueprint, jsonify, request
 import nflverse_stats as ns
+import nflverse_cache
+import nflverse_history
+import http_cache
+import pagination
 
 stats_bp = Blueprint("stats", __name__, url_prefix="/stats")
 
 
+def _cached_json(key: tuple, build):
+    """JSON response for build(), serialized once per nflverse_version (see http_cache)."""
+    return http_cache.json_response(("stats", ns.nflverse_version, *key), build)
+
+
+def _paged_json(key: tuple, rows: list, query, transform=None):
+    """
+    One page of a ranked list, projected to query.fields, as a cached JSON body
+    with the next page's cursor in X-Next-Cursor (see pagination.py).
+    """
+    page, next_cursor = pagination.page_rows(query, rows, ns.nflverse_version)
+    response = _cached_json((*key, *query.key), lambda: pagination.project_rows(
+        [transform(row) for row in page] if transform else page, query.fields
+    ))
+    return pagination.with_next_cursor(response, next_cursor)
+
+
 @stats_bp.route("/players")
+@http_cache.versioned(lambda: ("stats", ns.nflverse_version))
 def list_players():
     """
     Top players by season fantasy_points_ppr.
-    Query params: position, team, week (filters to that week's stats), limit (max 500, default 300).
+    Query params: position, team, week (filters to that week's stats), limit (max 500, default 300),
+    fields, page_size, cursor (see pagination.py; with page_size, pages walk past limit).
     """
     position = request.args.get("position")
     team = request.args.get("team")
     week = request.args.get("week", type=int)
     limit = min(max(request.args.get("limit", 300, type=int), 1), 500)
+    query = pagination.parse(request.args)
+    if query.page_size is not None:
+        limit = None
 
     if week is not None:
+        rows = ns.nflverse_week_index.get(week, {})
+        position = position.upper() if position else None
+        team = team.upper() if team else None
         players = []
-        for sleeper_id, p in ns.nflverse_player_stats.items():
-            week_data = next((w for w in p["weekly"] if w["week"] == week), None)
-            if week_data is None:
+        for sleeper_id in ns.nflverse_week_rankings.get(week, []):
+            row = rows[sleeper_id]
+            if position and row["position"] != position:
                 continue
-            if position and p["position"] != position.upper():
-                continue
-            if team and p["team"] != team.upper():
+            if team and row["team"] != team:
                 continue
             players.append({
                 "sleeper_id": sleeper_id,
-                "name": p["name"],
-                "position": p["position"],
-                "team": p["team"],
-                **week_data,
-                "matchup": ns._matchup_block(p["team"], p["position"]),
+                **row,
+                "matchup": ns._matchup_block(row["team"], row["position"]),
             })
-        players.sort(key=lambda p: p.get("fantasy_points_ppr", 0), reverse=True)
-        return jsonify(players[:limit])
+            if len(players) == limit:
+                break
+        if not query.active:
+            return jsonify(players)
+        page, next_cursor = pagination.page_rows(query, players, ns.nflverse_version)
+        return pagination.with_next_cursor(jsonify(pagination.project_rows(page, query.fields)), next_cursor)
 
-    return jsonify(ns.get_top_players(limit, position, team))
+    key = ("players", position and position.upper(), team and team.upper(), limit)
+    if not query.active:
+        return _cached_json(key, lambda: ns.get_top_players(limit, position, team))
+    return _paged_json(key, ns.get_top_players(limit, position, team), query)
 
 
 @stats_bp.route("/players/team/<string:team>")
 def players_by_team(team):
-    """All players for a given team, sorted by season fantasy_points_ppr."""
+    """
+    All players for a given team, sorted by season fantasy_points_ppr.
+    Query params: fields, page_size, cursor (see pagination.py).
+    """
     team = team.upper()
-    players = [
-        {"sleeper_id": sid, **p}
-        for sid, p in ns.nflverse_player_stats.items()
-        if p["team"] == team
-    ]
-    players.sort(key=lambda p: p["season_totals"].get("fantasy_points_ppr", 0), reverse=True)
-    return jsonify(players)
+    query = pagination.parse(request.args)
+    rows = ns.nflverse_leaderboards.get("team", {}).get(team, [])
+    return _paged_json(("team", team), rows, query,
+                       lambda row: {k: v for k, v in row.items() if k != "matchup"})
 
 
 @stats_bp.route("/player/<string:sleeper_id>")
 def player_detail(sleeper_id):
-    """Full stats for a single player: season totals, weekly breakdown, rolling averages."""
+    """
+    Full stats for a single player: season totals, weekly breakdown, rolling averages.
+    Query params: season (a stored past season; default = current season).
+    """
+    season = request.args.get("season", type=int)
+    if season is not None and season != ns.nflverse_current_season:
+        player = nflverse_history.get_player(str(sleeper_id), season)
+        if not player:
+            return jsonify({"error": f"Player not found for season {season}"}), 404
+        return jsonify({"sleeper_id": sleeper_id, **player})
+
     player = ns.nflverse_player_stats.get(str(sleeper_id))
     if not player:
         return jsonify({"error": "Player not found"}), 404
@@ -77,16 +118,7 @@ def player_advanced(sleeper_id):
 @stats_bp.route("/week/<int:week>")
 def stats_for_week(week):
     """All players who have stats recorded for a specific week."""
-    result = {}
-    for sleeper_id, player in ns.nflverse_player_stats.items():
-        week_data = next((w for w in player["weekly"] if w["week"] == week), None)
-        if week_data:
-            result[sleeper_id] = {
-                "name": player["name"],
-                "position": player["position"],
-                "team": player["team"],
-                **week_data,
-            }
+    result = ns.nflverse_week_index.get(week)
     if not result:
         return jsonify({"error": f"No data for week {week}"}), 404
     return jsonify(result)
@@ -102,18 +134,15 @@ def projections_for_week(week):
     team = request.args.get("team")
     limit = min(max(request.args.get("limit", 300, type=int), 1), 500)
 
-    projections = []
-    for sleeper_id in ns.nflverse_player_stats:
-        proj = ns.project_player(sleeper_id, week)
-        if not proj:
-            continue
-        if position and proj["position"] != position.upper():
-            continue
-        if team and proj["team"] != team.upper():
-            continue
-        projections.append(proj)
-
-    projections.sort(key=lambda p: p["projected_ppr"], reverse=True)
+    table = ns.projection_table(week)
+    if position and team:
+        projections = [p for p in table["team"].get(team.upper(), []) if p["position"] == position.upper()]
+    elif position:
+        projections = table["position"].get(position.upper(), [])
+    elif team:
+        projections = table["team"].get(team.upper(), [])
+    else:
+        projections = table["all"]
     return jsonify(projections[:limit])
 
 
@@ -127,20 +156,30 @@ def schedule_for_week(week):
 
 
 @stats_bp.route("/teams")
+@http_cache.versioned(lambda: ("stats", ns.nflverse_version))
 def all_teams():
     """All 32 teams with stats and current week schedule info, sorted by team abbreviation."""
-    teams = [
-        {"team": team, **stats, "schedule": ns.nflverse_schedule.get(team, {})}
-        for team, stats in ns.nflverse_team_stats.items()
-    ]
-    teams.sort(key=lambda t: t["team"])
-    return jsonify(teams)
+    return _cached_json(("teams",), lambda: sorted(
+        ({"team": team, **stats, "schedule": ns.nflverse_schedule.get(team, {})}
+         for team, stats in ns.nflverse_team_stats.items()),
+        key=lambda t: t["team"],
+    ))
 
 
 @stats_bp.route("/team/<string:team>")
 def team_stats(team):
-    """Team-level aggregate stats plus most-recent-week schedule info."""
+    """
+    Team-level aggregate stats plus most-recent-week schedule info.
+    Query params: season (a stored past season; default = current season).
+    """
     team = team.upper()
+    season = request.args.get("season", type=int)
+    if season is not None and season != ns.nflverse_current_season:
+        entry = nflverse_history.get_team(team, season)
+        if not entry:
+            return jsonify({"error": f"No data for team {team} in season {season}"}), 404
+        return jsonify({"team": team, **entry})
+
     stats = ns.nflverse_team_stats.get(team)
     if not stats:
         return jsonify({"error": f"No data for team {team}"}), 404
@@ -157,4 +196,6 @@ def stats_status():
         "advanced_count":  len(ns.nflverse_player_advanced),
         "team_count":      len(ns.nflverse_team_stats),
         "schedule_weeks":  sorted(ns.nflverse_games.keys()) if ns.nflverse_games else [],
+        "cache_files":     nflverse_cache.cache_status(),
+        "history_seasons": nflverse_history.available_seasons(),
     })
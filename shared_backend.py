@@ -0,0 +1,331 @@
+"""
+shared_backend.py — state shared between several nfl-helper instances.
+
+With SHARED_BACKEND_URL set (redis://[:password@]host:port/db, rediss:// for
+TLS, or memory:// for a single-process stand-in) instances behind a load
+balancer coordinate through one key-value store:
+
+  - leader election: LeaderElector holds a lease (SET NX PX, renewed every
+    third of its TTL); only the leader's scheduler runs, so scraping and Odds
+    API credits are spent once
+  - dataset snapshots: snapshot_store publishes through the backend instead of
+    the local snapshot directory, so every node serves the leader's data
+  - tinyurl / tournament state: written here on every change and pulled by the
+    other nodes before they serve those endpoints
+
+Values are versioned: set_versioned() atomically increments <key>:version and
+stores the value tagged with it, so a reader can poll the small version key
+and only fetch the value when it moved. With `expected` it is a
+compare-and-set: nothing is written unless the version is still `expected`.
+
+RedisBackend speaks just enough RESP to do this over one socket, so no client
+library is needed. Without SHARED_BACKEND_URL `backend` is None and every
+instance keeps working on its own, as before.
+"""
+
+import logging
+import os
+import socket
+import ssl
+import threading
+import time
+import uuid
+from urllib.parse import unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+SHARED_BACKEND_URL = os.environ.get("SHARED_BACKEND_URL", "")
+KEY_PREFIX         = os.environ.get("SHARED_BACKEND_PREFIX", "nfl-helper:")
+LEADER_TTL_MS      = int(os.environ.get("LEADER_TTL_SECONDS", 30)) * 1000
+
+
+class BackendError(RuntimeError):
+    """The backend rejected a command."""
+
+
+class _Backend:
+    """Versioned-value helpers on top of get / set_versioned."""
+
+    def latest_version(self, key: str) -> int | None:
+        raw = self.get(f"{key}:version")
+        return int(raw) if raw is not None else None
+
+    def get_versioned(self, key: str, newer_than: int | None = None) -> tuple[int, bytes] | None:
+        """(version, value) of `key`, or None if unset or not newer than `newer_than`."""
+        if newer_than is not None:
+            latest = self.latest_version(key)
+            if latest is None or latest <= newer_than:
+                return None
+        raw = self.get(key)
+        if raw is None:
+            return None
+        version, _, value = raw.partition(b"\n")
+        return int(version), value
+
+
+# ── In-process stand-in ───────────────────────────────────────────────────────
+
+class MemoryBackend(_Backend):
+    """Same semantics as RedisBackend, inside one process (tests, single node)."""
+
+    def __init__(self, prefix: str = KEY_PREFIX):
+        self.prefix = prefix
+        self._data: dict = {}       # key → (value, expires_at monotonic or None)
+        self._lock = threading.Lock()
+
+    def _live(self, key: str):
+        entry = self._data.get(self.prefix + key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[self.prefix + key]
+            return None
+        return value
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value, nx: bool = False, px: int | None = None) -> bool:
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return False
+            expires_at = time.monotonic() + px / 1000 if px else None
+            self._data[self.prefix + key] = (_bytes(value), expires_at)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(self.prefix + key, None)
+
+    def set_versioned(self, key: str, value: bytes, expected: int | None = None) -> int | None:
+        with self._lock:
+            version = int(self._live(f"{key}:version") or 0)
+            if expected is not None and version != expected:
+                return None
+            version += 1
+            self._data[f"{self.prefix}{key}:version"] = (_bytes(version), None)
+            self._data[self.prefix + key] = (b"%d\n" % version + value, None)
+            return version
+
+    def renew(self, key: str, token: str, px: int) -> bool:
+        with self._lock:
+            if self._live(key) != _bytes(token):
+                return False
+            self._data[self.prefix + key] = (_bytes(token), time.monotonic() + px / 1000)
+            return True
+
+    def release(self, key: str, token: str) -> bool:
+        with self._lock:
+            if self._live(key) != _bytes(token):
+                return False
+            del self._data[self.prefix + key]
+            return True
+
+
+# ── Redis (RESP2 over a socket) ───────────────────────────────────────────────
+
+_SET_VERSIONED = """
+local v = redis.call('incr', KEYS[1])
+redis.call('set', KEYS[2], v .. '\\n' .. ARGV[1])
+return v
+"""
+_SET_VERSIONED_IF = """
+if (redis.call('get', KEYS[1]) or '0') ~= ARGV[2] then
+  return -1
+end
+local v = redis.call('incr', KEYS[1])
+redis.call('set', KEYS[2], v .. '\\n' .. ARGV[1])
+return v
+"""
+_RENEW = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+  return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+  return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _bytes(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+def _encode_command(args) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        arg = _bytes(arg)
+        out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(out)
+
+
+class RedisBackend(_Backend):
+    """Minimal Redis client: one connection, reconnected once on a socket error."""
+
+    def __init__(self, url: str, prefix: str = KEY_PREFIX, timeout: float = 5.0):
+        parts = urlsplit(url)
+        self.prefix = prefix
+        self._host = parts.hostname or "localhost"
+        self._port = parts.port or 6379
+        self._username = unquote(parts.username) if parts.username else None
+        self._password = unquote(parts.password) if parts.password else None
+        self._db = int(parts.path.lstrip("/") or 0)
+        self._tls = parts.scheme == "rediss"
+        self._timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        sock = socket.create_connection((self._host, self._port), timeout=self._timeout)
+        if self._tls:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self._host)
+        self._sock, self._reader = sock, sock.makefile("rb")
+        if self._password:
+            self._call("AUTH", *([self._username] if self._username else []), self._password)
+        if self._db:
+            self._call("SELECT", self._db)
+
+    def _close(self) -> None:
+        for closable in (self._reader, self._sock):
+            try:
+                if closable is not None:
+                    closable.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise BackendError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            n = int(rest)
+            return None if n == -1 else self._reader.read(n + 2)[:-2]
+        if kind == b"*":
+            n = int(rest)
+            return None if n == -1 else [self._read_reply() for _ in range(n)]
+        raise BackendError(f"unexpected reply: {line!r}")
+
+    def _call(self, *args):
+        self._sock.sendall(_encode_command(args))
+        return self._read_reply()
+
+    def execute(self, *args):
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._call(*args)
+                except OSError:
+                    self._close()
+                    if attempt:
+                        raise
+
+    def get(self, key: str) -> bytes | None:
+        return self.execute("GET", self.prefix + key)
+
+    def set(self, key: str, value, nx: bool = False, px: int | None = None) -> bool:
+        args = ["SET", self.prefix + key, value]
+        if nx:
+            args.append("NX")
+        if px:
+            args += ["PX", px]
+        return self.execute(*args) == "OK"
+
+    def delete(self, key: str) -> None:
+        self.execute("DEL", self.prefix + key)
+
+    def set_versioned(self, key: str, value: bytes, expected: int | None = None) -> int | None:
+        keys = (f"{self.prefix}{key}:version", self.prefix + key)
+        if expected is None:
+            return self.execute("EVAL", _SET_VERSIONED, 2, *keys, value)
+        version = self.execute("EVAL", _SET_VERSIONED_IF, 2, *keys, value, expected)
+        return None if version == -1 else version
+
+    def renew(self, key: str, token: str, px: int) -> bool:
+        return bool(self.execute("EVAL", _RENEW, 1, self.prefix + key, token, px))
+
+    def release(self, key: str, token: str) -> bool:
+        return bool(self.execute("EVAL", _RELEASE, 1, self.prefix + key, token))
+
+
+def from_url(url: str):
+    """Backend for a SHARED_BACKEND_URL."""
+    scheme = urlsplit(url).scheme
+    if scheme == "memory":
+        return MemoryBackend()
+    if scheme in ("redis", "rediss"):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported SHARED_BACKEND_URL scheme: {scheme!r}")
+
+
+backend = from_url(SHARED_BACKEND_URL) if SHARED_BACKEND_URL else None
+
+
+# ── Leader election ───────────────────────────────────────────────────────────
+
+class LeaderElector:
+    """
+    Lease-based leadership: tick() takes the lease if it's free or renews it if
+    held. A node that can't reach the backend steps down; its lease then lapses
+    after ttl_ms and another node takes over.
+    """
+
+    def __init__(self, backend_, key: str = "leader", ttl_ms: int = LEADER_TTL_MS, node_id: str | None = None):
+        self.backend = backend_
+        self.key = key
+        self.ttl_ms = ttl_ms
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._on_change = None
+
+    def tick(self) -> bool:
+        try:
+            if self.is_leader:
+                held = self.backend.renew(self.key, self.node_id, self.ttl_ms)
+            else:
+                held = self.backend.set(self.key, self.node_id, nx=True, px=self.ttl_ms)
+        except (OSError, BackendError) as e:
+            logger.warning("Leader election: backend unavailable: %s", e)
+            held = False
+        if held != self.is_leader:
+            self.is_leader = held
+            logger.info("Leader election: %s %s leadership", self.node_id, "acquired" if held else "lost")
+            if self._on_change is not None:
+                self._on_change(held)
+        return held
+
+    def start(self, on_change=None) -> None:
+        """Tick every third of the TTL in a daemon thread; on_change(is_leader) fires on transitions."""
+        self._on_change = on_change
+
+        def _loop():
+            while True:
+                time.sleep(self.ttl_ms / 3000)
+                self.tick()
+
+        threading.Thread(target=_loop, daemon=True).start()
+
+    def resign(self) -> None:
+        try:
+            self.backend.release(self.key, self.node_id)
+        except (OSError, BackendError):
+            pass
+        self.is_leader = False
@@ -0,0 +1,108 @@
+"""
+snapshot_store.py — versioned, read-only dataset snapshots shared between processes.
+
+With APP_ROLE=loader one process runs the scheduler and publishes each dataset
+group here after it changes; APP_ROLE=web processes (gunicorn workers via
+wsgi.py) never scrape — they poll the store and swap newer snapshots into
+their module globals. The one per-node job they keep is nflverse_history's
+on-disk seasons, refreshed when the season rolls over and built through
+workers.run_job.
+
+Each publish writes DATA_DIR/snapshots/<name>-<version>.pkl (a pickle) and
+then atomically repoints <name>.current at it, so a reader sees either the
+previous or the new snapshot, never a partial one. Every web worker unpickles
+its own copy: the snapshots are Python dicts, so they cost each worker the
+memory of the data it serves. What the split saves is the scraping and build
+memory, which only the loader pays. Versions are nanosecond timestamps, so
+they keep increasing across loader restarts. The newest KEEP_VERSIONS files
+per name are kept.
+
+With a shared backend configured (shared_backend.py) snapshots go there
+instead — zstd-compressed, under snapshot:<name> — so nodes on different
+hosts follow the elected leader's data. The backend is trusted: whatever is
+published there gets unpickled.
+"""
+
+import logging
+import os
+import pickle
+import time
+from pathlib import Path
+
+import zstandard as zstd
+
+import nflverse_cache
+import shared_backend
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = nflverse_cache.DATA_DIR / "snapshots"
+
+KEEP_VERSIONS = 3
+
+
+def _path(name: str, version: int) -> Path:
+    return SNAPSHOT_DIR / f"{name}-{version:020d}.pkl"
+
+
+def _pointer(name: str) -> Path:
+    return SNAPSHOT_DIR / f"{name}.current"
+
+
+def publish(name: str, data) -> int:
+    """Write a new snapshot of `name` and make it current. Returns its version."""
+    if shared_backend.backend is not None:
+        blob = zstd.ZstdCompressor(level=3).compress(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        return shared_backend.backend.set_versioned(f"snapshot:{name}", blob)
+
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    version = max(time.time_ns(), (latest_version(name) or 0) + 1)
+    path = _path(name, version)
+    tmp = path.with_suffix(".pkl.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+    pointer_tmp = _pointer(name).with_suffix(".current.tmp")
+    pointer_tmp.write_text(str(version))
+    os.replace(pointer_tmp, _pointer(name))
+    _prune(name)
+    return version
+
+
+def latest_version(name: str) -> int | None:
+    if shared_backend.backend is not None:
+        return shared_backend.backend.latest_version(f"snapshot:{name}")
+    try:
+        return int(_pointer(name).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def load(name: str, newer_than: int | None = None) -> tuple[int, object] | None:
+    """(version, data) of the current snapshot, or None if there is none newer than `newer_than`."""
+    if shared_backend.backend is not None:
+        loaded = shared_backend.backend.get_versioned(f"snapshot:{name}", newer_than)
+        if loaded is None:
+            return None
+        version, blob = loaded
+        return version, pickle.loads(zstd.ZstdDecompressor().decompress(blob))
+
+    version = latest_version(name)
+    if version is None or (newer_than is not None and version <= newer_than):
+        return None
+    try:
+        with open(_path(name, version), "rb") as f:
+            return version, pickle.load(f)
+    except FileNotFoundError:
+        # Pruned between reading the pointer and opening the file; the next poll picks up the newer one
+        return None
+
+
+def _prune(name: str) -> None:
+    versions = sorted(SNAPSHOT_DIR.glob(f"{name}-*.pkl"))
+    for old in versions[:-KEEP_VERSIONS]:
+        try:
+            old.unlink()
+        except FileNotFoundError:
+            pass
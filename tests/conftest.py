@@ -47,6 +47,8 @@ def client(flask_app):
 def reset_globals():
     for name in GLOBAL_DICTS:
         getattr(nfl_helper, name).clear()
+    # Tests seed the dicts directly; make sure no ETag/body from a previous test still matches
+    nfl_helper.http_cache.bump_all()
     with patch.object(nfl_helper, "save_tinyurl_data"), \
          patch.object(nfl_helper, "save_tournament_data"):
         yield
@@ -0,0 +1,104 @@
+"""
+tests/test_changefeed.py — Tests for the versioned change log and /changes.
+"""
+
+import pytest
+
+import changefeed
+from conftest import nfl_helper
+
+
+@pytest.fixture
+def baseline():
+    """Two players and one DFS salary, recorded as the starting point; yields its version."""
+    nfl_helper.filtered_players.update({
+        "1": {"first_name": "A", "injury_status": None, "KTC Value": 5000},
+        "2": {"first_name": "B", "injury_status": None, "KTC Value": 3000},
+    })
+    nfl_helper.teams_data["MIN"] = []
+    nfl_helper.dfs_salaries_data["1_W3"] = {"salary": 7000}
+    yield changefeed.record("players", "teams", "dfs_salaries")
+
+
+class TestRecord:
+    def test_only_changed_fields(self, baseline):
+        nfl_helper.filtered_players["1"]["injury_status"] = "Out"
+        version = changefeed.record("players")
+        assert version == baseline + 1
+        delta = changefeed.changes(baseline)
+        assert delta["full"] is False
+        assert delta["changes"]["players"] == {"1": {"injury_status": "Out"}}
+        assert delta["changes"]["dfs_salaries"] == {}
+
+    def test_no_change_no_version(self, baseline):
+        assert changefeed.record("players", "teams", "dfs_salaries") == baseline
+
+    def test_new_removed_and_dropped_fields(self, baseline):
+        nfl_helper.filtered_players["3"] = {"first_name": "C"}
+        del nfl_helper.filtered_players["2"]
+        del nfl_helper.filtered_players["1"]["KTC Value"]
+        changefeed.record("players")
+        delta = changefeed.changes(baseline)
+        assert delta["changes"]["players"] == {"1": {"KTC Value": None}, "3": {"first_name": "C"}}
+        assert delta["removed"]["players"] == ["2"]
+
+    def test_deltas_are_merged(self, baseline):
+        nfl_helper.filtered_players["1"]["KTC Value"] = 5100
+        changefeed.record("players")
+        nfl_helper.filtered_players["1"]["injury_status"] = "Q"
+        nfl_helper.filtered_players["1"]["KTC Value"] = 5200
+        nfl_helper.teams_data["MIN"] = [{"first_name": "A", "injury_status": "Q"}]
+        changefeed.record("players", "teams")
+        delta = changefeed.changes(baseline)
+        assert delta["changes"]["players"] == {"1": {"KTC Value": 5200, "injury_status": "Q"}}
+        assert delta["changes"]["teams"] == {"MIN": [{"first_name": "A", "injury_status": "Q"}]}
+
+    def test_removed_then_readded(self, baseline):
+        del nfl_helper.filtered_players["2"]
+        changefeed.record("players")
+        nfl_helper.filtered_players["2"] = {"first_name": "B2"}
+        changefeed.record("players")
+        delta = changefeed.changes(baseline)
+        assert delta["removed"]["players"] == ["2"]
+        assert delta["changes"]["players"]["2"] == {"first_name": "B2"}
+
+
+class TestSnapshot:
+    def test_old_or_unknown_version_gets_full_snapshot(self, baseline, monkeypatch):
+        assert changefeed.changes(None)["full"] is True
+        assert changefeed.changes(baseline + 100)["full"] is True
+        monkeypatch.setattr(changefeed, "MAX_ENTRIES", 1)
+        for value in (1, 2):
+            nfl_helper.filtered_players["1"]["KTC Value"] = value
+            changefeed.record("players")
+        snapshot = changefeed.changes(baseline)
+        assert snapshot["full"] is True
+        assert snapshot["changes"]["players"]["1"]["KTC Value"] == 2
+        assert changefeed.changes(baseline + 1)["full"] is False
+
+    def test_export_and_load_state(self, baseline):
+        nfl_helper.filtered_players["2"]["injury_status"] = "IR"
+        changefeed.record("players")
+        state = changefeed.export_state()
+        changefeed.load_state(state)
+        assert changefeed.changes(baseline)["changes"]["players"] == {"2": {"injury_status": "IR"}}
+
+
+class TestEndpoint:
+    def test_changes_since(self, client, baseline):
+        nfl_helper.filtered_players["1"]["injury_status"] = "Out"
+        changefeed.record("players")
+        data = client.get(f"/changes?since={baseline}").get_json()
+        assert data["full"] is False
+        assert data["version"] == baseline + 1
+        assert data["changes"]["players"] == {"1": {"injury_status": "Out"}}
+
+    def test_full_and_not_modified(self, client, baseline):
+        resp = client.get("/changes")
+        assert resp.get_json()["full"] is True
+        assert set(resp.get_json()["changes"]["players"]) == {"1", "2"}
+        tag = resp.headers["ETag"]
+        assert client.get("/changes", headers={"If-None-Match": tag}).status_code == 304
+
+    def test_bad_since(self, client):
+        assert client.get("/changes?since=abc").status_code == 400
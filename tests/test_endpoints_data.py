@@ -1,5 +1,8 @@
+import gzip
+import json
 import sys
 import pytest
+from cachetools import LRUCache
 
 nfl_helper = sys.modules["nfl_helper"]
 
@@ -52,3 +55,138 @@ class TestDfsSalariesWeek:
     def test_no_data_returns_404(self, client):
         resp = client.get("/dfs-salaries/week/99")
         assert resp.status_code == 404
+
+
+class TestConditionalGet:
+    def test_etag_and_304(self, client):
+        nfl_helper.fantasy_points_data["111_8"] = {"sleeper_id": "111", "week": 8}
+        resp = client.get("/fantasy-points/data")
+        assert resp.status_code == 200
+        assert "max-age" in resp.headers["Cache-Control"]
+        etag = resp.headers["ETag"]
+
+        resp = client.get("/fantasy-points/data", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.data == b""
+        assert resp.headers["ETag"] == etag
+
+    def test_bump_invalidates(self, client):
+        etag = client.get("/dfs-salaries/data").headers["ETag"]
+        nfl_helper.http_cache.bump("dfs_salaries")
+        resp = client.get("/dfs-salaries/data", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
+
+    def test_datasets_have_independent_versions(self, client):
+        etag = client.get("/picks/data").headers["ETag"]
+        nfl_helper.http_cache.bump("fantasy_points")
+        assert client.get("/picks/data", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_static_schedules(self, client):
+        resp = client.get("/teams/schedules")
+        assert "max-age=3600" in resp.headers["Cache-Control"]
+        assert client.get("/teams/schedules", headers={"If-None-Match": resp.headers["ETag"]}).status_code == 304
+
+
+class TestPreserializedBodies:
+    def test_gzip_variant_by_accept_encoding(self, client):
+        plain = client.get("/teams/schedules")
+        assert "Content-Encoding" not in plain.headers
+        zipped = client.get("/teams/schedules", headers={"Accept-Encoding": "gzip, deflate"})
+        assert zipped.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in zipped.headers["Vary"]
+        assert json.loads(gzip.decompress(zipped.data)) == plain.get_json()
+        assert len(zipped.data) < len(plain.data)
+
+    def test_serialized_once_per_version(self, client, monkeypatch):
+        calls = []
+        real = nfl_helper.http_cache._dumps
+        monkeypatch.setattr(nfl_helper.http_cache, "_dumps", lambda data: calls.append(1) or real(data))
+        nfl_helper.picks_data["p1"] = {"Pick ID": "p1"}
+        nfl_helper.http_cache.bump("picks")
+        client.get("/picks/data")
+        client.get("/picks/data", headers={"Accept-Encoding": "gzip"})
+        assert len(calls) == 1
+        nfl_helper.picks_data["p2"] = {"Pick ID": "p2"}
+        nfl_helper.http_cache.bump("picks")
+        assert set(client.get("/picks/data").get_json()) == {"p1", "p2"}
+        assert len(calls) == 2
+
+    def test_small_bodies_not_compressed(self, client):
+        resp = client.get("/fantasy-points/data", headers={"Accept-Encoding": "gzip"})
+        assert resp.get_json() == {} and "Content-Encoding" not in resp.headers
+
+    def test_fallback_without_orjson_or_brotli(self, client, monkeypatch):
+        monkeypatch.setattr(nfl_helper.http_cache, "orjson", None)
+        monkeypatch.setattr(nfl_helper.http_cache, "brotli", None)
+        nfl_helper.picks_data.update({1: {"pad": "x" * 2000}, "p2": {"Pick ID": "p2"}})   # mixed key types
+        nfl_helper.http_cache.bump("picks")
+        resp = client.get("/picks/data", headers={"Accept-Encoding": "br, gzip"})
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert set(json.loads(gzip.decompress(resp.data))) == {"1", "p2"}
+
+    def test_cache_is_byte_bounded(self, client, monkeypatch):
+        cache = LRUCache(maxsize=4096, getsizeof=nfl_helper.http_cache._entry_size)
+        monkeypatch.setattr(nfl_helper.http_cache, "_bodies", cache)
+        for i in range(20):
+            nfl_helper.fantasy_points_data[f"{i}_8"] = {"sleeper_id": str(i), "week": 8, "pad": "x" * 100}
+            nfl_helper.http_cache.bump("fantasy_points")
+            assert len(client.get("/fantasy-points/data").get_json()) == i + 1
+        assert cache.currsize <= 4096 and len(cache) < 20
+
+
+class TestBulkProjection:
+    def _seed(self, n=5):
+        for i in range(n):
+            nfl_helper.dfs_salaries_data[f"{i}_W3"] = {
+                "sleeper_id": str(i), "salary": 5000 + i, "week": 3,
+                "stats": {"fpts": 10.0 + i, "ceiling": 20.0},
+            }
+        nfl_helper.http_cache.bump("dfs_salaries")
+
+    def test_fields_projection(self, client):
+        self._seed(2)
+        data = client.get("/dfs-salaries/data?fields=salary,stats.fpts").get_json()
+        assert data["0_W3"] == {"salary": 5000, "stats": {"fpts": 10.0}}
+
+    def test_unparameterised_response_unchanged(self, client):
+        self._seed(2)
+        assert client.get("/dfs-salaries/data").get_json() == nfl_helper.dfs_salaries_data
+
+    def test_cursor_pages_cover_dataset_once(self, client):
+        self._seed(5)
+        seen, url = [], "/dfs-salaries/data?page_size=2&fields=salary"
+        while url:
+            resp = client.get(url)
+            page = resp.get_json()
+            assert len(page) <= 2
+            seen += list(page)
+            cursor = resp.headers.get("X-Next-Cursor")
+            url = f"/dfs-salaries/data?page_size=2&fields=salary&cursor={cursor}" if cursor else None
+        assert seen == sorted(nfl_helper.dfs_salaries_data)
+
+    def test_key_cursor_survives_updates(self, client):
+        nfl_helper.fantasy_points_data.update({"a_8": {"week": 8}, "c_8": {"week": 8}})
+        nfl_helper.http_cache.bump("fantasy_points")
+        first = client.get("/fantasy-points/data?page_size=1")
+        assert list(first.get_json()) == ["a_8"]
+        nfl_helper.fantasy_points_data["b_8"] = {"week": 8}
+        nfl_helper.http_cache.bump("fantasy_points")
+        cursor = first.headers["X-Next-Cursor"]
+        assert list(client.get(f"/fantasy-points/data?page_size=5&cursor={cursor}").get_json()) == ["b_8", "c_8"]
+
+    def test_bad_cursor(self, client):
+        assert client.get("/dfs-salaries/data?cursor=%%%").status_code == 400
+        assert client.get("/dfs-salaries/data?page_size=abc").status_code == 400
+
+    def test_getplayers_fields_and_pages(self, client):
+        for pid in ("1", "2", "3"):
+            nfl_helper.filtered_players[pid] = {"name": f"P{pid}", "weekly": [1, 2, 3]}
+        nfl_helper.picks_data["2026 1.01"] = {"name": "Pick", "weekly": []}
+        body = {"playerlist": ["1", "2", "3"], "include_picks": True, "fields": ["name"]}
+        first = client.post("/getplayers/data?page_size=2", json=body)
+        assert first.get_json() == {"1": {"name": "P1"}, "2": {"name": "P2"}}
+        cursor = first.headers["X-Next-Cursor"]
+        last = client.post(f"/getplayers/data?page_size=2&cursor={cursor}", json=body)
+        assert last.get_json() == {"3": {"name": "P3"}, "2026 1.01": {"name": "Pick"}}
+        assert "X-Next-Cursor" not in last.headers
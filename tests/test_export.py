@@ -0,0 +1,121 @@
+"""
+tests/test_export.py — Tests for the /export/* NDJSON, Arrow and Parquet downloads.
+"""
+
+import io
+import json
+
+import polars as pl
+import pyarrow as pa
+import pytest
+
+import nflverse_stats as ns
+import routes_export
+from conftest import nfl_helper
+
+
+@pytest.fixture
+def fantasy_points():
+    for i in range(3):
+        nfl_helper.fantasy_points_data[f"{i}_8"] = {"sleeper_id": str(i), "week": 8, "points": 1.5 * i}
+    nfl_helper.http_cache.bump("fantasy_points")
+
+
+@pytest.fixture
+def player_stats():
+    ns.nflverse_player_stats.clear()
+    ns.nflverse_player_stats.update({
+        "p1": {"name": "A", "position": "WR", "team": "MIN", "season": 2025,
+               "season_totals": {"fantasy_points_ppr": 120.5},
+               "weekly": [{"week": 1, "fantasy_points_ppr": 20.0}, {"week": 2, "fantasy_points_ppr": 12.0}]},
+        "p2": {"name": "B", "position": "RB", "team": "GB", "season": 2025,
+               "season_totals": {"fantasy_points_ppr": 88.0}, "weekly": []},
+    })
+    ns.nflverse_version += 1
+    yield
+    ns.nflverse_player_stats.clear()
+    ns.nflverse_version += 1
+
+
+class TestFormats:
+    def test_ndjson_one_object_per_line(self, client, fantasy_points):
+        resp = client.get("/export/fantasy_points.ndjson")
+        assert resp.status_code == 200
+        assert resp.mimetype == "application/x-ndjson"
+        rows = [json.loads(line) for line in resp.data.splitlines()]
+        assert rows == [{"sleeper_id": str(i), "week": 8, "points": 1.5 * i} for i in range(3)]
+
+    def test_ndjson_chunks(self, client, fantasy_points, monkeypatch):
+        monkeypatch.setattr(routes_export, "NDJSON_CHUNK_ROWS", 2)
+        resp = client.get("/export/fantasy_points.ndjson", buffered=False)
+        chunks = list(resp.response)
+        assert len(chunks) == 2
+        assert b"".join(chunks).count(b"\n") == 3
+
+    def test_arrow_stream_batches(self, client, player_stats, monkeypatch):
+        monkeypatch.setattr(routes_export, "EXPORT_BATCH_ROWS", 1)
+        resp = client.get("/export/stats_weekly.arrow")
+        assert resp.mimetype == "application/vnd.apache.arrow.stream"
+        reader = pa.ipc.open_stream(resp.data)
+        batches = list(reader)
+        assert [b.num_rows for b in batches] == [1, 1]
+        table = pa.Table.from_batches(batches)
+        assert table.column("week").to_pylist() == [1, 2]
+
+    def test_parquet(self, client, player_stats):
+        resp = client.get("/export/stats_players.parquet")
+        assert resp.mimetype == "application/vnd.apache.parquet"
+        df = pl.read_parquet(io.BytesIO(resp.data))
+        assert df.sort("sleeper_id")["fantasy_points_ppr"].to_list() == [120.5, 88.0]
+
+    @pytest.mark.parametrize("fmt", sorted(routes_export.FORMATS))
+    def test_wsgi_iterable_yields_bytes(self, fantasy_points, fmt):
+        environ = {"REQUEST_METHOD": "GET", "PATH_INFO": f"/export/fantasy_points.{fmt}",
+                   "SERVER_NAME": "test", "SERVER_PORT": "80", "wsgi.url_scheme": "http",
+                   "wsgi.input": io.BytesIO(), "wsgi.errors": io.StringIO()}
+        body = nfl_helper.app.wsgi_app(environ, lambda status, headers, exc_info=None: None)
+        chunks = list(body)
+        assert chunks and all(type(chunk) is bytes for chunk in chunks)
+
+    def test_empty_dataset(self, client):
+        resp = client.get("/export/dfs_salaries.arrow")
+        assert resp.status_code == 200
+        assert pa.ipc.open_stream(resp.data).read_all().num_rows == 0
+
+
+class TestFields:
+    def test_columnar_selects_columns(self, client, player_stats):
+        resp = client.get("/export/stats_players.arrow?fields=team,sleeper_id")
+        table = pa.ipc.open_stream(resp.data).read_all()
+        assert sorted(table.column_names) == ["sleeper_id", "team"]
+
+    def test_ndjson_projects_rows(self, client, fantasy_points):
+        resp = client.get("/export/fantasy_points.ndjson?fields=points")
+        assert json.loads(resp.data.splitlines()[1]) == {"points": 1.5}
+
+    def test_unknown_column_is_400(self, client, player_stats):
+        assert client.get("/export/stats_players.parquet?fields=nope").status_code == 400
+
+
+class TestRouting:
+    def test_unknown_dataset_and_format(self, client):
+        assert client.get("/export/nope.ndjson").status_code == 404
+        assert client.get("/export/stats_players.csv").status_code == 404
+
+    def test_listing(self, client):
+        data = client.get("/export").get_json()
+        assert {"stats_players", "fantasy_points", "dfs_salaries"} <= set(data["datasets"])
+        assert data["formats"] == ["arrow", "ndjson", "parquet"]
+
+    def test_etag_follows_dataset_version(self, client, fantasy_points):
+        tag = client.get("/export/fantasy_points.parquet").headers["ETag"]
+        assert client.get("/export/fantasy_points.parquet", headers={"If-None-Match": tag}).status_code == 304
+        nfl_helper.http_cache.bump("fantasy_points")
+        assert client.get("/export/fantasy_points.parquet", headers={"If-None-Match": tag}).status_code == 200
+
+    def test_frame_rebuilt_on_version_change(self, fantasy_points):
+        first = routes_export.frame("fantasy_points")
+        assert routes_export.frame("fantasy_points") is first
+        nfl_helper.fantasy_points_data["9_8"] = {"sleeper_id": "9", "week": 8, "points": 4.0}
+        nfl_helper.http_cache.bump("fantasy_points")
+        assert routes_export.frame("fantasy_points").height == 4
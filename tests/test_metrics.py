@@ -0,0 +1,126 @@
+"""
+tests/test_metrics.py — Tests for the sharded metrics registry and the
+/statistics and /metrics endpoints.
+"""
+
+import threading
+
+import requests
+
+import metrics
+from conftest import nfl_helper
+
+
+class TestCounters:
+    def test_no_lost_increments_across_threads(self):
+        def work():
+            for _ in range(2000):
+                metrics.inc("test_threads_total", kind="a")
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert metrics.counter_totals("test_threads_total", "kind") == {"a": 16000}
+
+    def test_dead_thread_shards_are_folded(self):
+        t = threading.Thread(target=lambda: metrics.inc("test_folded_total"))
+        t.start()
+        t.join()
+        metrics.collect()
+        assert all(thread.is_alive() for thread, _ in metrics._shards)
+        assert metrics.counter_totals("test_folded_total", "kind") == {None: 1}
+
+
+class TestHistograms:
+    def test_quantiles(self):
+        for ms in range(1, 101):
+            metrics.observe("http_request_duration_seconds", ms / 1000, endpoint="test_quantiles")
+        s = metrics.summary("http_request_duration_seconds", "endpoint", scale=1000)["test_quantiles"]
+        assert s["count"] == 100
+        assert s["mean"] == 50.5
+        # Bucket interpolation: within one bucket width (≤ 1.5×) of the exact value
+        assert 50 / 1.5 <= s["p50"] <= 50 * 1.5
+        assert 95 / 1.5 <= s["p95"] <= 95 * 1.5
+        assert s["p50"] < s["p95"] <= s["p99"]
+
+    def test_quantile_empty_and_overflow(self):
+        buckets = (1.0, 2.0)
+        assert metrics.quantile(buckets, [0, 0, 0, 0.0], 0.5) is None
+        assert metrics.quantile(buckets, [0, 0, 5, 50.0], 0.99) == 2.0
+
+
+class TestDatasets:
+    def test_recomputed_only_on_version_change(self):
+        state = {"version": 1, "calls": 0}
+
+        def compute():
+            state["calls"] += 1
+            return {"entries": state["calls"]}
+
+        metrics.register_dataset("test_dataset", lambda: state["version"], compute)
+        assert metrics.dataset_stats()["test_dataset"] == {"entries": 1}
+        metrics.dataset_stats()
+        assert state["calls"] == 1
+        state["version"] = 2
+        assert metrics.dataset_stats()["test_dataset"] == {"entries": 2}
+        del metrics._datasets["test_dataset"]
+
+
+class TestPrometheus:
+    def test_exposition_format(self):
+        metrics.inc("test_render_total", route='a"b')
+        metrics.observe("http_response_size_bytes", 300, endpoint="test_render")
+        metrics.set_gauge("test_gauge", 1.5)
+        text = metrics.render_prometheus()
+        assert '# TYPE nfl_helper_test_render_total counter' in text
+        assert 'nfl_helper_test_render_total{route="a\\"b"} 1' in text
+        assert 'nfl_helper_http_response_size_bytes_bucket{endpoint="test_render",le="256.0"} 0' in text
+        assert 'nfl_helper_http_response_size_bytes_bucket{endpoint="test_render",le="1024.0"} 1' in text
+        assert 'nfl_helper_http_response_size_bytes_bucket{endpoint="test_render",le="+Inf"} 1' in text
+        assert 'nfl_helper_http_response_size_bytes_count{endpoint="test_render"} 1' in text
+        assert 'nfl_helper_test_gauge 1.5' in text
+
+
+class _StubAdapter(requests.adapters.BaseAdapter):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 204
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+class TestUpstream:
+    def test_requests_are_timed_by_host(self):
+        session = requests.Session()
+        session.mount("https://", _StubAdapter())
+        session.get("https://upstream.test/x")
+        assert metrics.counter_totals("upstream_requests_total", "host").get("upstream.test") == 1
+        assert metrics.summary("upstream_request_duration_seconds", "host")["upstream.test"]["count"] == 1
+
+
+class TestEndpoints:
+    def test_statistics_reports_latency_and_datasets(self, client):
+        nfl_helper.dfs_salaries_data["1"] = {"week": 3, "date": "2026-09-27"}
+        nfl_helper.http_cache.bump("dfs_salaries")
+        client.get("/currentweek")
+        data = client.get("/statistics").get_json()
+        assert data["requests_per_endpoint"]["get_current_week"] >= 1
+        assert data["latency_ms"]["get_current_week"]["count"] >= 1
+        assert data["total_dfs_salaries"] == 1
+        assert data["dfs_salaries_weeks"] == [3]
+        assert data["dfs_salaries_dates"] == ["2026-09-27"]
+        assert data["datasets"]["dfs_salaries"] == {"entries": 1}
+
+    def test_metrics_endpoint(self, client):
+        client.get("/currentweek")
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/plain"
+        body = resp.get_data(as_text=True)
+        assert 'nfl_helper_http_requests_total{endpoint="get_current_week",method="GET",status="200"}' in body
+        assert 'nfl_helper_dataset_entries{dataset="dfs_salaries"}' in body
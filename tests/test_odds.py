@@ -0,0 +1,703 @@
+"""
+tests/test_odds.py — Tests for the odds_api client and /odds/* endpoints.
+
+HTTP is faked at the session level — no network calls are made.
+"""
+
+import datetime
+import math
+import numpy as np
+import time
+import threading
+import pytest
+
+import nflverse_stats as ns
+import odds_api as oa
+import odds_backtest
+import odds_hitrate
+import odds_movement
+import odds_planner
+import odds_pricing
+import routes_odds
+
+
+# ── Fakes ─────────────────────────────────────────────────────────────────────
+
+class _Resp:
+    def __init__(self, payload, status=200, remaining=None):
+        self._payload = payload
+        self.status_code = status
+        self.headers = {} if remaining is None else {"x-requests-remaining": str(remaining)}
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"{self.status_code}")
+
+
+class _Session:
+    """Routes GETs by event id; optional per-event delay to shuffle completion order."""
+
+    def __init__(self, responses: dict, delays: dict | None = None):
+        self.responses = responses
+        self.delays = delays or {}
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        event_id = url.split("/events/")[1].split("/")[0] if "/events/" in url else None
+        with self._lock:
+            self.calls.append(event_id)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delays.get(event_id, 0))
+        with self._lock:
+            self.in_flight -= 1
+        return self.responses[event_id]
+
+
+def _kickoff(hours: float) -> str:
+    return (datetime.datetime.utcnow() + datetime.timedelta(hours=hours)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _game(event_id, hours=24, home="MIN", away="GB"):
+    return {"event_id": event_id, "home_abbr": home, "away_abbr": away, "commence_time": _kickoff(hours)}
+
+
+def _props_event(player="Justin Jefferson", line=80.5, over=1.9, book="dk"):
+    return {"bookmakers": [{"key": book, "markets": [{"key": "player_reception_yds", "outcomes": [
+        {"name": "Over", "description": player, "point": line, "price": over},
+        {"name": "Under", "description": player, "point": line, "price": 1.9},
+    ]}]}]}
+
+
+@pytest.fixture(autouse=True)
+def reset_odds(monkeypatch):
+    monkeypatch.setattr(oa, "odds_credits_remaining", None)
+    ns.nflverse_player_stats.clear()
+    ns.nflverse_player_stats["999"] = {"name": "Justin Jefferson", "position": "WR", "team": "MIN",
+                                       "rolling_5": {"receiving_yards": 100.0}}
+    ns.nflverse_player_stats["888"] = {"name": "Aaron Jones", "position": "RB", "team": "MIN",
+                                       "rolling_5": {}}
+    yield
+    ns.nflverse_player_stats.clear()
+
+
+def _use_session(monkeypatch, session):
+    monkeypatch.setattr(oa, "_get_session", lambda: session)
+    return session
+
+
+# ── fetch_player_props ────────────────────────────────────────────────────────
+
+class TestFetchPlayerProps:
+    def test_fetches_concurrently(self, monkeypatch):
+        games = {f"e{i}": _game(f"e{i}", hours=i + 1) for i in range(6)}
+        session = _use_session(monkeypatch, _Session(
+            {eid: _Resp(_props_event()) for eid in games},
+            delays={eid: 0.05 for eid in games},
+        ))
+        monkeypatch.setattr(oa, "PROPS_MAX_WORKERS", 6)
+        oa.fetch_player_props("key", oa._build_name_lookup(), games)
+        assert session.max_in_flight > 1
+        assert sorted(session.calls) == sorted(games)
+
+    def test_merge_is_in_event_order_regardless_of_completion(self, monkeypatch):
+        games = {"first": _game("first", hours=1), "second": _game("second", hours=2)}
+        _use_session(monkeypatch, _Session(
+            {"first": _Resp(_props_event(over=1.8, book="dk")),
+             "second": _Resp(_props_event(over=1.8, book="fd"))},
+            delays={"first": 0.1},   # first event finishes last
+        ))
+        props, _ = oa.fetch_player_props("key", oa._build_name_lookup(), games)
+        assert props[0]["event_id"] == "first"
+        assert props[0]["props"]["player_reception_yds"]["best_over_book"] == "dk"
+
+    def test_missing_props_and_errors_skipped(self, monkeypatch):
+        games = {"a": _game("a"), "b": _game("b"), "c": _game("c")}
+        _use_session(monkeypatch, _Session({
+            "a": _Resp({}, status=404), "b": _Resp({}, status=500), "c": _Resp(_props_event()),
+        }))
+        props, _ = oa.fetch_player_props("key", oa._build_name_lookup(), games)
+        assert [p["event_id"] for p in props] == ["c"]
+        assert props[0]["props"]["player_reception_yds"]["value_flag"] == "over"
+
+    def test_respects_credit_reserve(self, monkeypatch):
+        games = {f"e{i}": _game(f"e{i}", hours=i + 1) for i in range(5)}
+        cost = oa.props_credit_cost()
+        monkeypatch.setattr(oa, "odds_credits_remaining", oa.ODDS_CREDIT_RESERVE + 2 * cost)
+        monkeypatch.setattr(oa, "PROPS_MAX_WORKERS", 1)
+        session = _use_session(monkeypatch, _Session({eid: _Resp(_props_event()) for eid in games}))
+        oa.fetch_player_props("key", oa._build_name_lookup(), games)
+        # Only the two soonest kickoffs fit in the budget
+        assert session.calls == ["e0", "e1"]
+
+    def test_slow_stale_balance_does_not_overwrite_fresher_one(self, monkeypatch):
+        games = {"a": _game("a", hours=1), "b": _game("b", hours=2)}
+        _use_session(monkeypatch, _Session(
+            {"a": _Resp(_props_event(), remaining=490), "b": _Resp(_props_event(), remaining=480)},
+            delays={"a": 0.1},   # the older, higher figure lands last
+        ))
+        monkeypatch.setattr(oa, "PROPS_MAX_WORKERS", 2)
+        oa.fetch_player_props("key", oa._build_name_lookup(), games)
+        assert oa.odds_credits_remaining == 480
+
+    def test_lookahead_window(self, monkeypatch):
+        games = {"near": _game("near", hours=24), "far": _game("far", hours=24 * 30)}
+        session = _use_session(monkeypatch, _Session({"near": _Resp(_props_event())}))
+        oa.fetch_player_props("key", oa._build_name_lookup(), games)
+        assert session.calls == ["near"]
+
+
+# ── odds_planner ──────────────────────────────────────────────────────────────
+
+NOW = datetime.datetime(2025, 10, 12, 12, 0)   # Sunday noon UTC, 20 days to reset
+
+
+def _ago(hours: float) -> str:
+    return (NOW - datetime.timedelta(hours=hours)).isoformat() + "Z"
+
+
+class TestPlanRefresh:
+    def test_first_run_buys_everything(self):
+        kickoffs = {"a": NOW + datetime.timedelta(hours=5), "b": NOW + datetime.timedelta(days=4)}
+        plan = odds_planner.plan_refresh(NOW, kickoffs, None, None, {})
+        assert plan["refresh_lines"] is True
+        assert plan["props_events"] == ["a", "b"]
+
+    def test_max_age_shrinks_near_kickoff(self):
+        kickoffs = {"soon": NOW + datetime.timedelta(hours=2), "later": NOW + datetime.timedelta(days=4)}
+        plan = odds_planner.plan_refresh(
+            NOW, kickoffs, 10_000, _ago(1), {"soon": _ago(2), "later": _ago(2)},
+        )
+        assert plan["refresh_lines"] is True        # 1h old, kickoff in 2h → 30 min max
+        assert plan["props_events"] == ["soon"]     # later event's props are fine for 24h
+
+    def test_nothing_due(self):
+        kickoffs = {"a": NOW + datetime.timedelta(days=5)}
+        plan = odds_planner.plan_refresh(NOW, kickoffs, 10_000, _ago(1), {"a": _ago(1)})
+        assert not plan["refresh_lines"] and plan["props_events"] == []
+        assert plan["estimated_cost"] == 0
+
+    def test_started_and_far_events_ignored(self):
+        kickoffs = {"live": NOW - datetime.timedelta(hours=1), "far": NOW + datetime.timedelta(days=30)}
+        plan = odds_planner.plan_refresh(NOW, kickoffs, None, _ago(0.1), {})
+        assert plan["props_events"] == []
+
+    def test_budget_defers_furthest_events(self, monkeypatch):
+        monkeypatch.setattr(oa, "ODDS_CREDIT_RESERVE", 0)
+        kickoffs = {f"e{i}": NOW + datetime.timedelta(hours=2 + i) for i in range(4)}
+        cost = oa.game_lines_credit_cost() + 2 * oa.props_credit_cost()
+        # allowance per day × game-day multiplier exactly covers lines + 2 events
+        credits = math.ceil(cost / odds_planner.GAMEDAY_MULTIPLIER * odds_planner._days_until_reset(NOW))
+        plan = odds_planner.plan_refresh(NOW, kickoffs, credits, None, {})
+        assert plan["refresh_lines"] is True
+        assert plan["props_events"] == ["e0", "e1"]
+        assert plan["deferred"] == ["e2", "e3"]
+
+    def test_spent_today_reduces_budget(self):
+        kickoffs = {"a": NOW + datetime.timedelta(hours=2)}
+        plan = odds_planner.plan_refresh(NOW, kickoffs, 1_000, None, {}, spent_today=10_000)
+        assert not plan["refresh_lines"]
+        assert plan["deferred"] == ["lines", "a"]
+
+    def test_schedule_kickoffs_time_lines_without_odds(self):
+        plan = odds_planner.plan_refresh(
+            NOW, {}, None, _ago(1), {}, schedule_kickoffs=[NOW + datetime.timedelta(hours=2)],
+        )
+        assert plan["refresh_lines"] is True
+
+
+class TestPlannedRefresh:
+    def test_executes_plan_and_records_spend(self, monkeypatch):
+        monkeypatch.setattr(odds_planner, "_spend", {})
+        monkeypatch.setattr(oa, "odds_credits_remaining", 500)
+        oa.odds_games.clear()
+        oa.odds_games["a"] = {"event_id": "a", "home_abbr": "MIN", "away_abbr": "GB",
+                              "commence_time": _kickoff(2)}
+        calls = []
+
+        def _lines(key):
+            calls.append("lines")
+            oa.odds_credits_remaining -= 6
+            return True
+
+        def _props(key, events):
+            calls.append(tuple(events))
+            oa.odds_credits_remaining -= 4
+            return True
+
+        monkeypatch.setattr(oa, "odds_lines_updated_at", None)
+        monkeypatch.setattr(oa, "odds_props_updated_at", {})
+        monkeypatch.setattr(oa, "refresh_game_lines", _lines)
+        monkeypatch.setattr(oa, "refresh_event_props", _props)
+        plan = odds_planner.run_planned_refresh("key")
+        assert calls == ["lines", ("a",)]
+        assert plan["spent"] == 10 and odds_planner.spent_today() == 10
+        oa.odds_games.clear()
+
+    def test_status_endpoint_exposes_plan(self, client):
+        data = client.get("/odds/status").get_json()
+        assert "next_plan" in data["planner"] and "daily_allowance" in data["planner"]["spend"]
+
+
+class TestPartialRefresh:
+    def test_event_props_spliced(self, monkeypatch):
+        oa.odds_games.clear()
+        oa.odds_games.update({"a": _game("a"), "b": _game("b")})
+        monkeypatch.setattr(oa, "odds_props", [
+            {"sleeper_id": "888", "event_id": "a", "props": {}},
+            {"sleeper_id": "777", "event_id": "b", "props": {}},
+        ])
+        monkeypatch.setattr(oa, "odds_props_updated_at", {})
+        _use_session(monkeypatch, _Session({"a": _Resp(_props_event())}))
+        assert oa.refresh_event_props("key", ["a"])
+        assert sorted(p["sleeper_id"] for p in oa.odds_props) == ["777", "999"]
+        assert "a" in oa.odds_props_updated_at
+        oa.odds_games.clear()
+
+    def test_skipped_event_keeps_props_and_stays_stale(self, monkeypatch):
+        oa.odds_games.clear()
+        oa.odds_games.update({"a": _game("a")})
+        monkeypatch.setattr(oa, "odds_props", [{"sleeper_id": "888", "event_id": "a", "props": {}}])
+        monkeypatch.setattr(oa, "odds_props_updated_at", {"a": "2025-10-01T00:00:00Z"})
+        monkeypatch.setattr(oa, "odds_credits_remaining", oa.ODDS_CREDIT_RESERVE)
+        session = _use_session(monkeypatch, _Session({"a": _Resp(_props_event())}))
+        oa.refresh_event_props("key", ["a"])
+        assert session.calls == []
+        assert [p["sleeper_id"] for p in oa.odds_props] == ["888"]
+        assert oa.odds_props_updated_at == {"a": "2025-10-01T00:00:00Z"}
+        oa.odds_games.clear()
+
+    def test_full_refresh_stamps_only_fetched_events(self, monkeypatch):
+        games = {"a": _game("a"), "b": _game("b")}
+        monkeypatch.setattr(oa, "fetch_game_odds", lambda key: dict(games))
+        monkeypatch.setattr(oa, "_record_movement", lambda games: None)
+        monkeypatch.setattr(oa, "odds_props", [{"sleeper_id": "888", "event_id": "b", "props": {}}])
+        monkeypatch.setattr(oa, "odds_props_updated_at", {"b": "2025-10-01T00:00:00Z", "gone": "x"})
+        _use_session(monkeypatch, _Session({"a": _Resp(_props_event()), "b": _Resp({}, status=500)}))
+        oa.refresh_odds_data("key")
+        assert sorted(p["sleeper_id"] for p in oa.odds_props) == ["888", "999"]
+        assert set(oa.odds_props_updated_at) == {"a", "b"}
+        assert oa.odds_props_updated_at["b"] == "2025-10-01T00:00:00Z"
+        oa.odds_games.clear()
+        oa.rebuild_indexes()
+
+
+# ── odds_movement ─────────────────────────────────────────────────────────────
+
+T0 = datetime.datetime(2025, 10, 12, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def _quoted_game(total_line=47.5, over=1.91, kickoff="2025-10-12T17:00:00Z", book="dk"):
+    return {"e1": {
+        "event_id": "e1", "home_abbr": "MIN", "away_abbr": "GB", "commence_time": kickoff,
+        "h2h": {"home_price": 1.8, "away_price": 2.1},
+        "spread": {"home_spread": -2.5, "home_price": 1.9},
+        "total": {"line": total_line, "over_price": over, "under_price": 1.91},
+        "books": {book: {"total_line": total_line, "over_price": over, "under_price": 1.91}},
+    }}
+
+
+@pytest.fixture
+def movement(monkeypatch):
+    monkeypatch.setattr(odds_movement, "odds_movement", {})
+    monkeypatch.setattr(odds_movement, "_latest", {})
+    monkeypatch.setattr(odds_movement, "RETENTION_DAYS", 100_000)
+    return odds_movement
+
+
+class TestOddsMovement:
+    def test_deltas_only_store_changes(self, movement):
+        assert movement.record(_quoted_game(), T0) == 2              # dk + best
+        assert movement.record(_quoted_game(), T0 + datetime.timedelta(hours=1)) == 0
+        movement.record(_quoted_game(total_line=48.5), T0 + datetime.timedelta(hours=2))
+        dk = movement.odds_movement["e1"]["books"]["dk"]
+        assert dk["base"]["total_line"] == 47.5
+        assert dk["deltas"] == [[7200, {"total_line": 48.5}]]
+
+    def test_series_replays_points(self, movement):
+        movement.record(_quoted_game(), T0)
+        movement.record(_quoted_game(total_line=48.5, over=1.87), T0 + datetime.timedelta(minutes=30))
+        points = movement.series("e1", "dk")["dk"]
+        assert [p["total_line"] for p in points] == [47.5, 48.5]
+        assert points[1] == {"ts": "2025-10-12T12:30:00Z", "total_line": 48.5,
+                             "over_price": 1.87, "under_price": 1.91}
+        assert movement.series("nope") is None
+
+    def test_open_current_closing(self, movement):
+        movement.record(_quoted_game(), T0)
+        movement.record(_quoted_game(total_line=49.0), T0 + datetime.timedelta(hours=4))   # before 17:00 kickoff
+        movement.record(_quoted_game(total_line=52.0), T0 + datetime.timedelta(hours=6))   # live line
+        dk = movement.lines("e1")["books"]["dk"]
+        assert dk["open"]["total_line"] == 47.5
+        assert dk["current"]["total_line"] == 52.0
+        assert dk["closing"]["total_line"] == 49.0
+        assert dk["change"]["total_line"] == pytest.approx(4.5)
+        assert movement.lines("e1")["books"]["best"]["open"]["home_spread"] == -2.5
+
+    def test_export_load_roundtrip(self, movement):
+        movement.record(_quoted_game(), T0)
+        movement.record(_quoted_game(total_line=48.0), T0 + datetime.timedelta(hours=1))
+        import json
+        data = json.loads(json.dumps(movement.export()))
+        movement.load(data)
+        assert movement.lines("e1")["books"]["dk"]["current"]["total_line"] == 48.0
+        movement.record(_quoted_game(total_line=48.0), T0 + datetime.timedelta(hours=2))
+        assert len(movement.odds_movement["e1"]["books"]["dk"]["deltas"]) == 1
+
+    def test_old_events_pruned(self, movement, monkeypatch):
+        monkeypatch.setattr(movement, "RETENTION_DAYS", 1)
+        movement.record(_quoted_game(kickoff="2025-09-01T17:00:00Z"), T0)
+        assert movement.odds_movement == {}
+
+    def test_endpoints(self, client, movement):
+        movement.record(_quoted_game(), T0)
+        assert client.get("/odds/movement/e1?book=dk").get_json()["books"].keys() == {"dk"}
+        assert client.get("/odds/movement/e1/lines").get_json()["books"]["dk"]["points"] == 1
+        assert client.get("/odds/movement/zzz").status_code == 404
+        assert client.get("/odds/movement/zzz/lines").status_code == 404
+
+    def test_fetch_game_odds_keeps_book_quotes(self, monkeypatch):
+        event = {"id": "e1", "home_team": "Minnesota Vikings", "away_team": "Green Bay Packers",
+                 "commence_time": "2025-10-12T17:00:00Z", "bookmakers": [
+                     {"key": "dk", "markets": [{"key": "totals", "outcomes": [
+                         {"name": "Over", "point": 47.5, "price": 1.91},
+                         {"name": "Under", "point": 47.5, "price": 1.89}]}]},
+                     {"key": "fd", "markets": [{"key": "h2h", "outcomes": [
+                         {"name": "Minnesota Vikings", "price": 1.8},
+                         {"name": "Green Bay Packers", "price": 2.05}]}]},
+                 ]}
+
+        class _BulkSession:
+            def get(self, url, params=None, timeout=None):
+                return _Resp([event])
+
+        _use_session(monkeypatch, _BulkSession())
+        game = oa.fetch_game_odds("key")["e1"]
+        assert game["books"]["dk"] == {"total_line": 47.5, "over_price": 1.91, "under_price": 1.89}
+        assert game["books"]["fd"] == {"home_price": 1.8, "away_price": 2.05}
+        assert game["total"]["line"] == 47.5 and game["h2h"]["home_book"] == "fd"
+
+
+# ── Prop indexes + /odds/props, /odds/value ───────────────────────────────────
+
+def _prop_player(sid, position, markets):
+    return {"sleeper_id": sid, "name": f"P{sid}", "position": position, "team": "MIN",
+            "event_id": "e1", "home_abbr": "MIN", "away_abbr": "GB", "commence_time": "2025-10-12T17:00:00Z",
+            "props": {mkey: {"line": 50.0, "value_flag": flag, "value_pct": pct}
+                      for mkey, (flag, pct) in markets.items()}}
+
+
+@pytest.fixture
+def seeded_props(monkeypatch):
+    monkeypatch.setattr(oa, "odds_props", [
+        _prop_player("1", "WR", {"player_reception_yds": ("over", 0.15)}),
+        _prop_player("2", "RB", {"player_rush_yds": ("under", -0.40),
+                                 "player_reception_yds": (None, None)}),
+        _prop_player("3", "WR", {"player_reception_yds": (None, None)}),
+    ])
+    oa.rebuild_indexes()
+    yield
+    oa.odds_props.clear()
+    oa.rebuild_indexes()
+
+
+class TestPropIndexes:
+    def test_indexes(self, seeded_props):
+        assert oa.odds_props_by_id["2"]["position"] == "RB"
+        assert [p["sleeper_id"] for p in oa.odds_props_by_market["player_reception_yds"]] == ["1", "2", "3"]
+        assert [(v["sleeper_id"], v["market"]) for v in oa.odds_value_props] == [
+            ("2", "player_rush_yds"), ("1", "player_reception_yds"),
+        ]
+        assert oa.odds_status_counts["value_flag_count"] == 2
+
+    def test_version_bumps(self, seeded_props):
+        before = oa.odds_version
+        oa.rebuild_indexes()
+        assert oa.odds_version == before + 1
+
+    def test_player_props_lookup(self, client, seeded_props):
+        assert client.get("/odds/props/3").get_json()["name"] == "P3"
+        assert client.get("/odds/props/404").status_code == 404
+
+    def test_props_filters(self, client, seeded_props):
+        data = client.get("/odds/props?market=player_rush_yds").get_json()
+        assert [p["sleeper_id"] for p in data] == ["2"] and list(data[0]["props"]) == ["player_rush_yds"]
+        data = client.get("/odds/props?market=player_reception_yds&value_only=true&position=wr").get_json()
+        assert [p["sleeper_id"] for p in data] == ["1"]
+
+    def test_value_sorted_and_filtered(self, client, seeded_props):
+        assert [v["sleeper_id"] for v in client.get("/odds/value").get_json()] == ["2", "1"]
+        assert [v["sleeper_id"] for v in client.get("/odds/value?position=WR").get_json()] == ["1"]
+
+    def test_status_counts(self, client, seeded_props):
+        data = client.get("/odds/status").get_json()
+        assert data["player_prop_count"] == 3 and data["value_flag_count"] == 2
+
+
+# ── /odds/results ─────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def seeded_results(monkeypatch):
+    monkeypatch.setattr(oa, "odds_history", {
+        "e1": {"home_abbr": "LAR", "away_abbr": "SF", "commence_time": "2025-10-12T20:25:00Z",
+               "total": {"line": 45.5}, "ou_eval": {"signal": "over"}},
+        "e2": {"home_abbr": "MIN", "away_abbr": "GB", "commence_time": "2025-10-19T17:00:00Z",
+               "total": {"line": 47.5}, "ou_eval": {"signal": "over"}},
+    })
+    monkeypatch.setattr(ns, "nflverse_game_index", {
+        ("LA", "SF", "2025-10-12"): {"home_score": 27, "away_score": 24},
+    })
+    oa.rebuild_indexes()
+
+
+class TestGameResults:
+    def test_join_via_index(self, client, seeded_results):
+        data = client.get("/odds/results").get_json()
+        assert [r["home_abbr"] for r in data] == ["MIN", "LAR"]
+        assert data[0]["result"] is None
+        assert data[1]["result"] == {"home_score": 27, "away_score": 24, "ml_winner": "home",
+                                     "actual_total": 51, "ou_result": "over", "edge_correct": True}
+
+    def test_cached_until_version_changes(self, client, seeded_results):
+        first = client.get("/odds/results").get_json()
+        oa.odds_history["e2"]["total"]["line"] = 40.0
+        assert client.get("/odds/results").get_json() == first
+        ns.nflverse_game_index[("MIN", "GB", "2025-10-19")] = {"home_score": 10, "away_score": 20}
+        ns.nflverse_version += 1
+        data = client.get("/odds/results").get_json()
+        assert data[0]["result"]["ml_winner"] == "away" and data[0]["result"]["ou_result"] == "under"
+
+    def test_snapshot_bumps_odds_version(self, monkeypatch):
+        monkeypatch.setattr(oa, "odds_games", {"e9": _game("e9")})
+        monkeypatch.setattr(oa, "odds_history", {})
+        before = oa.odds_version
+        assert oa.snapshot_current_games({}) == 1
+        assert oa.odds_version == before + 1
+        assert oa.snapshot_current_games({}) == 0
+        assert oa.odds_version == before + 1
+
+
+# ── /odds/games view ──────────────────────────────────────────────────────────
+
+@pytest.fixture
+def seeded_games(monkeypatch):
+    monkeypatch.setattr(oa, "odds_games", {
+        "e2": dict(_game("e2", hours=48), total={"line": 40.0}),
+        "e1": dict(_game("e1", hours=24), total={"line": 40.0}),
+    })
+    ns.nflverse_team_stats.update({
+        "MIN": {"points_per_game": 24.0, "points_allowed_per_game": 20.0},
+        "GB":  {"points_per_game": 22.0, "points_allowed_per_game": 22.0},
+    })
+    oa.rebuild_indexes()
+    yield
+    ns.nflverse_team_stats.clear()
+
+
+class TestGamesView:
+    def test_ou_eval_attached_in_kickoff_order(self, client, seeded_games):
+        data = client.get("/odds/games").get_json()
+        assert [g["event_id"] for g in data] == ["e1", "e2"]
+        ev = data[0]["ou_eval"]
+        assert ev["implied_home"] == 23.0 and ev["implied_away"] == 21.0
+        assert ev["implied"] == 44.0 and ev["signal"] == "over"
+
+    def test_computed_once_per_version(self, client, seeded_games, monkeypatch):
+        calls = []
+        real = routes_odds._ou_eval
+        monkeypatch.setattr(routes_odds, "_ou_eval", lambda *a: calls.append(a) or real(*a))
+        client.get("/odds/games")
+        routes_odds.games_view()
+        client.get("/odds/games")
+        assert len(calls) == 2
+        oa.rebuild_indexes()
+        client.get("/odds/games")
+        assert len(calls) == 4
+
+    def test_etag_follows_data_version(self, client, seeded_games):
+        etag = client.get("/odds/games").headers["ETag"]
+        assert client.get("/odds/games", headers={"If-None-Match": etag}).status_code == 304
+        ns.nflverse_version += 1
+        assert client.get("/odds/games", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_snapshot_uses_precomputed_eval(self, seeded_games, monkeypatch):
+        monkeypatch.setattr(oa, "odds_history", {})
+        oa.snapshot_current_games({g["event_id"]: g["ou_eval"] for g in routes_odds.games_view()})
+        assert oa.odds_history["e1"]["ou_eval"]["implied"] == 44.0
+
+
+# ── odds_pricing ──────────────────────────────────────────────────────────────
+
+class TestPricing:
+    def test_no_vig_fair_hold_and_edge(self):
+        priced = odds_pricing.price_two_way(np.array([[1.9, 2.0]]), np.array([[1.9, 1.8]]))
+        # book 1 is a fair 50/50; book 2 splits 0.5 / 0.5556 → 0.4737 / 0.5263
+        assert priced["books"][0] == 2
+        assert priced["fair_a"][0] == pytest.approx((0.5 + 0.5 / (0.5 + 1 / 1.8)) / 2)
+        assert priced["hold"][0] == pytest.approx(((2 / 1.9 - 1) + (0.5 + 1 / 1.8 - 1)) / 2)
+        assert priced["edge_a"][0] == pytest.approx(2.0 * priced["fair_a"][0] - 1)
+        assert priced["edge_b"][0] == pytest.approx(1.9 * priced["fair_b"][0] - 1)
+
+    def test_one_sided_rows_unpriced(self):
+        priced = odds_pricing.price_two_way(np.array([[1.9, np.nan]]), np.array([[np.nan, 1.9]]))
+        assert priced["books"][0] == 0 and np.isnan(priced["fair_a"][0])
+        assert odds_pricing._block(priced, 0, "over", "under") is None
+
+    def test_games_priced_on_consensus_line(self):
+        games = {"e1": {"books": {
+            "dk": {"total_line": 47.5, "over_price": 1.91, "under_price": 1.91},
+            "fd": {"total_line": 47.5, "over_price": 1.91, "under_price": 1.91},
+            "cz": {"total_line": 47.5, "over_price": 2.10, "under_price": 1.95},
+            "mg": {"total_line": 49.5, "over_price": 2.50, "under_price": 1.50},
+            "xx": {"home_price": 1.5, "away_price": 2.8},
+        }}}
+        odds_pricing.price_games(games)
+        total = games["e1"]["pricing"]["total"]
+        assert total["line"] == 47.5 and total["books"] == 3
+        assert total["value"] == "over"          # cz's 2.10 against a ~0.494 fair over
+        assert games["e1"]["pricing"]["h2h"]["books"] == 1
+        assert games["e1"]["pricing"]["spread"] is None
+
+    def test_props_carry_books_and_pricing(self, monkeypatch):
+        event = _props_event(over=1.95, book="dk")
+        event["bookmakers"] += _props_event(over=1.85, book="fd")["bookmakers"]
+        _use_session(monkeypatch, _Session({"e1": _Resp(event)}))
+        props, _ = oa.fetch_player_props("key", oa._build_name_lookup(), {"e1": _game("e1")})
+        market = props[0]["props"]["player_reception_yds"]
+        assert set(market["books"]) == {"dk", "fd"}
+        assert market["pricing"]["books"] == 2 and market["pricing"]["line"] == 80.5
+        assert market["pricing"]["fair"]["over"] + market["pricing"]["fair"]["under"] == pytest.approx(1)
+
+
+# ── odds_hitrate ──────────────────────────────────────────────────────────────
+
+class TestHitRate:
+    def test_rates_probability_and_ev(self):
+        values = np.array([[90.0, 70.0, 100.0, 80.5], [np.nan, np.nan, 10.0, 30.0]])
+        r = odds_hitrate.hit_rates(values, np.array([80.5, 20.5]), np.array([2.0, 1.9]), np.array([1.8, 1.9]))
+        assert list(r["games"]) == [4, 2]
+        assert r["over"][0] == pytest.approx(0.5) and r["under"][0] == pytest.approx(0.25)   # one push
+        assert r["p_over"][0] == pytest.approx(3 / 5)
+        assert r["ev_over"][0] == pytest.approx(3 / 5 * 2.0 - 1)
+        assert r["over"][1] == pytest.approx(0.5)
+
+    def test_props_carry_hit_rate(self, client, monkeypatch):
+        ns.nflverse_player_stats["999"]["weekly"] = [
+            {"week": w, "receiving_yards": y} for w, y in enumerate([50, 120, 95, 60, 110], start=1)
+        ]
+        _use_session(monkeypatch, _Session({"e1": _Resp(_props_event(line=80.5, over=1.9))}))
+        props, _ = oa.fetch_player_props("key", oa._build_name_lookup(), {"e1": _game("e1")})
+        hr = props[0]["props"]["player_reception_yds"]["hit_rate"]
+        assert hr["games"] == 5 and hr["over"] == 0.6 and hr["under"] == 0.4
+        assert hr["ev"]["over"] == pytest.approx(round(4 / 7 * 1.9 - 1, 3))
+
+        monkeypatch.setattr(oa, "odds_props", props)
+        oa.rebuild_indexes()
+        assert client.get("/odds/value").get_json()[0]["hit_rate"] == hr
+        oa.odds_props.clear()
+        oa.rebuild_indexes()
+
+    def test_no_weekly_history(self, monkeypatch):
+        _use_session(monkeypatch, _Session({"e1": _Resp(_props_event())}))
+        props, _ = oa.fetch_player_props("key", oa._build_name_lookup(), {"e1": _game("e1")})
+        assert props[0]["props"]["player_reception_yds"]["hit_rate"] is None
+
+
+# ── odds_backtest ─────────────────────────────────────────────────────────────
+
+def _week_games(week, results):
+    day = (datetime.date(2025, 9, 7) + datetime.timedelta(weeks=week - 1)).isoformat()
+    return [{"home_team": h, "away_team": a, "gameday": day, "home_score": hs, "away_score": as_}
+            for h, a, hs, as_ in results]
+
+
+BACKTEST_GAMES = {
+    1: _week_games(1, [("MIN", "GB", 24, 20), ("CHI", "DET", 17, 31)]),
+    2: _week_games(2, [("GB", "CHI", 27, 10), ("DET", "MIN", 28, 24)]),
+    3: _week_games(3, [("MIN", "CHI", 30, 13), ("GB", "DET", 21, 24)]),
+}
+
+
+def _stored(home, away, week, line, over=1.91, under=1.91):
+    day = (datetime.date(2025, 9, 7) + datetime.timedelta(weeks=week - 1)).isoformat()
+    return {"home_abbr": home, "away_abbr": away, "commence_time": f"{day}T17:00:00Z",
+            "total": {"line": line, "over_price": over, "under_price": under}}
+
+
+class TestBacktest:
+    def test_weight_grid(self):
+        grid = odds_backtest.weight_grid(0.05)
+        assert len(grid) == 231
+        assert np.allclose(grid.sum(axis=1), 1) and (grid >= 0).all()
+
+    def test_features_are_point_in_time(self):
+        history = {"w1": _stored("MIN", "GB", 1, 44.5), "w3": _stored("MIN", "CHI", 3, 45.5)}
+        f = odds_backtest.build_features(history, BACKTEST_GAMES)
+        # week 1 has no prior games → dropped; week 3 uses weeks 1–2 only
+        assert f["event_ids"] == ["w3"]
+        min_pf, min_pa = (24 + 24) / 2, (20 + 28) / 2
+        chi_pf, chi_pa = (17 + 10) / 2, (31 + 27) / 2
+        expected = (min_pf + chi_pa) / 2 + (chi_pf + min_pa) / 2
+        assert f["components"][:, 0] == pytest.approx([expected] * 3)
+        assert f["actual"][0] == 43 and f["line"][0] == 45.5
+
+    def test_form_stays_within_the_season(self):
+        # The CLI loads several seasons keyed (season, week); last season's games
+        # must not feed this season's averages
+        prior = [dict(g, gameday=g["gameday"].replace("2025", "2024"))
+                 for g in _week_games(17, [("MIN", "GB", 50, 50), ("CHI", "DET", 50, 50)])]
+        games = {(2024, 17): prior, **{(2025, week): g for week, g in BACKTEST_GAMES.items()}}
+        history = {"w1": _stored("MIN", "GB", 1, 44.5), "w3": _stored("MIN", "CHI", 3, 45.5)}
+        f = odds_backtest.build_features(history, games)
+        assert f["event_ids"] == ["w3"]
+        expected = odds_backtest.build_features(history, BACKTEST_GAMES)["components"]
+        assert f["components"] == pytest.approx(expected)
+
+    def test_grid_search_scores_bets(self):
+        features = {
+            "components": np.array([[50.0, 40.0], [40.0, 50.0], [45.0, 45.0]]),
+            "line":        np.array([45.0, 45.0]),
+            "actual":      np.array([48.0, 48.0]),
+            "over_price":  np.array([2.0, 2.0]),
+            "under_price": np.array([1.8, np.nan]),
+        }
+        weights = np.array([[1.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+        r = odds_backtest.grid_search(features, weights, np.array([0.05, 0.2]))
+        # season-only: game 1 over (win at 2.0), game 2 under (loss)
+        assert r["bets"][0, 0] == 2 and r["wins"][0, 0] == 1
+        assert r["roi"][0, 0] == pytest.approx(0.0)
+        assert r["bets"][0, 1] == 0 and np.isnan(r["roi"][0, 1])
+        # rolling-3 only sits on the line: no bets, but still scored for fit
+        assert r["bets"][1, 0] == 0
+        assert r["mae"][1] == pytest.approx(3.0) and r["bias"][1] == pytest.approx(-3.0)
+
+    def test_endpoint_reports_current_and_best(self, client, monkeypatch):
+        monkeypatch.setattr(oa, "odds_history", {
+            "a": _stored("MIN", "CHI", 3, 40.5), "b": _stored("GB", "DET", 3, 50.5),
+        })
+        monkeypatch.setattr(ns, "nflverse_games", BACKTEST_GAMES)
+        oa.rebuild_indexes()
+        data = client.get("/odds/backtest?min_bets=1&top=5").get_json()
+        assert data["games"] == 2 and data["configurations"] > 5000
+        assert data["current"]["weights"] == {"season": 0.4, "rolling5": 0.35, "rolling3": 0.25}
+        assert data["current"]["threshold"] == 0.05
+        assert 0 < len(data["best"]) <= 5
+        rois = [c["roi"] for c in data["best"]]
+        assert rois == sorted(rois, reverse=True)
+        assert client.get("/odds/backtest?step=x").status_code == 400
+
+    def test_endpoint_rejects_fine_grids(self, client):
+        resp = client.get("/odds/backtest?step=0.01")
+        assert resp.status_code == 400
+        assert resp.get_json()["steps"] == list(odds_backtest.SERVED_WEIGHT_STEPS)
+
+    def test_cli_keeps_fine_grids(self):
+        report = odds_backtest.run_backtest({}, BACKTEST_GAMES, step=0.02, min_bets=1)
+        assert report["configurations"] == len(odds_backtest.weight_grid(0.02)) * len(odds_backtest.DEFAULT_THRESHOLDS)
@@ -0,0 +1,140 @@
+"""
+tests/test_snapshot_store.py — Tests for the shared snapshot store and the
+loader → web snapshot roundtrip in nfl-helper.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+import snapshot_store
+from conftest import nfl_helper
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_store, "SNAPSHOT_DIR", tmp_path / "snapshots")
+    return tmp_path / "snapshots"
+
+
+class TestSnapshotStore:
+    def test_publish_and_load(self, store_dir):
+        version = snapshot_store.publish("core", {"a": [1, 2, 3]})
+        assert snapshot_store.latest_version("core") == version
+        assert snapshot_store.load("core") == (version, {"a": [1, 2, 3]})
+
+    def test_missing_snapshot(self, store_dir):
+        assert snapshot_store.latest_version("core") is None
+        assert snapshot_store.load("core") is None
+
+    def test_newer_than(self, store_dir):
+        v1 = snapshot_store.publish("core", 1)
+        assert snapshot_store.load("core", newer_than=v1) is None
+        v2 = snapshot_store.publish("core", 2)
+        assert v2 > v1
+        assert snapshot_store.load("core", newer_than=v1) == (v2, 2)
+
+    def test_prunes_old_versions(self, store_dir):
+        for i in range(snapshot_store.KEEP_VERSIONS + 2):
+            snapshot_store.publish("core", i)
+        assert len(list(store_dir.glob("core-*.pkl"))) == snapshot_store.KEEP_VERSIONS
+        assert snapshot_store.load("core")[1] == snapshot_store.KEEP_VERSIONS + 1
+
+
+class TestSnapshotRoundtrip:
+    @pytest.fixture(autouse=True)
+    def fresh_versions(self, store_dir, monkeypatch):
+        monkeypatch.setattr(nfl_helper, "_published_versions", {})
+        monkeypatch.setattr(nfl_helper, "_loaded_versions", {})
+        self.refresh_history = MagicMock()
+        monkeypatch.setattr(nfl_helper, "refresh_nflverse_history", self.refresh_history)
+        monkeypatch.setattr(nfl_helper, "_history_season", 0)
+
+    def test_core_roundtrip(self):
+        nfl_helper.filtered_players["123"] = {"name": "Test Player"}
+        nfl_helper.picks_data["data"] = [1, 2]
+        nfl_helper.http_cache.bump("players")
+        nfl_helper.publish_snapshots()
+        published = dict(nfl_helper.http_cache.dataset_versions)
+
+        # A web worker: nothing loaded yet, stale local data
+        nfl_helper._loaded_versions.clear()
+        nfl_helper.filtered_players.clear()
+        nfl_helper.picks_data.clear()
+        nfl_helper.http_cache.bump_all()
+        nfl_helper.load_snapshots()
+
+        assert nfl_helper.filtered_players == {"123": {"name": "Test Player"}}
+        assert nfl_helper.picks_data == {"data": [1, 2]}
+        assert nfl_helper.http_cache.dataset_versions == published
+        assert set(nfl_helper._loaded_versions) == {"core", "nflverse", "odds"}
+
+    def test_publishes_only_changed_groups(self):
+        nfl_helper.publish_snapshots()
+        versions = {g: snapshot_store.latest_version(g) for g in ("core", "nflverse", "odds")}
+        nfl_helper.publish_snapshots()
+        assert {g: snapshot_store.latest_version(g) for g in versions} == versions
+
+        nfl_helper.http_cache.bump("picks")
+        nfl_helper.publish_snapshots()
+        assert snapshot_store.latest_version("core") > versions["core"]
+        assert snapshot_store.latest_version("odds") == versions["odds"]
+
+    def test_load_skips_current_snapshots(self):
+        nfl_helper.publish_snapshots()
+        nfl_helper.load_snapshots()
+        nfl_helper.filtered_players["999"] = {"name": "Local"}
+        nfl_helper.load_snapshots()
+        assert "999" in nfl_helper.filtered_players
+
+    def test_groups_take_the_snapshot_version(self):
+        nfl_helper.publish_snapshots()
+        nfl_helper._loaded_versions.clear()
+        nfl_helper.load_snapshots()
+        assert nfl_helper.nflverse_stats.nflverse_version == nfl_helper._loaded_versions["nflverse"]
+        assert nfl_helper.odds_api.odds_version == nfl_helper._loaded_versions["odds"]
+
+    def test_followers_keep_their_own_history(self):
+        nfl_helper.publish_snapshots()
+        nfl_helper._loaded_versions.clear()
+        nfl_helper.load_snapshots()
+        self.refresh_history.assert_called_once_with(nfl_helper.nflverse_stats.nflverse_current_season)
+
+    def test_history_only_refreshed_when_the_season_rolls_over(self, monkeypatch):
+        nfl_helper.publish_snapshots()
+        nfl_helper._loaded_versions.clear()
+        nfl_helper.load_snapshots()
+        nfl_helper.nflverse_stats.nflverse_version += 1      # a new nflverse build, same season
+        nfl_helper.publish_snapshots()
+        nfl_helper._loaded_versions.clear()
+        nfl_helper.load_snapshots()
+        assert self.refresh_history.call_count == 1
+
+        monkeypatch.setattr(nfl_helper.nflverse_stats, "nflverse_current_season", 2030)
+        nfl_helper.nflverse_stats.nflverse_version += 1
+        nfl_helper.publish_snapshots()
+        nfl_helper._loaded_versions.clear()
+        nfl_helper.load_snapshots()
+        assert self.refresh_history.call_count == 2
+        self.refresh_history.assert_called_with(2030)
+
+    def test_apply_swaps_dicts_instead_of_refilling(self):
+        nfl_helper.filtered_players["123"] = {"name": "Test Player"}
+        nfl_helper.publish_snapshots()
+        nfl_helper._loaded_versions.clear()
+        before = nfl_helper.filtered_players
+        nfl_helper.load_snapshots()
+        assert nfl_helper.filtered_players is not before
+        assert before == {"123": {"name": "Test Player"}}   # readers holding it saw no gap
+
+    def test_restarted_loader_versions_do_not_hit_old_bodies(self, monkeypatch):
+        http_cache = nfl_helper.http_cache
+        monkeypatch.setattr(http_cache, "_BOOT", http_cache._BOOT)
+        with nfl_helper.app.test_request_context():
+            http_cache.adopt({"picks": 1}, "boot-a")
+            old = http_cache.json_response(("picks", 1), lambda: {"from": "a"})
+            http_cache.adopt({"picks": 1}, "boot-b")
+            new = http_cache.json_response(("picks", 1), lambda: {"from": "b"})
+        assert old.get_json() == {"from": "a"}
+        assert new.get_json() == {"from": "b"}
+        assert http_cache.stamp("picks") == ("boot-b", 1)
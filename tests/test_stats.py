@@ -4,11 +4,14 @@ tests/test_stats.py — Tests for nflverse stats pipeline and /stats/* endpoints
 Uses in-memory fake data — no network calls are made.
 """
 
+import datetime
 import sys
 import pytest
-import pandas as pd
+import polars as pl
 
 import nflreadpy as nfl
+import nflverse_cache
+import nflverse_history
 import nflverse_stats as ns
 
 nfl_helper = sys.modules["nfl_helper"]
@@ -16,7 +19,7 @@ nfl_helper = sys.modules["nfl_helper"]
 
 # ── DataFrame helpers ─────────────────────────────────────────────────────────
 
-def _make_stats_df(rows: list[dict]) -> pd.DataFrame:
+def _make_stats_df(rows: list[dict]) -> pl.DataFrame:
     defaults = {
         "season_type": "REG", "season": 2025, "week": 1,
         "player_id": "00-0001234", "player_display_name": "Test Player",
@@ -33,10 +36,10 @@ def _make_stats_df(rows: list[dict]) -> pd.DataFrame:
         "passing_epa": 0.0, "rushing_epa": 0.0,
         "fantasy_points": 18.0, "fantasy_points_ppr": 23.0,
     }
-    return pd.DataFrame([{**defaults, **r} for r in rows])
+    return pl.DataFrame([{**defaults, **r} for r in rows])
 
 
-def _make_team_stats_df(rows: list[dict]) -> pd.DataFrame:
+def _make_team_stats_df(rows: list[dict]) -> pl.DataFrame:
     defaults = {
         "season_type": "REG", "season": 2025, "week": 1,
         "team": "MIN", "opponent_team": "GB",
@@ -46,10 +49,10 @@ def _make_team_stats_df(rows: list[dict]) -> pd.DataFrame:
         "passing_epa": 2.0, "rushing_epa": 0.5,
         "def_sacks": 2.0, "def_interceptions": 1.0, "def_pass_defended": 3.0,
     }
-    return pd.DataFrame([{**defaults, **r} for r in rows])
+    return pl.DataFrame([{**defaults, **r} for r in rows])
 
 
-def _make_games_df(rows: list[dict]) -> pd.DataFrame:
+def _make_games_df(rows: list[dict]) -> pl.DataFrame:
     defaults = {
         "game_type": "REG", "season": 2025, "week": 1,
         "home_team": "MIN", "away_team": "GB",
@@ -61,10 +64,10 @@ def _make_games_df(rows: list[dict]) -> pd.DataFrame:
         "home_moneyline": None, "away_moneyline": None,
         "home_qb_name": "", "away_qb_name": "",
     }
-    return pd.DataFrame([{**defaults, **r} for r in rows])
+    return pl.DataFrame([{**defaults, **r} for r in rows])
 
 
-def _make_snap_df(rows: list[dict]) -> pd.DataFrame:
+def _make_snap_df(rows: list[dict]) -> pl.DataFrame:
     defaults = {
         "game_type": "REG", "season": 2025, "week": 1,
         "pfr_player_id": "JeffJu00", "player": "Justin Jefferson",
@@ -74,11 +77,11 @@ def _make_snap_df(rows: list[dict]) -> pd.DataFrame:
         "st_pct": 0.0, "st_snaps": 0,
     }
     if not rows:
-        return pd.DataFrame(columns=list(defaults.keys()))
-    return pd.DataFrame([{**defaults, **r} for r in rows])
+        return pl.DataFrame(schema=list(defaults.keys()))
+    return pl.DataFrame([{**defaults, **r} for r in rows])
 
 
-def _make_opp_df(rows: list[dict]) -> pd.DataFrame:
+def _make_opp_df(rows: list[dict]) -> pl.DataFrame:
     defaults = {
         "season": 2025, "week": 1.0,
         "player_id": "00-0001234", "full_name": "Test Player", "position": "WR",
@@ -87,21 +90,35 @@ def _make_opp_df(rows: list[dict]) -> pd.DataFrame:
         "total_fantasy_points_diff": 2.5,
     }
     if not rows:
-        return pd.DataFrame(columns=list(defaults.keys()))
-    return pd.DataFrame([{**defaults, **r} for r in rows])
+        return pl.DataFrame(schema=list(defaults.keys()))
+    return pl.DataFrame([{**defaults, **r} for r in rows])
+
+
+@pytest.fixture(autouse=True)
+def isolated_nflverse_cache(tmp_path, monkeypatch):
+    """Point the Parquet cache at a temp dir and never check upstream."""
+    monkeypatch.setattr(nflverse_cache, "CACHE_DIR", tmp_path / "nflverse")
+    monkeypatch.setattr(nflverse_cache, "_upstream_stamp", lambda url: None)
+    monkeypatch.setattr(nflverse_history, "HISTORY_DIR", tmp_path / "nflverse_history")
+    nflverse_history._season_teams.cache_clear()
 
 
 @pytest.fixture(autouse=True)
 def clear_nflverse():
     for d in (ns.nflverse_player_stats, ns.nflverse_player_advanced,
-              ns.nflverse_team_stats, ns.nflverse_schedule, ns.nflverse_games):
+              ns.nflverse_team_stats, ns.nflverse_schedule, ns.nflverse_games,
+              ns.nflverse_game_index):
         d.clear()
     ns.nflverse_current_season = None
     ns.nflverse_last_updated = None
+    ns._refresh_state.clear()
+    ns.rebuild_views()
     yield
     for d in (ns.nflverse_player_stats, ns.nflverse_player_advanced,
-              ns.nflverse_team_stats, ns.nflverse_schedule, ns.nflverse_games):
+              ns.nflverse_team_stats, ns.nflverse_schedule, ns.nflverse_games,
+              ns.nflverse_game_index):
         d.clear()
+    ns.rebuild_views()
 
 
 # ── _current_nfl_season ───────────────────────────────────────────────────────
@@ -110,19 +127,19 @@ class TestCurrentNflSeason:
     def test_before_september_returns_prior_year(self):
         import unittest.mock as mock
         with mock.patch("nflverse_stats.datetime") as dt:
-            dt.datetime.utcnow.return_value = mock.Mock(month=5, year=2026)
+            dt.datetime.now.return_value = mock.Mock(month=5, year=2026)
             assert ns._current_nfl_season() == 2025
 
     def test_september_returns_current_year(self):
         import unittest.mock as mock
         with mock.patch("nflverse_stats.datetime") as dt:
-            dt.datetime.utcnow.return_value = mock.Mock(month=9, year=2026)
+            dt.datetime.now.return_value = mock.Mock(month=9, year=2026)
             assert ns._current_nfl_season() == 2026
 
     def test_january_returns_prior_year(self):
         import unittest.mock as mock
         with mock.patch("nflverse_stats.datetime") as dt:
-            dt.datetime.utcnow.return_value = mock.Mock(month=1, year=2027)
+            dt.datetime.now.return_value = mock.Mock(month=1, year=2027)
             assert ns._current_nfl_season() == 2026
 
 
@@ -130,27 +147,23 @@ class TestCurrentNflSeason:
 
 class TestBuildIdMaps:
     def test_builds_gsis_and_pfr_maps(self):
-        df = pd.DataFrame([{
+        df = pl.DataFrame([{
             "gsis_id": "00-0001234", "pfr_id": "JeffJu00",
             "sleeper_id": "999", "week": 1,
         }])
-        from unittest.mock import patch, MagicMock
-        mock_result = MagicMock()
-        mock_result.to_pandas.return_value = df
-        with patch.object(nfl, "load_rosters", return_value=mock_result):
+        from unittest.mock import patch
+        with patch.object(nfl, "load_rosters", return_value=df):
             gsis_map, pfr_map = ns.build_id_maps(2025)
         assert gsis_map["00-0001234"] == "999"
         assert pfr_map["JeffJu00"] == "999"
 
     def test_skips_missing_sleeper_id(self):
-        df = pd.DataFrame([{
+        df = pl.DataFrame([{
             "gsis_id": "00-0001234", "pfr_id": "JeffJu00",
             "sleeper_id": None, "week": 1,
         }])
-        from unittest.mock import patch, MagicMock
-        mock_result = MagicMock()
-        mock_result.to_pandas.return_value = df
-        with patch.object(nfl, "load_rosters", return_value=mock_result):
+        from unittest.mock import patch
+        with patch.object(nfl, "load_rosters", return_value=df):
             gsis_map, pfr_map = ns.build_id_maps(2025)
         assert gsis_map == {}
         assert pfr_map == {}
@@ -312,44 +325,350 @@ class TestBuildTeamStatsDict:
         assert result == {}
 
 
+    def test_accepts_lazy_frames(self):
+        df = _make_team_stats_df([{"team": "MIN", "opponent_team": "GB", "week": 1, "attempts": 35.0}])
+        result = ns.build_team_stats_dict(df.lazy())
+        assert result["MIN"]["pass_attempts_per_game"] == pytest.approx(35.0)
+
+    def test_fpts_allowed_and_points_from_player_and_schedule(self):
+        team = _make_team_stats_df([
+            {"team": "MIN", "opponent_team": "GB", "week": 1},
+            {"team": "GB",  "opponent_team": "MIN", "week": 1},
+        ])
+        players = _make_stats_df([
+            {"player_id": "a", "team": "GB", "opponent_team": "MIN", "position": "WR", "fantasy_points_ppr": 12.0},
+            {"player_id": "b", "team": "GB", "opponent_team": "MIN", "position": "WR", "fantasy_points_ppr": 8.0},
+        ])
+        sched = _make_games_df([{"week": 1, "home_team": "MIN", "away_team": "GB",
+                                 "home_score": 24, "away_score": 17}])
+        result = ns.build_team_stats_dict(team, players, sched)
+        assert result["MIN"]["def_fpts_allowed_wr_per_game"] == pytest.approx(20.0)
+        assert result["MIN"]["points_per_game"] == pytest.approx(24.0)
+        assert result["GB"]["points_allowed_per_game"] == pytest.approx(24.0)
+
+
 # ── build_schedule_dicts ──────────────────────────────────────────────────────
 
 class TestBuildScheduleDicts:
     def test_games_by_week(self):
         df = _make_games_df([{"week": 5, "home_team": "MIN", "away_team": "GB"}])
-        _, games = ns.build_schedule_dicts(df)
+        _, games, _ = ns.build_schedule_dicts(df)
         assert 5 in games
         assert games[5][0]["home_team"] == "MIN"
 
     def test_home_team_schedule(self):
         df = _make_games_df([{"week": 5, "home_team": "MIN", "away_team": "GB"}])
-        sched, _ = ns.build_schedule_dicts(df)
+        sched, _, _ = ns.build_schedule_dicts(df)
         assert sched["MIN"]["is_home"] is True
         assert sched["MIN"]["opponent"] == "GB"
 
     def test_away_spread_inverted(self):
         df = _make_games_df([{"week": 5, "home_team": "MIN", "away_team": "GB", "spread_line": -3.0}])
-        sched, _ = ns.build_schedule_dicts(df)
+        sched, _, _ = ns.build_schedule_dicts(df)
         assert sched["GB"]["spread"] == pytest.approx(3.0)
 
     def test_weather_fields_present(self):
         df = _make_games_df([{"week": 1, "temp": 72.0, "wind": 8.0, "roof": "outdoors"}])
-        _, games = ns.build_schedule_dicts(df)
+        _, games, _ = ns.build_schedule_dicts(df)
         game = games[1][0]
         assert game["temp"] == pytest.approx(72.0)
         assert game["wind"] == pytest.approx(8.0)
         assert game["roof"] == "outdoors"
 
+    def test_game_index_shares_game_dicts(self):
+        df = _make_games_df([{"week": 5, "home_team": "MIN", "away_team": "GB"}])
+        _, games, index = ns.build_schedule_dicts(df)
+        game = games[5][0]
+        assert index[("MIN", "GB", game["gameday"])] is game
+
     def test_non_reg_excluded(self):
         df = _make_games_df([{"game_type": "POST", "home_team": "KC", "away_team": "BUF"}])
-        sched, games = ns.build_schedule_dicts(df)
+        sched, games, _ = ns.build_schedule_dicts(df)
         assert not games
 
     def test_empty_returns_empty(self):
-        sched, games = ns.build_schedule_dicts(_make_games_df([{"game_type": "POST"}]))
+        sched, games, _ = ns.build_schedule_dicts(_make_games_df([{"game_type": "POST"}]))
         assert games == {}
 
 
+# ── refresh_nflverse_data ─────────────────────────────────────────────────────
+
+class TestRefreshNflverseData:
+    ROSTERS = pl.DataFrame([
+        {"gsis_id": "00-0001234", "pfr_id": "JeffJu00", "sleeper_id": "999", "week": 1},
+        {"gsis_id": "00-0005678", "pfr_id": "AddiJo00", "sleeper_id": "888", "week": 1},
+    ])
+
+    def _run(self, stats, snaps=None, **kwargs):
+        from unittest.mock import patch
+        import uuid
+        # Every run sees a "new upstream file" so the loaders are always consulted
+        with patch.object(nflverse_cache, "CHECK_INTERVAL_SECONDS", 0), \
+             patch.object(nflverse_cache, "_upstream_stamp", lambda url: uuid.uuid4().hex), \
+             patch.object(nfl, "load_rosters", return_value=self.ROSTERS), \
+             patch.object(nfl, "load_player_stats", return_value=stats), \
+             patch.object(nfl, "load_snap_counts", return_value=snaps if snaps is not None else _make_snap_df([{}])), \
+             patch.object(nfl, "load_ff_opportunity", return_value=_make_opp_df([{}])), \
+             patch.object(nfl, "load_team_stats", return_value=_make_team_stats_df([{}])), \
+             patch.object(nfl, "load_schedules", return_value=_make_games_df([{}])):
+            ns.refresh_nflverse_data(**kwargs)
+
+    def test_builds_from_polars_loaders(self):
+        self._run(_make_stats_df([
+            {"player_id": "00-0001234", "week": 1},
+            {"player_id": "00-0001234", "week": 1, "season_type": "POST"},
+        ]))
+        assert ns.nflverse_player_stats["999"]["season_totals"]["games_played"] == 1
+        assert ns.nflverse_player_advanced["999"]["snap_pct_avg"] == pytest.approx(0.92)
+        assert "MIN" in ns.nflverse_team_stats
+        assert ns.nflverse_games[1][0]["home_team"] == "MIN"
+        assert ns.nflverse_current_season == 2025
+
+    def test_incremental_matches_full_rebuild(self):
+        self._run(_make_stats_df([
+            {"player_id": "00-0001234", "week": 1, "fantasy_points_ppr": 10.0},
+            {"player_id": "00-0001234", "week": 2, "fantasy_points_ppr": 20.0},
+            {"player_id": "00-0005678", "week": 1, "fantasy_points_ppr": 5.0, "team": "KC"},
+        ]))
+        week3 = _make_stats_df([
+            {"player_id": "00-0001234", "week": 1, "fantasy_points_ppr": 10.0},
+            {"player_id": "00-0001234", "week": 2, "fantasy_points_ppr": 25.0},   # stat correction
+            {"player_id": "00-0001234", "week": 3, "fantasy_points_ppr": 30.0},
+            {"player_id": "00-0005678", "week": 1, "fantasy_points_ppr": 5.0, "team": "KC"},
+        ])
+        from unittest.mock import patch
+        with patch.object(ns, "build_player_stats_dict", wraps=ns.build_player_stats_dict) as build:
+            self._run(week3)
+        # Only the changed weeks were re-read
+        weeks_read = build.call_args[0][0].select("week").unique().collect()["week"].to_list()
+        assert sorted(weeks_read) == [2, 3]
+
+        full = ns.build_player_stats_dict(week3, {"00-0001234": "999", "00-0005678": "888"})
+        assert ns.nflverse_player_stats == full
+        assert ns.nflverse_player_stats["999"]["season_totals"]["fantasy_points_ppr"] == pytest.approx(65.0)
+        assert ns.nflverse_player_stats["999"]["rolling_3"]["fantasy_points_ppr"] == pytest.approx(21.67)
+
+    def test_incremental_advanced_appends_week(self):
+        stats = _make_stats_df([{"player_id": "00-0001234", "week": 1}])
+        self._run(stats, snaps=_make_snap_df([{"week": 1, "offense_pct": 0.8}]))
+        self._run(stats, snaps=_make_snap_df([
+            {"week": 1, "offense_pct": 0.8},
+            {"week": 2, "offense_pct": 1.0},
+        ]))
+        adv = ns.nflverse_player_advanced["999"]
+        assert [w["week"] for w in adv["weekly"]] == [1, 2]
+        assert adv["snap_pct_avg"] == pytest.approx(0.9)
+
+    def test_removed_week_forces_full_rebuild(self):
+        self._run(_make_stats_df([
+            {"player_id": "00-0001234", "week": 1},
+            {"player_id": "00-0001234", "week": 2},
+        ]))
+        self._run(_make_stats_df([{"player_id": "00-0001234", "week": 1}]))
+        assert [w["week"] for w in ns.nflverse_player_stats["999"]["weekly"]] == [1]
+
+    def test_worker_mode_publishes_serialized_snapshot(self, monkeypatch):
+        import workers
+        monkeypatch.setattr(workers, "USE_WORKER_PROCESSES", True)
+        monkeypatch.setattr(workers, "run_in_worker",
+                            lambda func, *args: workers._unpack(workers._pack(func(*args))))
+        self._run(_make_stats_df([{"player_id": "00-0001234", "week": 1}]))
+        assert ns.nflverse_player_stats["999"]["season_totals"]["games_played"] == 1
+        assert ns._refresh_state["season"] == 2025
+
+    def test_worker_mode_stays_incremental(self, monkeypatch):
+        import workers
+
+        def fresh_process(func, *args):
+            # A worker has none of this process's stores or refresh state
+            args = workers._unpack(workers._pack(args))
+            with pytest.MonkeyPatch.context() as child:
+                child.setattr(ns, "nflverse_player_stats", {})
+                child.setattr(ns, "nflverse_player_advanced", {})
+                child.setattr(ns, "_refresh_state", {})
+                return workers._unpack(workers._pack(func(*args)))
+
+        monkeypatch.setattr(workers, "USE_WORKER_PROCESSES", True)
+        monkeypatch.setattr(workers, "run_in_worker", fresh_process)
+        self._run(_make_stats_df([{"player_id": "00-0001234", "week": 1}]))
+        from unittest.mock import patch
+        with patch.object(ns, "update_player_stats_weeks", wraps=ns.update_player_stats_weeks) as upd:
+            self._run(_make_stats_df([
+                {"player_id": "00-0001234", "week": 1},
+                {"player_id": "00-0001234", "week": 2},
+            ]))
+        upd.assert_called_once()
+        assert [w["week"] for w in ns.nflverse_player_stats["999"]["weekly"]] == [1, 2]
+
+    def test_full_flag_skips_incremental(self):
+        stats = _make_stats_df([{"player_id": "00-0001234", "week": 1}])
+        self._run(stats)
+        from unittest.mock import patch
+        with patch.object(ns, "update_player_stats_weeks") as upd:
+            self._run(stats, full=True)
+        upd.assert_not_called()
+        assert "999" in ns.nflverse_player_stats
+
+
+# ── nflverse_cache ────────────────────────────────────────────────────────────
+
+class TestNflverseCache:
+    def _loader(self, calls):
+        def loader():
+            calls.append(1)
+            return pl.DataFrame({"season": [2025], "week": [len(calls)]})
+        return loader
+
+    def test_first_load_downloads_and_writes_parquet(self):
+        calls = []
+        lf = nflverse_cache.cached_scan("player_stats", 2025, self._loader(calls))
+        assert calls == [1]
+        assert lf.collect()["week"].to_list() == [1]
+        assert (nflverse_cache.CACHE_DIR / "player_stats_2025.parquet").exists()
+
+    def test_recent_check_served_from_disk(self):
+        calls = []
+        nflverse_cache.cached_scan("player_stats", 2025, self._loader(calls))
+        lf = nflverse_cache.cached_scan("player_stats", 2025, self._loader(calls))
+        assert calls == [1]
+        assert lf.collect()["week"].to_list() == [1]
+
+    def test_naive_checked_at_from_older_sidecars(self):
+        calls = []
+        nflverse_cache.cached_scan("player_stats", 2025, self._loader(calls))
+        _, meta_path = nflverse_cache._paths("player_stats", 2025)
+        meta = nflverse_cache._read_meta(meta_path)
+        meta["checked_at"] = datetime.datetime.now(datetime.UTC).replace(tzinfo=None).isoformat()
+        nflverse_cache._write_meta(meta_path, meta)
+        nflverse_cache.cached_scan("player_stats", 2025, self._loader(calls))
+        assert calls == [1]
+
+    def test_download_turns_off_nflreadpy_cache_and_restores_it(self):
+        from nflreadpy.config import get_config
+        before = get_config().cache_mode
+        seen = []
+
+        def loader(seasons):
+            seen.append(get_config().cache_mode)
+            return pl.DataFrame({"season": seasons})
+
+        ns._load("player_stats", 2025, loader).collect()
+        assert seen == ["off"]
+        assert get_config().cache_mode == before
+
+    def test_changed_upstream_stamp_redownloads(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(nflverse_cache, "CHECK_INTERVAL_SECONDS", 0)
+        monkeypatch.setattr(nflverse_cache, "_upstream_stamp", lambda url: "etag-1")
+        nflverse_cache.cached_scan("player_stats", 2025, self._loader(calls))
+        nflverse_cache.cached_scan("player_stats", 2025, self._loader(calls))
+        assert calls == [1]
+        monkeypatch.setattr(nflverse_cache, "_upstream_stamp", lambda url: "etag-2")
+        lf = nflverse_cache.cached_scan("player_stats", 2025, self._loader(calls))
+        assert calls == [1, 1]
+        assert lf.collect()["week"].to_list() == [2]
+
+    def test_permanent_season_never_checks_upstream(self, monkeypatch):
+        calls = []
+        nflverse_cache.cached_scan("rosters", 2020, self._loader(calls), permanent=True)
+        monkeypatch.setattr(nflverse_cache, "CHECK_INTERVAL_SECONDS", 0)
+
+        def _boom(url):
+            raise AssertionError("upstream checked for a historic season")
+        monkeypatch.setattr(nflverse_cache, "_upstream_stamp", _boom)
+        nflverse_cache.cached_scan("rosters", 2020, self._loader(calls), permanent=True)
+        assert calls == [1]
+
+    def test_season_cached_in_progress_is_rechecked_once_over(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(nflverse_cache, "_upstream_stamp", lambda url: "etag-1")
+        nflverse_cache.cached_scan("player_stats", 2024, self._loader(calls))
+        # The season has since ended: the partial file is checked, and the final one fetched
+        monkeypatch.setattr(nflverse_cache, "CHECK_INTERVAL_SECONDS", 0)
+        monkeypatch.setattr(nflverse_cache, "_upstream_stamp", lambda url: "etag-final")
+        lf = nflverse_cache.cached_scan("player_stats", 2024, self._loader(calls), permanent=True)
+        assert calls == [1, 1]
+        assert lf.collect()["week"].to_list() == [2]
+
+        def _boom(url):
+            raise AssertionError("upstream checked for a completed season")
+        monkeypatch.setattr(nflverse_cache, "_upstream_stamp", _boom)
+        nflverse_cache.cached_scan("player_stats", 2024, self._loader(calls), permanent=True)
+        assert calls == [1, 1]
+
+    def test_status_lists_cached_files(self):
+        nflverse_cache.cached_scan("schedules", 2025, self._loader([]))
+        files = [e["file"] for e in nflverse_cache.cache_status()]
+        assert files == ["schedules_2025"]
+
+
+# ── nflverse_history ──────────────────────────────────────────────────────────
+
+class TestNflverseHistory:
+    ROSTERS = TestRefreshNflverseData.ROSTERS
+
+    def _store(self, season=2024):
+        from unittest.mock import patch
+        stats = _make_stats_df([
+            {"season": season, "player_id": "00-0001234", "week": 1, "fantasy_points_ppr": 10.0},
+            {"season": season, "player_id": "00-0001234", "week": 2, "fantasy_points_ppr": 14.0},
+            {"season": season, "player_id": "00-0005678", "week": 1, "team": "KC"},
+            {"season": season, "player_id": "00-0001234", "week": 3, "season_type": "POST"},
+        ])
+        with patch.object(nfl, "load_rosters", return_value=self.ROSTERS), \
+             patch.object(nfl, "load_player_stats", return_value=stats), \
+             patch.object(nfl, "load_team_stats", return_value=_make_team_stats_df([{"season": season}])), \
+             patch.object(nfl, "load_schedules", return_value=_make_games_df([{"season": season}])):
+            nflverse_history.store_season(season)
+
+    def test_store_writes_arrow_files(self):
+        self._store(2024)
+        assert nflverse_history.available_seasons() == [2024]
+        for table in nflverse_history.TABLES:
+            assert (nflverse_history.HISTORY_DIR / f"{table}_2024.arrow").exists()
+
+    def test_get_player_matches_live_shape(self):
+        self._store(2024)
+        player = nflverse_history.get_player("999", 2024)
+        assert player["season"] == 2024
+        assert [w["week"] for w in player["weekly"]] == [1, 2]
+        assert player["season_totals"]["fantasy_points_ppr"] == pytest.approx(24.0)
+        assert nflverse_history.get_player("nope", 2024) is None
+        assert nflverse_history.get_player("999", 2019) is None
+
+    def test_get_team(self):
+        self._store(2024)
+        team = nflverse_history.get_team("MIN", 2024)
+        assert team["schedule"]["opponent"] == "GB"
+        assert nflverse_history.get_team("XXX", 2024) is None
+
+    def test_refresh_history_skips_stored_seasons(self, monkeypatch):
+        stored = []
+        monkeypatch.setattr(nflverse_history, "HISTORY_SEASONS", 2)
+        monkeypatch.setattr(nflverse_history, "store_season", stored.append)
+        monkeypatch.setattr(nflverse_history, "available_seasons", lambda: [2023])
+        assert nflverse_history.refresh_history(2025) == [2024]
+        assert stored == [2024]
+
+    def test_refresh_history_builds_through_workers(self, monkeypatch):
+        import workers
+        jobs = []
+        monkeypatch.setattr(nflverse_history, "HISTORY_SEASONS", 1)
+        monkeypatch.setattr(nflverse_history, "available_seasons", lambda: [])
+        monkeypatch.setattr(workers, "run_job", lambda func, *args: jobs.append((func, args)))
+        nflverse_history.refresh_history(2025)
+        assert jobs == [(nflverse_history.store_season, (2024,))]
+
+    def test_endpoints_season_param(self, client):
+        self._store(2024)
+        ns.nflverse_current_season = 2025
+        data = client.get("/stats/player/999?season=2024").get_json()
+        assert data["sleeper_id"] == "999" and data["season"] == 2024
+        assert client.get("/stats/player/999?season=2019").status_code == 404
+        assert client.get("/stats/team/min?season=2024").get_json()["team"] == "MIN"
+        assert client.get("/stats/status").get_json()["history_seasons"] == [2024]
+
+
 # ── get_top_players ───────────────────────────────────────────────────────────
 
 class TestGetTopPlayers:
@@ -362,6 +681,7 @@ class TestGetTopPlayers:
             "3": {"name": "Carol", "position": "WR", "team": "MIN",
                   "season_totals": {"fantasy_points_ppr": 150.0}},
         })
+        ns.rebuild_views()
 
     def test_sorted_descending(self):
         self._pop()
@@ -381,6 +701,14 @@ class TestGetTopPlayers:
         self._pop()
         assert len(ns.get_top_players(2)) == 2
 
+    def test_position_and_team_filter(self):
+        self._pop()
+        assert [p["sleeper_id"] for p in ns.get_top_players(10, position="wr", team="min")] == ["1", "3"]
+
+    def test_matchup_attached(self):
+        self._pop()
+        assert all("matchup" in p for p in ns.get_top_players(10))
+
 
 # ── project_player ────────────────────────────────────────────────────────────
 
@@ -428,6 +756,7 @@ class TestStatsEndpoints:
             "rolling_3": {"fantasy_points_ppr": 22.0},
             "rolling_5": {"fantasy_points_ppr": 21.0},
         }
+        ns.rebuild_views()
 
     def test_status_200(self, client):
         resp = client.get("/stats/status")
@@ -446,9 +775,17 @@ class TestStatsEndpoints:
             "season_totals": {"fantasy_points_ppr": 400.0, "games_played": 10},
             "weekly": [], "rolling_3": {}, "rolling_5": {},
         }
+        ns.rebuild_views()
         data = client.get("/stats/players").get_json()
         assert data[0]["season_totals"]["fantasy_points_ppr"] == 400.0
 
+    def test_list_players_etag_per_version(self, client):
+        self._player("111", week=1)
+        etag = client.get("/stats/players").headers["ETag"]
+        assert client.get("/stats/players", headers={"If-None-Match": etag}).status_code == 304
+        ns.rebuild_views()
+        assert client.get("/stats/players", headers={"If-None-Match": etag}).status_code == 200
+
     def test_list_players_position_filter(self, client):
         self._player("111", pos="WR", week=1)
         self._player("222", pos="QB", week=1)
@@ -466,6 +803,43 @@ class TestStatsEndpoints:
         data = client.get("/stats/players/team/MIN").get_json()
         assert all(p["team"] == "MIN" for p in data)
 
+    def test_players_response_cached_per_version(self, client):
+        self._player("111")
+        first = client.get("/stats/players").get_json()
+        ns.nflverse_player_stats["111"]["name"] = "Renamed"   # not yet published
+        assert client.get("/stats/players").get_json() == first
+        ns.rebuild_views()
+        assert client.get("/stats/players").get_json()[0]["name"] == "Renamed"
+
+    def test_players_by_team_sorted_without_matchup(self, client):
+        self._player("111", team="MIN")
+        self._player("222", team="MIN")
+        ns.nflverse_player_stats["222"]["season_totals"]["fantasy_points_ppr"] = 300.0
+        ns.rebuild_views()
+        data = client.get("/stats/players/team/min").get_json()
+        assert [p["sleeper_id"] for p in data] == ["222", "111"]
+        assert "matchup" not in data[0]
+
+    def test_players_fields_and_pages(self, client):
+        for i, sid in enumerate(("111", "222", "333")):
+            self._player(sid, team="MIN")
+            ns.nflverse_player_stats[sid]["season_totals"]["fantasy_points_ppr"] = 300.0 - i
+        ns.rebuild_views()
+        resp = client.get("/stats/players?page_size=2&fields=sleeper_id,weekly.week")
+        assert resp.get_json() == [{"sleeper_id": "111", "weekly": [{"week": 8}]},
+                                   {"sleeper_id": "222", "weekly": [{"week": 8}]}]
+        cursor = resp.headers["X-Next-Cursor"]
+        rest = client.get(f"/stats/players/team/MIN?page_size=2&fields=sleeper_id&cursor={cursor}")
+        assert rest.get_json() == [{"sleeper_id": "333"}]
+        assert "X-Next-Cursor" not in rest.headers
+
+    def test_ranked_cursor_expires_on_rebuild(self, client):
+        self._player("111")
+        self._player("222")
+        cursor = client.get("/stats/players?page_size=1").headers["X-Next-Cursor"]
+        ns.rebuild_views()
+        assert client.get(f"/stats/players?page_size=1&cursor={cursor}").status_code == 410
+
     def test_player_detail(self, client):
         self._player("111")
         data = client.get("/stats/player/111").get_json()
@@ -492,6 +866,22 @@ class TestStatsEndpoints:
         data = client.get("/stats/week/8").get_json()
         assert "111" in data
 
+    def test_list_players_by_week_ranked_and_limited(self, client):
+        self._player("111", week=8)
+        self._player("222", pos="RB", week=8)
+        ns.nflverse_player_stats["222"]["weekly"][0]["fantasy_points_ppr"] = 30.0
+        ns.rebuild_views()
+        data = client.get("/stats/players?week=8").get_json()
+        assert [p["sleeper_id"] for p in data] == ["222", "111"]
+        assert [p["sleeper_id"] for p in client.get("/stats/players?week=8&limit=1").get_json()] == ["222"]
+        assert [p["sleeper_id"] for p in client.get("/stats/players?week=8&position=wr").get_json()] == ["111"]
+
+    def test_refresh_bumps_version(self):
+        before = ns.nflverse_version
+        TestRefreshNflverseData()._run(_make_stats_df([{"player_id": "00-0001234", "week": 4}]))
+        assert ns.nflverse_version > before
+        assert ns.nflverse_week_rankings[4] == ["999"]
+
     def test_week_404(self, client):
         assert client.get("/stats/week/99").status_code == 404
 
@@ -500,6 +890,29 @@ class TestStatsEndpoints:
         data = client.get("/stats/projections/week/8").get_json()
         assert isinstance(data, list) and "projected_ppr" in data[0]
 
+    def test_projections_filtered_and_sorted(self, client):
+        self._player("111", pos="WR", team="MIN")
+        self._player("222", pos="RB", team="MIN")
+        self._player("333", pos="WR", team="KC")
+        ns.nflverse_player_stats["333"]["rolling_5"]["fantasy_points_ppr"] = 30.0
+        ns.nflverse_schedule["KC"] = {"week": 8, "opponent": "LV", "total": 50.0}
+        ns.rebuild_views()
+        assert 8 in ns.nflverse_projection_tables   # schedule week materialised at rebuild
+
+        data = client.get("/stats/projections/week/8?position=wr").get_json()
+        assert [p["sleeper_id"] for p in data] == ["333", "111"]
+        assert data[0]["projected_ppr"] == pytest.approx(31.8)
+        data = client.get("/stats/projections/week/8?position=WR&team=MIN").get_json()
+        assert [p["sleeper_id"] for p in data] == ["111"]
+
+    def test_projections_other_week_cached_lazily(self, client):
+        self._player("111")
+        assert 3 not in ns.nflverse_projection_tables
+        assert client.get("/stats/projections/week/3").get_json()[0]["adjustment_factor"] == 1.0
+        assert 3 in ns.nflverse_projection_tables
+        client.get("/stats/projections/week/500")
+        assert 500 not in ns.nflverse_projection_tables
+
     def test_schedule(self, client):
         ns.nflverse_games[8] = [{"home_team": "MIN", "away_team": "GB",
                                    "spread_line": -3.0, "total_line": 47.5,
@@ -0,0 +1,40 @@
+"""
+tests/test_workers.py — Tests for the worker-process job runner.
+
+The subprocess tests run real `python -m workers` children on stdlib functions,
+so no network or scraping is involved.
+"""
+
+import json
+import pytest
+
+import workers
+
+
+class TestRunInWorker:
+    def test_returns_result_from_child(self):
+        assert workers.run_in_worker(json.dumps, {"a": [1, 2]}) == '{"a": [1, 2]}'
+
+    def test_child_exception_raises_worker_error(self):
+        with pytest.raises(workers.WorkerError, match="JSONDecodeError"):
+            workers.run_in_worker(json.loads, "not json")
+
+    def test_pack_roundtrip(self):
+        payload = {"players": {str(i): {"weekly": [{"week": 1, "fpts": 1.5}]} for i in range(100)}}
+        packed = workers._pack(payload)
+        assert workers._unpack(packed) == payload
+        assert len(packed) < len(json.dumps(payload))
+
+
+class TestRunJob:
+    def test_inline_when_disabled(self, monkeypatch):
+        monkeypatch.setattr(workers, "USE_WORKER_PROCESSES", False)
+        monkeypatch.setattr(workers, "run_in_worker", lambda *a: pytest.fail("spawned a worker"))
+        assert workers.run_job(sorted, [3, 1, 2]) == [1, 2, 3]
+
+    def test_worker_when_enabled(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(workers, "USE_WORKER_PROCESSES", True)
+        monkeypatch.setattr(workers, "run_in_worker", lambda func, *args: calls.append(func) or func(*args))
+        assert workers.run_job(sorted, [2, 1]) == [1, 2]
+        assert calls == [sorted]
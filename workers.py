@@ -0,0 +1,100 @@
+"""
+workers.py — run memory-heavy refresh jobs in a short-lived child process.
+
+KTC/FantasyCalc scraping, DFF scraping and the nflverse build all allocate far
+more than they keep, and CPython rarely hands freed heap back to the OS, so
+the web process's RSS ratchets up with every refresh. With
+REFRESH_IN_WORKER=1 each job's build step runs in a fresh interpreter
+(`python -m workers`) that exits when done, and only the compact result —
+zstd-compressed pickle — comes back to be published in the web process.
+
+Jobs must be module-level functions in importable modules (not nfl-helper.py,
+which can't be imported by name) and must return their result rather than
+mutate globals. With the flag off, run_job() simply calls the function inline.
+"""
+
+import importlib
+import logging
+import os
+import pickle
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import zstandard as zstd
+
+logger = logging.getLogger(__name__)
+
+USE_WORKER_PROCESSES   = os.environ.get("REFRESH_IN_WORKER", "").lower() in ("1", "true", "yes")
+WORKER_TIMEOUT_SECONDS = int(os.environ.get("REFRESH_WORKER_TIMEOUT_SECONDS", 1800))
+
+_PROJECT_ROOT = Path(__file__).resolve().parent
+
+
+class WorkerError(RuntimeError):
+    """The child process failed, timed out or returned an error."""
+
+
+def _pack(obj) -> bytes:
+    return zstd.ZstdCompressor(level=3).compress(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _unpack(data: bytes):
+    return pickle.loads(zstd.ZstdDecompressor().decompress(data))
+
+
+def run_in_worker(func, *args, timeout: int | None = None):
+    """Run module-level func(*args) in a fresh Python process and return its result."""
+    request = _pack((func.__module__, func.__qualname__, args))
+    started = time.monotonic()
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-m", "workers"],
+            input=request,
+            stdout=subprocess.PIPE,
+            cwd=_PROJECT_ROOT,
+            timeout=timeout or WORKER_TIMEOUT_SECONDS,
+        )
+    except subprocess.TimeoutExpired:
+        raise WorkerError(f"{func.__qualname__} timed out after {timeout or WORKER_TIMEOUT_SECONDS}s")
+
+    if proc.returncode != 0 or not proc.stdout:
+        raise WorkerError(f"{func.__qualname__} exited with code {proc.returncode}")
+    status, value = _unpack(proc.stdout)
+    if status != "ok":
+        raise WorkerError(f"{func.__qualname__} failed in worker: {value}")
+
+    logger.info("worker: %s done in %.1fs (%d bytes returned)",
+                func.__qualname__, time.monotonic() - started, len(proc.stdout))
+    return value
+
+
+def run_job(func, *args):
+    """func(*args) — in a worker process when REFRESH_IN_WORKER is set, inline otherwise."""
+    if USE_WORKER_PROCESSES:
+        return run_in_worker(func, *args)
+    return func(*args)
+
+
+def _main():
+    module_name, qualname, args = _unpack(sys.stdin.buffer.read())
+    # The job's own prints go to stderr so stdout carries only the result
+    out, sys.stdout = sys.stdout, sys.stderr
+    try:
+        func = importlib.import_module(module_name)
+        for part in qualname.split("."):
+            func = getattr(func, part)
+        result = ("ok", func(*args))
+    except Exception as e:
+        logging.getLogger(module_name).exception("worker job %s failed", qualname)
+        result = ("error", f"{type(e).__name__}: {e}")
+    finally:
+        sys.stdout = out
+    sys.stdout.buffer.write(_pack(result))
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    _main()
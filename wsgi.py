@@ -0,0 +1,26 @@
+"""
+wsgi.py — WSGI entry point for serving with several worker processes.
+
+One loader process scrapes, runs the scheduler and publishes snapshots; any
+number of stateless web workers follow them:
+
+    APP_ROLE=loader python nfl-helper.py
+    gunicorn -w 4 -b 0.0.0.0:$PORT wsgi:app
+
+APP_ROLE defaults to "web" here. Admin/scrape endpoints change data only in
+the process that handles them, so point those at the loader.
+"""
+
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("APP_ROLE", "web")
+
+_spec = importlib.util.spec_from_file_location("nfl_helper", Path(__file__).with_name("nfl-helper.py"))
+nfl_helper = importlib.util.module_from_spec(_spec)
+sys.modules["nfl_helper"] = nfl_helper
+_spec.loader.exec_module(nfl_helper)
+
+app = nfl_helper.app